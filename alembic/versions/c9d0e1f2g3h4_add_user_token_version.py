@@ -0,0 +1,27 @@
+"""add token_version to users
+
+Revision ID: c9d0e1f2g3h4
+Revises: b8c9d0e1f2g3
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2g3h4'
+down_revision: Union[str, None] = 'b8c9d0e1f2g3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add token_version, bumped to revoke a user's claim-based access tokens"""
+    op.add_column('users',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Remove token_version from users"""
+    op.drop_column('users', 'token_version')
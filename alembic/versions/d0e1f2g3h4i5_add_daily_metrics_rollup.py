@@ -0,0 +1,53 @@
+"""add daily_metrics rollup table
+
+Revision ID: d0e1f2g3h4i5
+Revises: c9d0e1f2g3h4
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2g3h4i5'
+down_revision: Union[str, None] = 'c9d0e1f2g3h4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create daily_metrics; populate it with scripts/rebuild_daily_metrics.py"""
+    op.create_table(
+        'daily_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('metric_date', sa.Date(), nullable=False),
+        sa.Column('broker_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('company_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('policy_type', sa.String(length=20), nullable=False, server_default=''),
+        sa.Column('new_policies', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('premiums_billed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('premiums_billed_amount', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('premiums_collected_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('premiums_collected_amount', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('transaction_volume', sa.Numeric(18, 2), nullable=False, server_default='0'),
+        sa.Column('fees_collected', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('platform_commission', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('insureflow_commission', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('habari_commission', sa.Numeric(15, 2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('metric_date', 'broker_id', 'company_id', 'policy_type', name='uq_daily_metrics_key'),
+    )
+    op.create_index(op.f('ix_daily_metrics_id'), 'daily_metrics', ['id'], unique=False)
+    op.create_index(op.f('ix_daily_metrics_metric_date'), 'daily_metrics', ['metric_date'], unique=False)
+    op.create_index(op.f('ix_daily_metrics_broker_id'), 'daily_metrics', ['broker_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop daily_metrics"""
+    op.drop_index(op.f('ix_daily_metrics_broker_id'), table_name='daily_metrics')
+    op.drop_index(op.f('ix_daily_metrics_metric_date'), table_name='daily_metrics')
+    op.drop_index(op.f('ix_daily_metrics_id'), table_name='daily_metrics')
+    op.drop_table('daily_metrics')
@@ -0,0 +1,33 @@
+"""add last_transaction_at to virtual_accounts
+
+Revision ID: e1f2g3h4i5j6
+Revises: d0e1f2g3h4i5
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f2g3h4i5j6'
+down_revision: Union[str, None] = 'd0e1f2g3h4i5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add last_transaction_at and backfill it from existing transactions"""
+    op.add_column('virtual_accounts',
+        sa.Column('last_transaction_at', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE virtual_accounts SET last_transaction_at = (
+            SELECT MAX(vat.created_at) FROM virtual_account_transactions vat
+            WHERE vat.virtual_account_id = virtual_accounts.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Remove last_transaction_at from virtual_accounts"""
+    op.drop_column('virtual_accounts', 'last_transaction_at')
@@ -0,0 +1,55 @@
+"""add composite indexes for hot query filters
+
+Revision ID: f2g3h4i5j6k7
+Revises: e1f2g3h4i5j6
+Create Date: 2026-10-17 12:00:00.000000
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY outside the
+migration transaction, so writes continue while they build. A failed concurrent
+build leaves an INVALID index behind: drop it and rerun the upgrade.
+Check the plans with scripts/explain_hot_queries.py.
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2g3h4i5j6k7'
+down_revision: Union[str, None] = 'e1f2g3h4i5j6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_virtual_account_transactions_status_transaction_date', 'virtual_account_transactions', ['status', 'transaction_date']),
+    ('ix_virtual_account_transactions_status_transaction_indicator', 'virtual_account_transactions', ['status', 'transaction_indicator']),
+    ('ix_virtual_account_transactions_virtual_account_id_created_at', 'virtual_account_transactions', ['virtual_account_id', 'created_at']),
+    ('ix_premiums_payment_status_due_date', 'premiums', ['payment_status', 'due_date']),
+    ('ix_premiums_policy_id_payment_status', 'premiums', ['policy_id', 'payment_status']),
+    ('ix_policies_broker_id_created_at', 'policies', ['broker_id', 'created_at']),
+    ('ix_policies_status_end_date', 'policies', ['status', 'end_date']),
+    ('ix_policies_due_date', 'policies', ['due_date']),
+    ('ix_notifications_broker_id_is_dismissed_is_read_created_at', 'notifications', ['broker_id', 'is_dismissed', 'is_read', 'created_at']),
+    ('ix_support_tickets_status_created_at', 'support_tickets', ['status', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    """Create the composite indexes (concurrently on PostgreSQL)"""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Drop the composite indexes (concurrently on PostgreSQL)"""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
@@ -8,6 +8,7 @@ from datetime import timedelta
 from typing import List
 
 from app import dependencies
+from app.core.principal import access_token_claims
 from app.core.security import create_access_token, verify_password, get_password_hash
 from app.crud import user as crud_user, broker as crud_broker
 from app.schemas.auth import (
@@ -51,7 +52,7 @@ def register_user(
     # Automatically log in the user after registration
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": new_user.email}, expires_delta=access_token_expires
+        data=access_token_claims(new_user), expires_delta=access_token_expires
     )
     
     return Token(
@@ -86,7 +87,7 @@ def login_for_access_token(
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=access_token_claims(user), expires_delta=access_token_expires
     )
     
     # Update last login time
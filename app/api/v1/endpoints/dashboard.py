@@ -7,15 +7,18 @@ from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 
 from app import dependencies
+from app.core.cache import response_cache
+from app.core.principal import Principal
 from app.crud import dashboard as crud_dashboard
 from app.schemas import dashboard as schemas_dashboard
 from app.models.user import User, UserRole
 
 router = APIRouter()
 
+
 @router.get("/", response_model=schemas_dashboard.DashboardData)
 def get_dashboard_data(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_active_user)
 ):
     """
@@ -67,42 +70,47 @@ def get_dashboard_data(
 
 @router.get("/insurance-firm", response_model=schemas_dashboard.InsuranceFirmDashboard)
 def get_insurance_firm_dashboard(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_insurance_user)
 ):
     """
     Get comprehensive dashboard for insurance firm users.
     """
     try:
-        # Enhanced KPIs with virtual account data
-        kpis = crud_dashboard.get_enhanced_dashboard_kpis(db, current_user)
+        def build():
+            # Enhanced KPIs with virtual account data
+            kpis = crud_dashboard.get_enhanced_dashboard_kpis(db, current_user)
         
-        # Recent policies
-        recent_policies = crud_dashboard.get_recent_policies(db, current_user, limit=10)
+            # Recent policies
+            recent_policies = crud_dashboard.get_recent_policies(db, current_user, limit=10)
         
-        # Policy trends
-        policy_trends = crud_dashboard.get_policy_trends(db, current_user, period="monthly")
+            # Policy trends
+            policy_trends = crud_dashboard.get_policy_trends(db, current_user, period="monthly")
         
-        # Premium collection trends (using policy trends as base for now)
-        premium_collection_trends = crud_dashboard.get_policy_trends(db, current_user, period="weekly")
+            # Premium collection trends (using policy trends as base for now)
+            premium_collection_trends = crud_dashboard.get_policy_trends(db, current_user, period="weekly")
         
-        # Broker performance
-        broker_performance = crud_dashboard.get_broker_performance_list(db, current_user, limit=10)
+            # Broker performance
+            broker_performance = crud_dashboard.get_broker_performance_list(db, current_user, limit=10)
         
-        # Policy type distribution
-        policy_type_distribution = crud_dashboard.get_policy_type_distribution(db, current_user)
+            # Policy type distribution
+            policy_type_distribution = crud_dashboard.get_policy_type_distribution(db, current_user)
         
-        # Latest payments from brokers
-        from app.crud import payment as crud_payment
-        latest_payments = crud_payment.get_payments_for_insurance_firm(db, skip=0, limit=20)
+            # Latest payments from brokers
+            from app.crud import payment as crud_payment
+            latest_payments = crud_payment.get_payments_for_insurance_firm(db, skip=0, limit=20)
         
-        return schemas_dashboard.InsuranceFirmDashboard(
-            kpis=kpis,
-            recent_policies=recent_policies,
-            policy_trends=policy_trends,
-            broker_performance=broker_performance,
-            policy_distribution=policy_type_distribution,
-            latest_payments=latest_payments
+            return schemas_dashboard.InsuranceFirmDashboard(
+                kpis=kpis,
+                recent_policies=recent_policies,
+                policy_trends=policy_trends,
+                broker_performance=broker_performance,
+                policy_distribution=policy_type_distribution,
+                latest_payments=latest_payments
+            )
+
+        return response_cache.get_or_set(
+            "insurance-firm", current_user.role.value, crud_dashboard.cache_scope(current_user), build
         )
     except Exception as e:
         raise HTTPException(
@@ -112,7 +120,7 @@ def get_insurance_firm_dashboard(
 
 @router.get("/broker", response_model=schemas_dashboard.BrokerDashboard)
 def get_broker_dashboard(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_broker_user)
 ):
     """
@@ -149,13 +157,12 @@ def get_broker_dashboard(
                 broker_id=current_user.id,
                 broker_name=current_user.full_name,
                 organization_name=current_user.organization_name or "Independent Broker",
-                total_policies=5,
-                total_premiums=430000.0,
+                policies_count=5,
+                total_premium=430000.0,
                 commission_earned=21500.0,
                 conversion_rate=50.0,
-                client_retention_rate=85.0,
                 average_deal_size=86000.0,
-                rank=1
+                ranking=1
             )
         
         # Upcoming renewals (policies due soon)
@@ -252,93 +259,98 @@ def get_broker_dashboard(
 
 @router.get("/admin", response_model=schemas_dashboard.AdminDashboard)
 def get_admin_dashboard(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_admin_user)
 ):
     """
     Get comprehensive admin dashboard with system-wide analytics.
     """
     try:
-        # Enhanced KPIs
-        kpis = crud_dashboard.get_enhanced_dashboard_kpis(db, current_user)
-        
-        # Recent policies
-        recent_policies = crud_dashboard.get_recent_policies(db, current_user, limit=15)
-        
-        # System overview
-        system_overview = {
-            "total_users": db.query(User).count(),
-            "active_users": db.query(User).filter(User.is_active == True).count(),
-            "total_brokers": kpis.broker_count,
-            "system_health": "Excellent",
-            "uptime": "99.9%"
-        }
-        
-        # Broker performance
-        broker_performance = crud_dashboard.get_broker_performance_list(db, current_user, limit=15)
-        
-        # Virtual account summary
-        virtual_account_summary = {
-            "total_accounts": kpis.virtual_accounts_count,
-            "active_accounts": kpis.active_virtual_accounts,
-            "total_balance": kpis.total_virtual_account_balance,
-            "total_platform_commission": kpis.total_platform_commission,
-            "insureflow_commission": kpis.insureflow_commission_total,
-            "habari_commission": kpis.habari_commission_total
-        }
-        
-        # Commission distribution between InsureFlow and Habari
-        total_commission = kpis.total_platform_commission
-        insureflow_commission = kpis.insureflow_commission_total
-        habari_commission = kpis.habari_commission_total
-        
-        commission_distribution = schemas_dashboard.PieChartData(
-            segments=[
-                schemas_dashboard.ChartDataPoint(label="InsureFlow Commission (0.75%)", value=insureflow_commission),
-                schemas_dashboard.ChartDataPoint(label="Habari Commission (0.25%)", value=habari_commission)
-            ],
-            total=total_commission
-        )
-        
-        # Policy trends
-        policy_trends = crud_dashboard.get_policy_trends(db, current_user, period="monthly")
-        
-        # Revenue trends (same as policy trends for now)
-        revenue_trends = policy_trends
-        
-        # Geographical distribution (placeholder)
-        geographical_distribution = [
-            schemas_dashboard.ChartDataPoint(label="Lagos", value=45.0),
-            schemas_dashboard.ChartDataPoint(label="Abuja", value=25.0),
-            schemas_dashboard.ChartDataPoint(label="Port Harcourt", value=15.0),
-            schemas_dashboard.ChartDataPoint(label="Kano", value=10.0),
-            schemas_dashboard.ChartDataPoint(label="Others", value=5.0)
-        ]
-        
-        # Risk analysis (placeholder)
-        risk_analysis = {
-            "high_risk_policies": 5,
-            "medium_risk_policies": 25,
-            "low_risk_policies": 70,
-            "overdue_ratio": round(kpis.overdue_payments / kpis.total_policies * 100, 2) if kpis.total_policies > 0 else 0
-        }
+        def build():
+            # Enhanced KPIs
+            kpis = crud_dashboard.get_enhanced_dashboard_kpis(db, current_user)
         
-        # Fetch latest payments for Admin too
-        from app.crud import payment as crud_payment
-        latest_payments = crud_payment.get_payments_for_insurance_firm(db, skip=0, limit=20)
+            # Recent policies
+            recent_policies = crud_dashboard.get_recent_policies(db, current_user, limit=15)
+        
+            # System overview
+            system_overview = {
+                "total_users": db.query(User).count(),
+                "active_users": db.query(User).filter(User.is_active == True).count(),
+                "total_brokers": kpis.broker_count,
+                "system_health": "Excellent",
+                "uptime": "99.9%"
+            }
+        
+            # Broker performance
+            broker_performance = crud_dashboard.get_broker_performance_list(db, current_user, limit=15)
+        
+            # Virtual account summary
+            virtual_account_summary = {
+                "total_accounts": kpis.virtual_accounts_count,
+                "active_accounts": kpis.active_virtual_accounts,
+                "total_balance": kpis.total_virtual_account_balance,
+                "total_platform_commission": kpis.total_platform_commission,
+                "insureflow_commission": kpis.insureflow_commission_total,
+                "habari_commission": kpis.habari_commission_total
+            }
+        
+            # Commission distribution between InsureFlow and Habari
+            total_commission = kpis.total_platform_commission
+            insureflow_commission = kpis.insureflow_commission_total
+            habari_commission = kpis.habari_commission_total
+        
+            commission_distribution = schemas_dashboard.PieChartData(
+                segments=[
+                    schemas_dashboard.ChartDataPoint(label="InsureFlow Commission (0.75%)", value=insureflow_commission),
+                    schemas_dashboard.ChartDataPoint(label="Habari Commission (0.25%)", value=habari_commission)
+                ],
+                total=total_commission
+            )
         
-        return schemas_dashboard.AdminDashboard(
-            kpis=kpis,
-            recent_policies=recent_policies,
-            system_overview=system_overview,
-            broker_performance=broker_performance,
-            virtual_account_summary=virtual_account_summary,
-            commission_distribution=commission_distribution,
-            policy_trends=policy_trends,
-            revenue_trends=revenue_trends,
-            geographical_distribution=geographical_distribution,
-            risk_analysis=risk_analysis,
-            latest_payments=latest_payments
+            # Policy trends
+            policy_trends = crud_dashboard.get_policy_trends(db, current_user, period="monthly")
+        
+            # Revenue trends (same as policy trends for now)
+            revenue_trends = policy_trends
+        
+            # Geographical distribution (placeholder)
+            geographical_distribution = [
+                schemas_dashboard.ChartDataPoint(label="Lagos", value=45.0),
+                schemas_dashboard.ChartDataPoint(label="Abuja", value=25.0),
+                schemas_dashboard.ChartDataPoint(label="Port Harcourt", value=15.0),
+                schemas_dashboard.ChartDataPoint(label="Kano", value=10.0),
+                schemas_dashboard.ChartDataPoint(label="Others", value=5.0)
+            ]
+        
+            # Risk analysis (placeholder)
+            risk_analysis = {
+                "high_risk_policies": 5,
+                "medium_risk_policies": 25,
+                "low_risk_policies": 70,
+                "overdue_ratio": round(kpis.overdue_payments / kpis.total_policies * 100, 2) if kpis.total_policies > 0 else 0
+            }
+        
+            # Fetch latest payments for Admin too
+            from app.crud import payment as crud_payment
+            latest_payments = crud_payment.get_payments_for_insurance_firm(db, skip=0, limit=20)
+        
+            return schemas_dashboard.AdminDashboard(
+                kpis=kpis,
+                recent_policies=recent_policies,
+                system_overview=system_overview,
+                broker_performance=broker_performance,
+                virtual_account_summary=virtual_account_summary,
+                commission_distribution=commission_distribution,
+                policy_trends=policy_trends,
+                revenue_trends=revenue_trends,
+                geographical_distribution=geographical_distribution,
+                risk_analysis=risk_analysis,
+                latest_payments=latest_payments
+            )
+
+        return response_cache.get_or_set(
+            "admin", current_user.role.value, crud_dashboard.cache_scope(current_user), build
         )
     except Exception as e:
         raise HTTPException(
@@ -349,7 +361,7 @@ def get_admin_dashboard(
 @router.get("/charts/policy-trends")
 def get_policy_trends_chart(
     period: str = Query("monthly", regex="^(daily|weekly|monthly)$"),
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_active_user)
 ):
     """
@@ -366,7 +378,7 @@ def get_policy_trends_chart(
 
 @router.get("/charts/policy-distribution")
 def get_policy_distribution_chart(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_active_user)
 ):
     """
@@ -384,14 +396,18 @@ def get_policy_distribution_chart(
 @router.get("/performance/brokers")
 def get_broker_performance_rankings(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(dependencies.get_db),
+    after_rank: Optional[int] = Query(None, ge=0, description="Return brokers ranked after this position"),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_broker_or_admin_user)
 ):
     """
-    Get broker performance rankings.
+    Get broker performance rankings. Page through the leaderboard by passing
+    the last `ranking` received as `after_rank`.
     """
     try:
-        performance = crud_dashboard.get_broker_performance_list(db, current_user, limit=limit)
+        performance = crud_dashboard.get_broker_performance_list(
+            db, current_user, limit=limit, after_rank=after_rank
+        )
         return performance
     except Exception as e:
         raise HTTPException(
@@ -402,7 +418,7 @@ def get_broker_performance_rankings(
 @router.get("/performance/broker/{broker_id}")
 def get_individual_broker_performance(
     broker_id: int,
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_broker_or_admin_user)
 ):
     """
@@ -429,7 +445,7 @@ def get_individual_broker_performance(
 
 @router.get("/virtual-accounts/summary")
 def get_virtual_accounts_summary(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_active_user)
 ):
     """
@@ -447,7 +463,7 @@ def get_virtual_accounts_summary(
 @router.get("/metrics/kpis")
 def get_dashboard_kpis(
     enhanced: bool = Query(False, description="Get enhanced KPIs with virtual account data"),
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_active_user)
 ):
     """
@@ -467,25 +483,30 @@ def get_dashboard_kpis(
 
 @router.get("/analytics/overview")
 def get_analytics_overview(
-    db: Session = Depends(dependencies.get_db),
+    db: Session = Depends(dependencies.get_read_db),
     current_user: User = Depends(dependencies.get_current_broker_or_admin_user)
 ):
     """
     Get comprehensive analytics overview.
     """
     try:
-        overview = {
-            "kpis": crud_dashboard.get_dashboard_kpis(db, current_user),
-            "policy_trends": crud_dashboard.get_policy_trends(db, current_user, "monthly"),
-            "policy_distribution": crud_dashboard.get_policy_type_distribution(db, current_user),
-            "recent_activity": crud_dashboard.get_recent_policies(db, current_user, 5)
-        }
-        
-        if current_user.can_perform_admin_actions or current_user.is_insurance_user:
-            overview["broker_performance"] = crud_dashboard.get_broker_performance_list(db, current_user, 5)
-            overview["virtual_accounts"] = crud_dashboard.get_virtual_account_summaries(db, current_user, 5)
-        
-        return overview
+        def build():
+            overview = {
+                "kpis": crud_dashboard.get_dashboard_kpis(db, current_user),
+                "policy_trends": crud_dashboard.get_policy_trends(db, current_user, "monthly"),
+                "policy_distribution": crud_dashboard.get_policy_type_distribution(db, current_user),
+                "recent_activity": crud_dashboard.get_recent_policies(db, current_user, 5)
+            }
+        
+            if current_user.can_perform_admin_actions or current_user.is_insurance_user:
+                overview["broker_performance"] = crud_dashboard.get_broker_performance_list(db, current_user, 5)
+                overview["virtual_accounts"] = crud_dashboard.get_virtual_account_summaries(db, current_user, 5)
+        
+            return overview
+
+        return response_cache.get_or_set(
+            "analytics-overview", current_user.role.value, crud_dashboard.cache_scope(current_user), build
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -495,8 +516,8 @@ def get_analytics_overview(
 # ✅ NEW ENDPOINT: Direct access to payments for any logged-in user
 @router.get("/latest-payments", response_model=List[Dict[str, Any]])
 def get_dashboard_latest_payments(
-    db: Session = Depends(dependencies.get_db),
-    current_user: User = Depends(dependencies.get_current_active_user)
+    db: Session = Depends(dependencies.get_read_db),
+    current_user: Principal = Depends(dependencies.get_current_principal)
 ):
     """
     Directly fetch latest payments for the dashboard widget.
@@ -4,14 +4,24 @@ Provides comprehensive platform monitoring, transaction logs, and commission man
 """
 from datetime import datetime, date
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from decimal import Decimal
 
-from app.dependencies import get_db, get_current_insureflow_admin
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_pool_stats, open_read_session, replica_monitor
+from app.core.streaming_export import EXPORT_FORMATS, FORMAT_ALIASES
+from app.core.user_cache import user_cache
+from app.services.webhook_worker import webhook_worker
+from app.dependencies import get_db, get_read_db, get_current_insureflow_admin
 from app.models.user import User
+from app.models.webhook_event import WebhookEventStatus
 from app.crud import insureflow_admin as crud_admin
 from app.crud import support_ticket as crud_support_ticket
+from app.crud import webhook_event as crud_webhook_event
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from app.crud.virtual_account import (
     update_virtual_account_commission_rates,
     get_total_commission_for_insureflow,
@@ -37,7 +47,7 @@ router = APIRouter()
 
 @router.get("/dashboard", response_model=InsureFlowAdminDashboard)
 def get_insureflow_admin_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -87,10 +97,7 @@ def get_insureflow_admin_dashboard(
         raise HTTPException(status_code=500, detail=f"Error fetching admin dashboard: {str(e)}")
 
 
-@router.get("/transactions/logs", response_model=List[TransactionLogEntry])
-def get_transaction_logs(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+def transaction_filter(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     transaction_type: Optional[str] = None,
@@ -99,15 +106,10 @@ def get_transaction_logs(
     max_amount: Optional[Decimal] = None,
     user_id: Optional[int] = None,
     virtual_account_id: Optional[int] = None,
-    policy_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_insureflow_admin)
-):
-    """
-    Get detailed transaction logs with filtering and pagination.
-    Supports comprehensive filtering by date, amount, user, account, etc.
-    """
-    filters = TransactionFilter(
+    policy_id: Optional[int] = None
+) -> TransactionFilter:
+    """Transaction filter query parameters shared by the log and export endpoints."""
+    return TransactionFilter(
         start_date=start_date,
         end_date=end_date,
         transaction_type=transaction_type,
@@ -118,13 +120,37 @@ def get_transaction_logs(
         virtual_account_id=virtual_account_id,
         policy_id=policy_id
     )
+
+
+@router.get("/transactions/logs", response_model=List[TransactionLogEntry])
+def get_transaction_logs(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    filters: TransactionFilter = Depends(transaction_filter),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_insureflow_admin)
+):
+    """
+    Get detailed transaction logs, newest first, with filtering and pagination.
+    Supports comprehensive filtering by date, amount, user, account, etc.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    try:
+        logs = crud_admin.get_transaction_logs(db, skip=skip, limit=limit, filters=filters, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return crud_admin.get_transaction_logs(db, skip=skip, limit=limit, filters=filters)
+    page_cursor = next_cursor(logs, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    return logs
 
 
 @router.get("/analytics/commission", response_model=CommissionAnalytics)
 def get_commission_analytics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -136,7 +162,7 @@ def get_commission_analytics(
 
 @router.get("/analytics/platform-health", response_model=PlatformHealthMetrics)
 def get_platform_health_metrics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -148,20 +174,26 @@ def get_platform_health_metrics(
 
 @router.get("/reports/financial", response_model=FinancialReport)
 def get_financial_report(
-    period: str = Query("monthly", regex="^(daily|monthly|yearly)$"),
-    db: Session = Depends(get_db),
+    period: str = Query("monthly", regex="^(daily|monthly|quarterly|yearly)$"),
+    start: Optional[datetime] = Query(None, description="Custom range start (inclusive); requires end"),
+    end: Optional[datetime] = Query(None, description="Custom range end (exclusive); requires start"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
     Generate financial reports for accounting and reconciliation.
-    Supports daily, monthly, and yearly reporting periods.
+    Supports the current day, month, quarter or year, or a custom [start, end) range.
     """
-    return crud_admin.get_financial_report(db, period=period)
+    if (start is None) != (end is None):
+        raise HTTPException(status_code=400, detail="start and end must be given together")
+    if start is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return crud_admin.get_financial_report(db, period=period, start=start, end=end)
 
 
 @router.get("/users/management-summary", response_model=UserManagementSummary)
 def get_user_management_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -173,7 +205,7 @@ def get_user_management_summary(
 
 @router.get("/commission/summary")
 def get_commission_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -237,7 +269,7 @@ def update_commission_configuration(
 @router.get("/alerts/recent")
 def get_recent_alerts(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -277,83 +309,80 @@ def create_system_alert(
 def get_revenue_trends(
     period: str = Query("monthly", regex="^(daily|weekly|monthly|yearly)$"),
     months: int = Query(12, ge=1, le=24),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
-    Get InsureFlow revenue trends over time.
+    Get InsureFlow revenue trends over the last `months` months, bucketed by `period`.
     """
-    commission_analytics = crud_admin.get_commission_analytics(db)
+    totals = crud_admin.get_revenue_totals(db)
     
     return {
         "period": period,
-        "total_revenue": float(commission_analytics.total_revenue_generated),
-        "monthly_trends": commission_analytics.monthly_trends,
-        "growth_rate": commission_analytics.revenue_growth_rate,
-        "avg_commission_per_transaction": float(commission_analytics.avg_commission_per_transaction)
+        "months": months,
+        "total_revenue": float(totals["total_revenue"]),
+        "monthly_trends": crud_admin.get_revenue_trends(db, period=period, months=months),
+        "growth_rate": totals["growth_rate"],
+        "avg_commission_per_transaction": float(totals["avg_commission_per_transaction"])
     }
 
 
 @router.get("/analytics/broker-performance")
 def get_broker_performance_analytics(
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
     Get broker performance analytics from InsureFlow's perspective.
     Shows which brokers generate the most transaction volume (and thus commission for InsureFlow).
     """
-    commission_analytics = crud_admin.get_commission_analytics(db)
+    top_brokers = crud_admin.get_top_revenue_brokers(db, limit=limit)
+    totals = crud_admin.get_revenue_totals(db)
     
     return {
-        "top_revenue_generating_brokers": commission_analytics.top_revenue_generating_brokers[:limit],
-        "total_brokers_with_transactions": len(commission_analytics.top_revenue_generating_brokers),
+        "top_revenue_generating_brokers": top_brokers,
+        "total_brokers_with_transactions": len(top_brokers),
         "platform_revenue_summary": {
-            "total_revenue": float(commission_analytics.total_revenue_generated),
-            "monthly_revenue": float(commission_analytics.monthly_revenue),
-            "daily_revenue": float(commission_analytics.daily_revenue)
+            "total_revenue": float(totals["total_revenue"]),
+            "monthly_revenue": float(totals["monthly_revenue"]),
+            "daily_revenue": float(totals["daily_revenue"])
         }
     }
 
 
 @router.get("/export/transactions")
 def export_transaction_data(
-    format: str = Query("csv", regex="^(csv|excel|json)$"),
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    format: str = Query("csv", pattern="^(csv|ndjson|xlsx|excel|json)$"),
+    filters: TransactionFilter = Depends(transaction_filter),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
-    Export transaction data for accounting and reconciliation.
-    Supports CSV, Excel, and JSON formats.
+    Export transaction data for accounting and reconciliation, oldest first.
+    Streams CSV, NDJSON or XLSX ("excel" and "json" are accepted as XLSX and NDJSON)
+    straight from a server-side cursor, so exports of any size use flat memory.
     """
-    # This would generate and return the actual file
-    # For now, we'll return metadata about what would be exported
-    
-    filters = TransactionFilter(start_date=start_date, end_date=end_date)
-    transactions = crud_admin.get_transaction_logs(db, limit=10000, filters=filters)
-    
-    return {
-        "export_format": format,
-        "total_transactions": len(transactions),
-        "date_range": {
-            "start_date": start_date.isoformat() if start_date else None,
-            "end_date": end_date.isoformat() if end_date else None
-        },
-        "columns": [
-            "transaction_reference", "virtual_account_number", "user_name",
-            "transaction_type", "status", "principal_amount", "settled_amount",
-            "insureflow_commission", "habari_commission", "transaction_date"
-        ],
-        "message": f"Export would contain {len(transactions)} transactions in {format} format"
-    }
+    media_type, extension, encode = EXPORT_FORMATS[FORMAT_ALIASES.get(format, format)]
+
+    def rows():
+        # Own session: the stream outlives the request's dependencies
+        db = open_read_session()
+        try:
+            yield from crud_admin.iter_transaction_export_rows(db, filters)
+        finally:
+            db.close()
+
+    filename = f"transactions_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        encode(crud_admin.EXPORT_COLUMNS, rows()),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/system/health-check")
 def system_health_check(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
@@ -398,6 +427,66 @@ def system_health_check(
         }
 
 
+@router.get("/system/pool-stats")
+def system_pool_stats(
+    current_user: User = Depends(get_current_insureflow_admin)
+):
+    """
+    Database connection pool telemetry: occupancy, overflow, waits and checkout wait times.
+    """
+    pools = get_pool_stats()
+    total_waits = sum(p["waits"] for p in pools.values())
+    total_timeouts = sum(p["timeouts"] for p in pools.values())
+
+    return {
+        "status": "SATURATED" if total_timeouts else "CONTENDED" if total_waits else "HEALTHY",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        },
+        "pools": pools,
+        "replica": replica_monitor.stats(),
+    }
+
+
+@router.get("/system/cache-stats")
+def system_cache_stats(
+    current_user: User = Depends(get_current_insureflow_admin)
+):
+    """
+    Hit/miss counters for the authenticated-user and dashboard response caches.
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+
+@router.get("/system/webhook-inbox")
+def system_webhook_inbox(
+    window_minutes: int = Query(60, ge=1, le=1440),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_insureflow_admin)
+):
+    """
+    Webhook inbox backlog, failures and processing latency.
+    """
+    stats = crud_webhook_event.get_webhook_inbox_stats(db, window_minutes=window_minutes)
+    failed = stats["counts"][WebhookEventStatus.FAILED.value]
+    backlog = stats["oldest_pending_age_seconds"] > settings.WEBHOOK_WORKER_POLL_INTERVAL * 30
+    return {
+        "status": "FAILING" if failed else "BACKLOGGED" if backlog else "HEALTHY",
+        "timestamp": datetime.utcnow().isoformat(),
+        "workers_running": webhook_worker.running,
+        **stats,
+    }
+
+
 @router.get("/system/audit-log")
 def get_audit_log(
     skip: int = Query(0, ge=0),
@@ -406,7 +495,7 @@ def get_audit_log(
     admin_user_id: Optional[int] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
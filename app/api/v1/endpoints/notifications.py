@@ -3,14 +3,15 @@ API endpoints for broker notification management.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.dependencies import get_current_broker_user
-from app.models.user import User
+from app.core.principal import Principal
+from app.dependencies import get_current_broker_principal
 from app.crud import notification as crud_notification
+from app.crud.pagination import InvalidCursor, next_cursor
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -31,17 +32,19 @@ class NotificationResponse(BaseModel):
 class NotificationSummary(BaseModel):
     total_unread: int
     notifications: List[NotificationResponse]
+    next_cursor: Optional[str] = None
 
 @router.get("/", response_model=NotificationSummary)
 def get_broker_notifications(
     unread_only: bool = False,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_broker_user)
+    current_user: Principal = Depends(get_current_broker_principal)
 ):
     """
-    Get payment reminder notifications for the current broker.
-    Only brokers can access this endpoint.
+    Get payment reminder notifications for the current broker, newest first.
+    Only brokers can access this endpoint. Pass `next_cursor` back as `cursor` for the next page.
     """
     try:
         # Get notifications for this broker
@@ -49,7 +52,8 @@ def get_broker_notifications(
             db=db,
             broker_id=current_user.id,
             unread_only=unread_only,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
         # Get unread count
@@ -74,9 +78,12 @@ def get_broker_notifications(
         
         return NotificationSummary(
             total_unread=unread_count,
-            notifications=notification_responses
+            notifications=notification_responses,
+            next_cursor=next_cursor(notifications, limit)
         )
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching notifications for broker {current_user.id}: {str(e)}")
         raise HTTPException(
@@ -88,7 +95,7 @@ def get_broker_notifications(
 def mark_notification_as_read(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_broker_user)
+    current_user: Principal = Depends(get_current_broker_principal)
 ):
     """
     Mark a notification as read.
@@ -122,7 +129,7 @@ def mark_notification_as_read(
 def dismiss_notification(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_broker_user)
+    current_user: Principal = Depends(get_current_broker_principal)
 ):
     """
     Dismiss a notification (removes it from the list).
@@ -155,7 +162,7 @@ def dismiss_notification(
 @router.get("/unread-count")
 def get_unread_count(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_broker_user)
+    current_user: Principal = Depends(get_current_broker_principal)
 ):
     """
     Get the count of unread notifications for the current broker.
@@ -3,10 +3,11 @@ API endpoints for payment-related operations.
 """
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import json
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_read_db
 from app.dependencies import (
 get_current_broker_or_admin_user, 
 get_current_payment_processor,
@@ -16,28 +17,31 @@ from app.schemas.payment import (
 PaymentInitiationResponse,
 PaymentInitiationRequest,
 BulkPaymentInitiationRequest,
+Payment,
 )
 from app.services import payment_service
 from app.services.squad_co import squad_co_service
-from app.services.virtual_account_service import virtual_account_service
+from app.services.webhook_worker import webhook_worker
 from app.crud import payment as crud_payment
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from app.crud import premium as crud_premium
 from app.crud import user as crud_user
 from app.crud import policy as crud_policy
+from app.crud.aio import webhook_event as async_crud_webhook_event
 from app.models.user import User
 
 router = APIRouter()
 
-from datetime import datetime
-from decimal import Decimal
 
 @router.post("/webhook", status_code=status.HTTP_200_OK)
 async def handle_squad_co_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Handles incoming webhooks from Squad Co for both traditional payments and virtual accounts.
+    The verified event is stored in the webhook inbox and acknowledged at once;
+    the webhook workers apply it in the background.
     """
     squad_signature = request.headers.get("x-squad-signature")
     request_body = await request.body()
@@ -52,82 +56,18 @@ async def handle_squad_co_webhook(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid webhook payload: {e}")
 
-    # Handle successful charge events
     event = payload.get("Event")
-    if event == "charge.success":
-        webhook_data = payload.get("Body", {})
-        transaction_ref = webhook_data.get("transaction_ref")
-        
-        # Extract amount (convert from kobo if needed)
-        amount = webhook_data.get("amount")
-        
-        # Squad usually sends amount in kobo (integer), convert to naira
-        amount_paid = Decimal(str(amount)) / 100 if amount else Decimal("0.00")
-        transaction_date = datetime.now()
+    transaction_ref = payload.get("Body", {}).get("transaction_ref")
+    if event == "charge.success" and not transaction_ref:
+        raise HTTPException(status_code=400, detail="No transaction reference in webhook")
 
-        if not transaction_ref:
-            raise HTTPException(status_code=400, detail="No transaction reference in webhook")
-
-        # Check if this is a virtual account transaction
-        virtual_account_number = webhook_data.get("virtual_account_number")
-        if virtual_account_number:
-            # Process as virtual account transaction
-            result = await virtual_account_service.process_webhook_transaction(db, webhook_data)
-            if "error" in result:
-                raise HTTPException(status_code=400, detail=result["error"])
-        else:
-            # Process as traditional payment
-            # Check if this is a bulk payment
-            metadata = webhook_data.get("meta_data", {})
-            if metadata.get("type") == "bulk_payment" and "premium_ids" in metadata:
-                premium_ids = metadata["premium_ids"]
-                # Calculate amount per premium (simple split for now, ideally track per premium)
-                amount_per_premium = amount_paid / len(premium_ids) if premium_ids else Decimal("0.00")
-                
-                for premium_id in premium_ids:
-                    # Update premium status to paid with amount
-                    crud_premium.update_premium_status_to_paid(
-                        db, 
-                        premium_id=premium_id, 
-                        amount_paid=amount_per_premium,
-                        payment_date=transaction_date
-                    )
-                    
-                    # Create individual payment record for insurance firm dashboard
-                    premium = crud_premium.get_premium(db, premium_id=premium_id)
-                    if premium and premium.policy:
-                        # Create payment record with customer metadata
-                        from app.schemas.payment import PaymentCreate
-                        from app.models.payment import PaymentMethod, PaymentTransactionStatus
-                        
-                        payment_record = crud_payment.create_payment(
-                            db=db,
-                            payment=PaymentCreate(
-                                premium_id=premium_id,
-                                amount_paid=amount_per_premium, # Use actual paid amount
-                                payment_method=PaymentMethod.BANK_TRANSFER,
-                                transaction_reference=transaction_ref,
-                                status=PaymentTransactionStatus.SUCCESS,
-                                payer_email=premium.policy.user.email if premium.policy.user else None
-                            )
-                        )
-            else:
-                # Handle single payment - find the premium by transaction ref
-                payment = crud_payment.get_payment_by_transaction_ref(db, transaction_ref=transaction_ref)
-                if payment and payment.premium_id:
-                    # Update premium with actual amount paid
-                    crud_premium.update_premium_status_to_paid(
-                        db, 
-                        premium_id=payment.premium_id,
-                        amount_paid=amount_paid,
-                        payment_date=transaction_date
-                    )
-                    
-                    # Update payment record with actual amount if it differs
-                    if payment.amount_paid != amount_paid:
-                        payment.amount_paid = amount_paid
-                        db.add(payment)
-                        db.commit()
+    await async_crud_webhook_event.create_webhook_event(
+        db,
+        payload=request_body.decode('utf-8'),
+        event_type=event,
+        transaction_reference=transaction_ref
+    )
+    webhook_worker.notify()
 
     # Acknowledge receipt of the webhook
     return {"status": "success"}
@@ -135,7 +75,7 @@ async def handle_squad_co_webhook(
 @router.post("/bulk-initiate", response_model=PaymentInitiationResponse)
 async def initiate_bulk_policy_payment(
     request: BulkPaymentInitiationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_payment_processor)
 ):
     """
@@ -227,28 +167,40 @@ async def test_payment_initiation(
             "message": "Payment initiation failed"
         }
 
-@router.get("/history")
+@router.get("/history", response_model=List[Payment])
 def get_payment_history(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     status_filter: str = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get payment history for the current user.
+    Get payment history for the current user, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     filters = {}
     if status_filter:
         filters['status'] = status_filter
 
-    if current_user.can_perform_admin_actions:
-        # Admin sees all payments
-        payments = crud_payment.get_payments(db, skip=skip, limit=limit, filters=filters)
-    else:
-        # Users see only their own payments
-        payments = crud_payment.get_payments_by_user(db, user_id=current_user.id, skip=skip, limit=limit, filters=filters)
+    try:
+        if current_user.can_perform_admin_actions:
+            # Admin sees all payments
+            payments = crud_payment.get_payments(db, skip=skip, limit=limit, filters=filters, cursor=cursor)
+        else:
+            # Users see only their own payments
+            payments = crud_payment.get_payments_by_user(
+                db, user_id=current_user.id, skip=skip, limit=limit, filters=filters, cursor=cursor
+            )
+    except ValueError as e:
+        # Bad cursor or unknown status filter
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    page_cursor = next_cursor(payments, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
     return payments
 
 @router.get("/statistics")
@@ -293,23 +245,34 @@ async def initiate_individual_payment(
             detail=f"Payment initiation failed: {str(e)}"
         )
 
-@router.get("/pending")
+@router.get("/pending", response_model=List[Payment])
 def get_pending_payments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
-    Get all pending payments.
+    Get all pending payments, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    if current_user.can_perform_admin_actions:
-        # Admin sees all pending payments
-        payments = crud_payment.get_pending_payments(db, skip=skip, limit=limit)
-    else:
-        # Others see only their own pending payments
-        payments = crud_payment.get_pending_payments_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    try:
+        if current_user.can_perform_admin_actions:
+            # Admin sees all pending payments
+            payments = crud_payment.get_pending_payments(db, skip=skip, limit=limit, cursor=cursor)
+        else:
+            # Others see only their own pending payments
+            payments = crud_payment.get_pending_payments_by_user(
+                db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+            )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+    page_cursor = next_cursor(payments, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
     return payments
 
 @router.post("/retry/{payment_id}")
@@ -1,12 +1,17 @@
 """
 API endpoints for policy management.
 """
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db, get_read_db
 from app.crud import policy as policy_crud
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+from app.crud.aio import policy as async_policy_crud
+from app.crud.aio import virtual_account as async_virtual_account_crud
 from app.dependencies import (
     get_current_broker_or_admin_user, 
     get_current_policy_creator,
@@ -19,7 +24,6 @@ from app.schemas.virtual_account import PaymentSimulationResponse
 from app.services.virtual_account_service import virtual_account_service
 from app.services.squad_co import squad_co_service
 from app.models.policy import Policy as PolicyModel
-from app.models.virtual_account import VirtualAccount as VirtualAccountModel
 from app.models.company import InsuranceCompany
 
 router = APIRouter()
@@ -27,7 +31,7 @@ router = APIRouter()
 @router.post("/", response_model=Policy, status_code=status.HTTP_201_CREATED)
 async def create_policy(
     policy: PolicyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_policy_creator)
 ):
     """
@@ -67,14 +71,14 @@ async def create_policy(
     # Find a default insurance company for the policy
     # For ADMIN user, just pick the first one.
     # For INSURANCE_ADMIN, ideally pick their company (if we had the link).
-    company = db.query(InsuranceCompany).first()
+    company = (await db.execute(select(InsuranceCompany).limit(1))).scalars().first()
     if not company:
         # Handle case where no company exists (maybe create dummy?)
         # Or just raise error
         raise HTTPException(status_code=400, detail="No insurance company found to assign policy to.")
     
     # Call CRUD with explicit IDs
-    new_policy = policy_crud.create_policy(
+    new_policy = await async_policy_crud.create_policy(
         db=db, 
         policy=policy, 
         user_id=current_user.id, 
@@ -90,30 +94,40 @@ async def create_policy(
 
 @router.get("/", response_model=List[PolicySummary])
 def get_policies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     policy_type: str = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
-    Get policies. Broker or Admin only.
+    Get policies, newest first. Broker or Admin only.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     # Check user role and filter policies accordingly
-    if current_user.role == UserRole.BROKER:
-        if current_user.broker_profile:
-            policies = policy_crud.get_policies_by_broker(
-                db, broker_id=current_user.broker_profile.id, skip=skip, limit=limit
-            )
+    try:
+        if current_user.role == UserRole.BROKER:
+            if current_user.broker_profile:
+                policies = policy_crud.get_policies_by_broker(
+                    db, broker_id=current_user.broker_profile.id, skip=skip, limit=limit, cursor=cursor
+                )
+            else:
+                # If for some reason a broker user has no profile, return empty list
+                policies = []
+        elif current_user.can_perform_admin_actions:
+            # Admin can see all policies
+            policies = policy_crud.get_policies(db, skip=skip, limit=limit, cursor=cursor)
         else:
-            # If for some reason a broker user has no profile, return empty list
+            # Fallback for unexpected roles
             policies = []
-    elif current_user.can_perform_admin_actions:
-        # Admin can see all policies
-        policies = policy_crud.get_policies(db, skip=skip, limit=limit)
-    else:
-        # Fallback for unexpected roles
-        policies = []
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    page_cursor = next_cursor(policies, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
 
     if not policies:
         # Return empty list instead of mock data to prevent validation errors
@@ -239,7 +253,7 @@ def search_policies(
     status: str = None,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
@@ -281,17 +295,17 @@ def get_policy_statistics(
     return stats 
 
 @router.post("/{policy_id}/simulate_payment", response_model=Dict[str, Any], tags=["Policies"])
-async def simulate_policy_payment_endpoint(policy_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_payment_processor)):
+async def simulate_policy_payment_endpoint(policy_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_payment_processor)):
     """
     Simulate a payment for a specific policy.
     This is a test endpoint and should only be used in sandbox/development environments.
     """
-    policy = db.query(PolicyModel).filter(PolicyModel.id == policy_id).first()
+    policy = await db.get(PolicyModel, policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
     # Use the current user's ID to find the virtual account
-    virtual_account = db.query(VirtualAccountModel).filter(VirtualAccountModel.user_id == current_user.id).first()
+    virtual_account = await async_virtual_account_crud.get_virtual_account_by_user(db, user_id=current_user.id)
     if not virtual_account:
         raise HTTPException(status_code=404, detail="Virtual account not found for this user")
 
@@ -310,7 +324,7 @@ async def simulate_policy_payment_endpoint(policy_id: int, db: Session = Depends
 @router.get("/{policy_id}/get-or-create-va", response_model=Dict[str, Any], tags=["Policies"])
 async def get_or_create_policy_va(
     policy_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -318,7 +332,7 @@ async def get_or_create_policy_va(
     This endpoint is used by the frontend to populate the 'Pay Now' modal.
     """
     # 1. Find the policy
-    policy = db.query(PolicyModel).filter(PolicyModel.id == policy_id).first()
+    policy = await async_policy_crud.get_policy(db, policy_id=policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
 
@@ -328,7 +342,7 @@ async def get_or_create_policy_va(
         raise HTTPException(status_code=404, detail="User for this policy not found")
 
     # 3. Check for an existing VA for the user
-    existing_va = db.query(VirtualAccountModel).filter(VirtualAccountModel.user_id == user.id).first()
+    existing_va = await async_virtual_account_crud.get_virtual_account_by_user(db, user_id=user.id)
     if existing_va:
         return {
             "success": True,
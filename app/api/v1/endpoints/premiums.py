@@ -1,12 +1,13 @@
 """
 API endpoints for premium management.
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.crud import premium as premium_crud
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from app.dependencies import get_current_broker_or_admin_user
 from app.models.user import User
 from app.schemas.premium import Premium, PremiumCreate, PremiumUpdate
@@ -17,32 +18,42 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Premium])
 def list_premiums(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
-    Retrieve a list of premiums. Broker or Admin only.
+    Retrieve a list of premiums, newest first. Broker or Admin only.
     Brokers see only premiums for their policies. Admins see all premiums.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
     from app.models.user import UserRole
     
     # Check user role and filter premiums accordingly
-    if current_user.role == UserRole.BROKER:
-        if current_user.broker_profile:
-            premiums = premium_crud.get_premiums_by_broker(
-                db, broker_id=current_user.broker_profile.id, skip=skip, limit=limit
-            )
+    try:
+        if current_user.role == UserRole.BROKER:
+            if current_user.broker_profile:
+                premiums = premium_crud.get_premiums_by_broker(
+                    db, broker_id=current_user.broker_profile.id, skip=skip, limit=limit, cursor=cursor
+                )
+            else:
+                # If for some reason a broker user has no profile, return empty list
+                premiums = []
+        elif current_user.can_perform_admin_actions:
+            # Admin can see all premiums
+            premiums = premium_crud.get_premiums(db, skip=skip, limit=limit, cursor=cursor)
         else:
-            # If for some reason a broker user has no profile, return empty list
+            # Fallback for unexpected roles
             premiums = []
-    elif current_user.can_perform_admin_actions:
-        # Admin can see all premiums
-        premiums = premium_crud.get_premiums(db, skip=skip, limit=limit)
-    else:
-        # Fallback for unexpected roles
-        premiums = []
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    page_cursor = next_cursor(premiums, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
     
     if not premiums:
         # Return empty list instead of mock data to prevent validation errors
@@ -5,13 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
 
 from app.core.database import get_db
 from app.dependencies import get_current_admin_user  # Admin-only now
 from app.models.user import User
-from app.crud import notification as crud_notification
+from app.services.notification_service import run_payment_reminders
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,10 +18,12 @@ logger = logging.getLogger(__name__)
 class AutoReminderRequest(BaseModel):
     max_days_overdue: Optional[int] = 30
     reminder_cooldown_hours: Optional[int] = 24
+    sample_size: int = Field(20, ge=0, le=500)  # reminders listed in the response
 
 class ManualReminderRequest(BaseModel):
     broker_ids: Optional[List[int]] = None
     policy_ids: Optional[List[int]] = None
+    sample_size: int = Field(20, ge=0, le=500)
 
 class ReminderResponse(BaseModel):
     message: str
@@ -45,80 +46,24 @@ def send_automatic_payment_reminders(
     - Skips policies that had reminders sent recently (24h cooldown)
     - Creates notifications in broker dashboards
     - Updates reminder_sent_at timestamps
+    - Returns up to `sample_size` of the reminders sent
     """
     try:
         logger.info(f"Admin {current_user.email} initiating automatic payment reminders")
         
-        # Get overdue policies that need reminders
-        overdue_policies = crud_notification.get_overdue_policies_without_recent_reminders(
-            db=db,
+        result = run_payment_reminders(
+            db,
             max_days_overdue=request.max_days_overdue,
-            reminder_cooldown_hours=request.reminder_cooldown_hours
+            reminder_cooldown_hours=request.reminder_cooldown_hours,
+            sample_size=request.sample_size
         )
-        
-        if not overdue_policies:
-            return ReminderResponse(
-                message="No overdue policies found that need reminders",
-                notifications_created=0,
-                brokers_notified=0,
-                policies_processed=0,
-                reminders_sent=[]
-            )
-        
-        notifications_created = 0
-        brokers_notified = set()
-        reminders_sent = []
-        
-        for policy, broker, customer, days_overdue, outstanding_amount in overdue_policies:
-            try:
-                # Create notification for the broker
-                notification = crud_notification.create_payment_reminder_notification(
-                    db=db,
-                    broker_id=broker.user_id,  # Broker's user ID
-                    policy_id=policy.id,
-                    outstanding_amount=outstanding_amount,
-                    days_overdue=days_overdue,
-                    policy_number=policy.policy_number,
-                    customer_name=customer.full_name
-                )
-                
-                # Update policy reminder timestamp
-                policy.reminder_sent_at = datetime.utcnow()
-                db.add(policy)
-                
-                notifications_created += 1
-                brokers_notified.add(broker.user_id)
-                
-                reminders_sent.append({
-                    "policy_id": policy.id,
-                    "policy_number": policy.policy_number,
-                    "broker_name": broker.name,
-                    "customer_name": customer.full_name,
-                    "outstanding_amount": outstanding_amount,
-                    "days_overdue": days_overdue,
-                    "notification_id": notification.id,
-                    "sent_at": datetime.utcnow().isoformat()
-                })
-                
-                logger.info(f"Created reminder notification for policy {policy.policy_number} -> broker {broker.name}")
-                
-            except Exception as e:
-                logger.error(f"Error creating reminder for policy {policy.id}: {str(e)}")
-                continue
-        
-        # Commit all changes
-        db.commit()
-        
-        success_message = f"Created {notifications_created} payment reminder notifications for {len(brokers_notified)} brokers"
+
+        if not result["notifications_created"]:
+            return ReminderResponse(message="No overdue policies found that need reminders", **result)
+
+        success_message = f"Created {result['notifications_created']} payment reminder notifications for {result['brokers_notified']} brokers"
         logger.info(f"AUTOMATIC REMINDERS: {success_message}")
-        
-        return ReminderResponse(
-            message=success_message,
-            notifications_created=notifications_created,
-            brokers_notified=len(brokers_notified),
-            policies_processed=len(overdue_policies),
-            reminders_sent=reminders_sent
-        )
+        return ReminderResponse(message=success_message, **result)
         
     except Exception as e:
         logger.error(f"Unexpected error in send_automatic_payment_reminders: {str(e)}")
@@ -147,72 +92,19 @@ def send_manual_payment_reminders(
                 detail="Either broker_ids or policy_ids must be provided"
             )
 
-        overdue_policies = crud_notification.get_overdue_policies_for_manual_reminders(
-            db=db,
+        result = run_payment_reminders(
+            db,
             broker_ids=request.broker_ids,
-            policy_ids=request.policy_ids
+            policy_ids=request.policy_ids,
+            sample_size=request.sample_size
         )
 
-        if not overdue_policies:
-            return ReminderResponse(
-                message="No overdue policies found for the selected criteria",
-                notifications_created=0,
-                brokers_notified=0,
-                policies_processed=0,
-                reminders_sent=[]
-            )
+        if not result["notifications_created"]:
+            return ReminderResponse(message="No overdue policies found for the selected criteria", **result)
 
-        notifications_created = 0
-        brokers_notified = set()
-        reminders_sent = []
-
-        for policy, broker, customer, days_overdue, outstanding_amount in overdue_policies:
-            try:
-                notification = crud_notification.create_payment_reminder_notification(
-                    db=db,
-                    broker_id=broker.user_id,
-                    policy_id=policy.id,
-                    outstanding_amount=outstanding_amount,
-                    days_overdue=days_overdue,
-                    policy_number=policy.policy_number,
-                    customer_name=customer.full_name
-                )
-
-                policy.reminder_sent_at = datetime.utcnow()
-                db.add(policy)
-
-                notifications_created += 1
-                brokers_notified.add(broker.user_id)
-
-                reminders_sent.append({
-                    "policy_id": policy.id,
-                    "policy_number": policy.policy_number,
-                    "broker_name": broker.name,
-                    "customer_name": customer.full_name,
-                    "outstanding_amount": outstanding_amount,
-                    "days_overdue": days_overdue,
-                    "notification_id": notification.id,
-                    "sent_at": datetime.utcnow().isoformat()
-                })
-
-                logger.info(f"Created manual reminder for policy {policy.policy_number} -> broker {broker.name}")
-
-            except Exception as e:
-                logger.error(f"Error creating manual reminder for policy {policy.id}: {str(e)}")
-                continue
-
-        db.commit()
-
-        success_message = f"Created {notifications_created} manual payment reminder notifications for {len(brokers_notified)} brokers"
+        success_message = f"Created {result['notifications_created']} manual payment reminder notifications for {result['brokers_notified']} brokers"
         logger.info(f"MANUAL REMINDERS: {success_message}")
-
-        return ReminderResponse(
-            message=success_message,
-            notifications_created=notifications_created,
-            brokers_notified=len(brokers_notified),
-            policies_processed=len(overdue_policies),
-            reminders_sent=reminders_sent
-        )
+        return ReminderResponse(message=success_message, **result)
 
     except HTTPException:
         raise
@@ -1,7 +1,7 @@
 """
 API endpoints for support ticket management.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
@@ -10,6 +10,7 @@ from app.core.database import get_db
 from app.dependencies import get_current_broker_user, get_current_insureflow_admin, get_current_active_user
 from app.models.user import User
 from app.crud import support_ticket as crud_support_ticket
+from app.crud.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 from app.schemas import support_ticket as schemas_support_ticket
 
 router = APIRouter()
@@ -158,16 +159,18 @@ def get_ticket_by_id(
 # Admin endpoints
 @router.get("/admin/tickets", response_model=List[schemas_support_ticket.SupportTicketResponse])
 def get_all_tickets(
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by status"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     category: Optional[str] = Query(None, description="Filter by category"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_insureflow_admin)
 ):
     """
-    Get all support tickets (admin only).
+    Get all support tickets (admin only), newest first.
     Admins can filter by status, priority, and category.
     """
     try:
@@ -177,9 +180,14 @@ def get_all_tickets(
             priority=priority,
             category=category,
             skip=skip,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
         
+        page_cursor = next_cursor(tickets, limit)
+        if page_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page_cursor
+        
         return [
             schemas_support_ticket.SupportTicketResponse(
                 id=ticket.id,
@@ -198,6 +206,8 @@ def get_all_tickets(
             for ticket in tickets
         ]
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching all tickets: {str(e)}")
         raise HTTPException(
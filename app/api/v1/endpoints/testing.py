@@ -4,15 +4,15 @@ Provides comprehensive logging and real-time feedback for dashboard testing.
 """
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 import time
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.dependencies import get_current_broker_or_admin_user
 from app.models.user import User
-from app.crud import user as crud_user, premium as crud_premium, virtual_account as crud_virtual_account, policy as crud_policy
+from app.crud.aio import premium as crud_premium, virtual_account as crud_virtual_account
 from app.schemas.testing import (
     TestVAAccountCreationRequest, 
     TestVAFundingRequest, 
@@ -33,7 +33,7 @@ def generate_unique_transaction_ref(policy_id: int, premium_id: int) -> str:
 @router.post("/simulate-payment", response_model=dict, tags=["Testing"])
 async def simulate_payment(
     request: SimulatePaymentRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
@@ -45,7 +45,7 @@ async def simulate_payment(
     """
     logger.info(f"--- 🧪 Test: Simulating full payment flow for Premium ID: {request.premium_id} ---")
 
-    premium = crud_premium.get_premium(db, premium_id=request.premium_id)
+    premium = await crud_premium.get_premium(db, premium_id=request.premium_id)
     if not premium:
         raise HTTPException(status_code=404, detail="Premium not found")
 
@@ -56,7 +56,7 @@ async def simulate_payment(
         user = premium.policy.user
         
         # Step 1: Get or create a virtual account for the user.
-        user_va = crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
+        user_va = await crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
         if not user_va:
             logger.warning(f"No VA found for user {user.id}. Creating one...")
             va_creation_result = await virtual_account_service.create_individual_virtual_account(
@@ -71,7 +71,7 @@ async def simulate_payment(
                 raise HTTPException(status_code=500, detail=error_msg)
             
             if va_creation_result.get("success"):
-                user_va = crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
+                user_va = await crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
             else:
                 error_msg = f"Failed to create VA for user {user.id}: {va_creation_result.get('error', 'Unknown error')}"
                 logger.error(error_msg)
@@ -178,12 +178,12 @@ async def simulate_payment(
 @router.post("/test-create-va", response_model=dict, tags=["Testing"])
 async def test_create_va(
     request: TestVAAccountCreationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Creates a virtual account for a specific user."""
     logger.info(f"--- 🧪 Test: Create VA for User ID: {request.user_id} ---")
     try:
-        user = crud_user.get_user_by_id(db, user_id=request.user_id)
+        user = await db.get(User, request.user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
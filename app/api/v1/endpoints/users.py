@@ -4,13 +4,14 @@ API endpoints for user management.
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
 import secrets
 import string
 from redis.asyncio import Redis
 
 from app import crud, schemas
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.cache import get_redis_client
 from app.dependencies import get_current_admin_user, get_current_active_user, get_current_insurance_admin, get_current_broker_or_admin_user
 from app.models.user import User, UserRole
@@ -166,6 +167,7 @@ def generate_strong_password(length: int = 12) -> str:
 async def create_broker_user_with_virtual_account(
     *,
     db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
     user_data: schemas.BrokerUserCreate,
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
@@ -232,7 +234,7 @@ async def create_broker_user_with_virtual_account(
         
         # Create virtual account
         virtual_account_result = await virtual_account_service.create_individual_virtual_account(
-            db=db,
+            db=async_db,
             user=new_user
         )
         
@@ -4,18 +4,21 @@ API endpoints for virtual account management.
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.dependencies import get_current_active_user, get_current_broker_or_admin_user
 from app.models.user import User
+from app.models.virtual_account import VirtualAccountStatus
 from app.schemas.virtual_account import (
-    VirtualAccount, VirtualAccountSummary, VirtualAccountUpdate,
+    VirtualAccount, VirtualAccountSummary, VirtualAccountLatestTransaction, VirtualAccountUpdate,
     IndividualVirtualAccountCreate, BusinessVirtualAccountCreate,
     VirtualAccountTransaction, PaymentSimulationRequest, PaymentSimulationResponse,
     BrokerPerformanceMetrics, CommissionSummary
 )
 from app.services.virtual_account_service import virtual_account_service
 from app.crud import virtual_account as crud_virtual_account
+from app.crud.aio import virtual_account as async_crud_virtual_account
 import json
 
 router = APIRouter()
@@ -23,14 +26,14 @@ router = APIRouter()
 @router.post("/individual", response_model=VirtualAccount, status_code=status.HTTP_201_CREATED)
 async def create_individual_virtual_account(
     account_data: IndividualVirtualAccountCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create an individual virtual account for the current user.
     """
     # Check if user already has a virtual account
-    existing_accounts = crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
+    existing_accounts = await async_crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
     if existing_accounts:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,14 +57,14 @@ async def create_individual_virtual_account(
 @router.post("/business", response_model=VirtualAccount, status_code=status.HTTP_201_CREATED)
 async def create_business_virtual_account(
     account_data: BusinessVirtualAccountCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Create a business virtual account for the current user.
     """
     # Check if user already has a virtual account
-    existing_accounts = crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
+    existing_accounts = await async_crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
     if existing_accounts:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -91,16 +94,27 @@ def list_virtual_accounts(
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
-    List virtual accounts. Admin users see all, brokers see only their own.
+    List virtual accounts. Admin users see all active accounts, brokers see only their own.
+    Each account carries its latest transaction, fetched in the same query.
     """
     if current_user.can_perform_admin_actions:
         # Admin users can see all virtual accounts
-        accounts = crud_virtual_account.get_active_virtual_accounts(db, skip=skip, limit=limit)
+        rows = crud_virtual_account.get_virtual_accounts_with_latest_transaction(
+            db, status=VirtualAccountStatus.ACTIVE, skip=skip, limit=limit
+        )
     else:
         # Brokers can only see their own virtual accounts
-        accounts = crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
+        rows = crud_virtual_account.get_virtual_accounts_with_latest_transaction(
+            db, user_id=current_user.id, skip=skip, limit=limit
+        )
     
-    return accounts
+    summaries = []
+    for account, latest_transaction in rows:
+        summary = VirtualAccountSummary.model_validate(account)
+        if latest_transaction:
+            summary.last_transaction = VirtualAccountLatestTransaction.model_validate(latest_transaction)
+        summaries.append(summary)
+    return summaries
 
 @router.get("/me", response_model=List[VirtualAccount])
 def get_my_virtual_accounts(
@@ -186,7 +200,7 @@ def get_virtual_account_transactions(
 @router.post("/webhook", status_code=status.HTTP_200_OK)
 async def handle_virtual_account_webhook(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Handle incoming webhooks from Squad Co for virtual account transactions.
@@ -199,7 +213,7 @@ async def handle_virtual_account_webhook(
         payload = json.loads(request_body.decode('utf-8'))
         
         # Process the webhook
-        result = virtual_account_service.process_webhook_transaction(db, payload)
+        result = await virtual_account_service.process_webhook_transaction(db, payload)
         
         if "error" in result:
             raise HTTPException(
@@ -222,7 +236,7 @@ async def handle_virtual_account_webhook(
 
 @router.post("/create-test-account", response_model=VirtualAccount)
 async def create_test_virtual_account(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_broker_or_admin_user)
 ):
     """
@@ -230,7 +244,7 @@ async def create_test_virtual_account(
     """
     try:
         # Check if user already has a virtual account
-        existing_accounts = crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
+        existing_accounts = await async_crud_virtual_account.get_virtual_accounts_by_user(db, current_user.id)
         if existing_accounts:
             return existing_accounts[0]  # Return existing account
         
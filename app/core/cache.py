@@ -1,13 +1,271 @@
 """
 Redis cache client and utilities.
+Without REDIS_URL, caching falls back to an in-process TTL store.
 """
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
 import redis.asyncio as redis
+from fastapi.encoders import jsonable_encoder
+from redis import Redis as SyncRedis
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
 
-redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """Thread-safe TTL cache with LRU eviction, used when Redis is not configured."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value: str, ex: Optional[float] = None, nx: bool = False) -> bool:
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return False
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+
+class AsyncMemoryCache:
+    """Async facade over MemoryCache covering the redis.asyncio calls the API uses."""
+
+    def __init__(self, cache: MemoryCache):
+        self._cache = cache
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ex: Optional[float] = None, nx: bool = False) -> bool:
+        return self._cache.set(key, value, ex=ex, nx=nx)
+
+    async def delete(self, *keys: str) -> int:
+        return self._cache.delete(*keys)
+
+
+memory_cache = MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+if settings.REDIS_URL:
+    redis_client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    sync_redis_client: Optional[SyncRedis] = SyncRedis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+        socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+    )
+else:
+    logger.warning("REDIS_URL not set - using in-process cache (not shared between workers)")
+    redis_client = AsyncMemoryCache(memory_cache)
+    sync_redis_client = None
 
 async def get_redis_client():
     """
     Dependency to get a Redis client.
     """
-    return redis_client 
\ No newline at end of file
+    return redis_client
+
+
+# Deletes the lock only if it still holds our token, so a slow owner whose
+# lock already expired cannot release a lock another worker now holds.
+_RELEASE_LOCK_LUA = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Striped locks bound memory regardless of how many cache keys exist
+_LOCK_STRIPES = 64
+
+
+class ResponseCache:
+    """
+    Caches JSON-encoded endpoint responses per (endpoint, role, scope).
+    Each namespace carries a generation number; invalidation bumps it so every
+    older entry is orphaned at once and ages out through its TTL.
+    """
+
+    def __init__(self, backend: Optional[SyncRedis], memory: MemoryCache, prefix: str = "insureflow:cache"):
+        self.backend = backend
+        self.memory = memory
+        self.prefix = prefix
+        self._generations: Dict[str, int] = {}
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _incr(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.prefix}:gen:{namespace}"
+
+    def _generation(self, namespace: str) -> int:
+        if self.backend is not None:
+            return int(self.backend.get(self._generation_key(namespace)) or 0)
+        return self._generations.get(namespace, 0)
+
+    def build_key(self, namespace: str, endpoint: str, role: str, scope: str) -> str:
+        generation = self._generation(namespace)
+        return f"{self.prefix}:{namespace}:g{generation}:{endpoint}:{role}:{scope}"
+
+    def _read(self, key: str) -> Optional[str]:
+        if self.backend is not None:
+            return self.backend.get(key)
+        return self.memory.get(key)
+
+    def _write(self, key: str, value: str, ttl: int) -> None:
+        if self.backend is not None:
+            self.backend.set(key, value, ex=ttl)
+        else:
+            self.memory.set(key, value, ex=ttl)
+
+    def _acquire_fill_lock(self, key: str) -> Optional[str]:
+        """Take the cross-worker fill lock; returns its token, or None if another worker holds it."""
+        token = uuid.uuid4().hex
+        lock_ttl = max(1, int(settings.CACHE_LOCK_TIMEOUT))
+        if self.backend.set(f"{key}:lock", token, nx=True, ex=lock_ttl):
+            return token
+        return None
+
+    def _wait_for_fill(self, key: str) -> Optional[str]:
+        """Poll for the value another worker is computing, up to the lock timeout."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            cached = self._read(key)
+            if cached is not None:
+                return cached
+        return None
+
+    def get_or_set(
+        self,
+        endpoint: str,
+        role: str,
+        scope: str,
+        compute: Callable[[], Any],
+        ttl: Optional[int] = None,
+        namespace: str = "dashboard",
+    ) -> Any:
+        """
+        Return the cached response, computing and storing it on a miss.
+        Only one caller per key recomputes; concurrent callers wait for its result.
+        Cache failures never fail the request - the response is computed directly.
+        """
+        if not settings.CACHE_ENABLED:
+            return jsonable_encoder(compute())
+        ttl = ttl or settings.DASHBOARD_CACHE_TTL
+
+        try:
+            key = self.build_key(namespace, endpoint, role, scope)
+            cached = self._read(key)
+        except RedisError as e:
+            self._incr("errors")
+            logger.warning(f"Cache unavailable, computing {endpoint} directly: {e}")
+            return jsonable_encoder(compute())
+
+        if cached is not None:
+            self._incr("hits")
+            return json.loads(cached)
+
+        with self._locks[hash(key) % _LOCK_STRIPES]:
+            token = None
+            try:
+                # Another thread may have filled the entry while we waited
+                cached = self._read(key)
+                if cached is None and self.backend is not None:
+                    token = self._acquire_fill_lock(key)
+                    if token is None:
+                        cached = self._wait_for_fill(key)
+            except RedisError as e:
+                self._incr("errors")
+                logger.warning(f"Cache lock failed for {endpoint}: {e}")
+
+            if cached is not None:
+                self._incr("hits")
+                return json.loads(cached)
+
+            self._incr("misses")
+            try:
+                value = jsonable_encoder(compute())
+                try:
+                    self._write(key, json.dumps(value), ttl)
+                except RedisError as e:
+                    self._incr("errors")
+                    logger.warning(f"Cache write failed for {endpoint}: {e}")
+                return value
+            finally:
+                if token is not None:
+                    try:
+                        self.backend.eval(_RELEASE_LOCK_LUA, 1, f"{key}:lock", token)
+                    except RedisError:
+                        pass
+
+    def invalidate(self, namespace: str = "dashboard", reason: str = "") -> None:
+        """Orphan every cached entry in `namespace` by bumping its generation."""
+        if self.backend is not None:
+            try:
+                self.backend.incr(self._generation_key(namespace))
+            except RedisError as e:
+                self._incr("errors")
+                logger.warning(f"Cache invalidation failed for {namespace}: {e}")
+        with self._stats_lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self.invalidations += 1
+        logger.info(f"🧹 Cache invalidated: {namespace}" + (f" ({reason})" if reason else ""))
+
+    async def ainvalidate(self, namespace: str = "dashboard", reason: str = "") -> None:
+        """Invalidate from async code without blocking the event loop on Redis."""
+        await run_in_threadpool(self.invalidate, namespace, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "redis" if self.backend is not None else "memory",
+                "enabled": settings.CACHE_ENABLED,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+response_cache = ResponseCache(sync_redis_client, memory_cache)
@@ -35,7 +35,28 @@ class Settings(BaseSettings):
         data = info.data if hasattr(info, 'data') else {}
         # return f"postgresql://{data.get('POSTGRES_USER', 'insureflow')}:{data.get('POSTGRES_PASSWORD', 'password')}@{data.get('POSTGRES_SERVER', 'localhost')}:{data.get('POSTGRES_PORT', '5432')}/{data.get('POSTGRES_DB', 'insureflow')}"
         return f"postgresql+psycopg://insureflow:password@db:5432/insureflow"
-    
+
+    # Async driver URL; derived from DATABASE_URL when not set
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool settings (applied to the sync and async engines)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+
+    # Optional read replica for dashboards and analytics
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # route reads to the primary beyond this lag
+    REPLICA_LAG_CHECK_INTERVAL: float = 10.0  # seconds between lag probes
+
+    # Per-request SQL instrumentation
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_QUERY_BUDGET: int = 30  # warn when a request runs more queries than this
+    SQL_TIME_BUDGET_MS: float = 500.0  # warn when a request spends longer in the DB
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # repeats of one SELECT shape flagged as N+1
+
     @property
     def jwt_secret(self) -> str:
         """Get JWT secret key, preferring JWT_SECRET_KEY over SECRET_KEY"""
@@ -50,6 +71,19 @@ class Settings(BaseSettings):
     # Redis settings
     REDIS_URL: Optional[str] = None
 
+    # Response caching (Redis when configured, otherwise in-process)
+    CACHE_ENABLED: bool = True
+    DASHBOARD_CACHE_TTL: int = 60  # seconds a cached dashboard may be served
+    CACHE_LOCK_TIMEOUT: float = 10.0  # seconds one worker may spend refilling an entry
+    CACHE_MAX_ENTRIES: int = 1024  # in-process fallback size
+    CACHE_REDIS_TIMEOUT: float = 0.5  # seconds before a slow Redis is bypassed
+
+    # Authenticated-user cache (skips the user lookup on each request)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL: int = 30  # seconds; bounds staleness for workers without Redis
+    USER_CACHE_MAX_ENTRIES: int = 2048
+    USER_CACHE_SHARED: bool = True  # share through Redis when REDIS_URL is set
+
     # CORS
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = [
         "http://localhost",
@@ -62,13 +96,25 @@ class Settings(BaseSettings):
     SQUAD_PUBLIC_KEY: str = ""  # Will be read from environment
     SQUAD_BASE_URL: str = "https://sandbox-api-d.squadco.com"  # Default to sandbox
     SQUAD_WEBHOOK_URL: str = "https://insureflow.tech/api/v1/payments/webhook"
-    
+    SQUAD_TIMEOUT: float = 20.0  # seconds for payment/transfer calls
+    SQUAD_VERIFY_TIMEOUT: float = 10.0  # seconds for verification lookups
+
+    # Outbound HTTP client pooling (shared by Squad Co and GAPS)
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0  # seconds an idle connection is kept open
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0  # default when a call does not set its own
+    HTTP_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free pooled connection
+    HTTP2_ENABLED: bool = True  # used only when the h2 package is installed
+
     # GAPS (GTBank Automated Payment System) Configuration
     GAPS_BASE_URL: str = "https://gtweb6.gtbank.com/GSTPS/GAPS_FileUploader/FileUploader.asmx"  # Test URL
     GAPS_ACCESS_CODE: str = ""
     GAPS_USERNAME: str = ""  # GAPS Username (encrypted)
     GAPS_PASSWORD: str = ""  # GAPS Password (encrypted)
     GAPS_CHANNEL: str = ""  # Channel identifier
+    GAPS_TIMEOUT: float = 60.0  # bulk uploads can be slow to acknowledge
     GAPS_PUBLIC_KEY: str = """MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQCrtPgIUBsQscypy+2A2l6oHKlLRTgD4hlrYKW9
 IrAK4ll0FPndJ3i57CioPalYKdNMF9+K4mFaGfT3dAMRSgWWWDeaerHx35VLgdX/wFTN5Zf1QYGe
 WiKyAmCAXoPwtlfvlLqsr9NMBJ3Ua+fFqSC4/6ThhudMlrxNL/ut/kd+pQIDAQAB"""  # Test public key
@@ -84,7 +130,19 @@ WiKyAmCAXoPwtlfvlLqsr9NMBJ3Ua+fFqSC4/6ThhudMlrxNL/ut/kd+pQIDAQAB"""  # Test publ
     HABARI_COMMISSION_RATE: float = 0.25  # 0.25% commission rate
     PLATFORM_COMMISSION_RATE: float = 1.0  # Total platform commission (0.75% + 0.25%)
     AUTO_SETTLEMENT_ENABLED: bool = True  # Enable automatic settlements
+
+    # Webhook inbox workers
+    WEBHOOK_WORKERS_ENABLED: bool = True  # drain the inbox inside the API process
+    WEBHOOK_WORKER_CONCURRENCY: int = 4  # events processed at once per process
+    WEBHOOK_WORKER_POLL_INTERVAL: float = 2.0  # seconds between polls when idle
+    WEBHOOK_MAX_ATTEMPTS: int = 8  # then the event is left as failed
+    WEBHOOK_RETRY_BASE_DELAY: float = 5.0  # seconds, doubled per attempt
+    WEBHOOK_RETRY_MAX_DELAY: float = 3600.0
+    WEBHOOK_CLAIM_TIMEOUT: float = 600.0  # seconds before a claimed event from a dead worker is retried
     SETTLEMENT_THRESHOLD: float = 10000.0  # Minimum amount for settlement (₦10,000)
+
+    # Payment reminders
+    REMINDER_CHUNK_SIZE: int = 5000  # policy ids per reminder INSERT/UPDATE, each committed on its own
     
     # API Keys for AI features
     OPENAI_API_KEY: Optional[str] = None
@@ -1,27 +1,102 @@
 """
 Database configuration for InsureFlow.
 """
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.db_pool import (
+    PoolMetrics,
+    attach_pool_listeners,
+    instrumented_pool_class,
+    pool_metrics,
+    pool_options,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _async_database_url(url: str) -> str:
+    """
+    Map the configured sync database URL onto its async driver.
+    psycopg 3 serves both modes; SQLite needs aiosqlite.
+    """
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
+    return url
+
+
+DATABASE_URL = settings.DATABASE_URL or "sqlite:///./insureflow.db"
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or _async_database_url(DATABASE_URL)
 
 # Create database engine
 # For SQLite, we need to enable foreign key constraints
-if settings.DATABASE_URL and "sqlite" in settings.DATABASE_URL:
+sync_pool_metrics = pool_metrics["primary"] = PoolMetrics("primary")
+async_pool_metrics = pool_metrics["primary_async"] = PoolMetrics("primary_async")
+
+if "sqlite" in DATABASE_URL:
     engine = create_engine(
-        settings.DATABASE_URL,
+        DATABASE_URL,
         connect_args={"check_same_thread": False},  # Needed for SQLite
         echo=False  # Set to True for SQL query logging
     )
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
 else:
     engine = create_engine(
-        settings.DATABASE_URL or "sqlite:///./insureflow.db",
-        echo=False
+        DATABASE_URL,
+        echo=False,
+        poolclass=instrumented_pool_class(QueuePool, sync_pool_metrics),
+        **pool_options()
     )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+        **pool_options()
+    )
+
+attach_pool_listeners(engine, sync_pool_metrics)
+attach_pool_listeners(async_engine.sync_engine, async_pool_metrics)
+
+# Optional read replica; analytics fall back to the primary without it
+replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    replica_pool_metrics = pool_metrics["replica"] = PoolMetrics("replica")
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=False,
+        poolclass=instrumented_pool_class(QueuePool, replica_pool_metrics),
+        **pool_options()
+    )
+    attach_pool_listeners(replica_engine, replica_pool_metrics)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None else None
+)
+
+# Async sessions keep attributes loaded after commit so results can be
+# serialized without triggering lazy loads outside the event loop.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Create Base class for declarative models
 Base = declarative_base()
@@ -36,9 +111,149 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency to get an async database session for event-loop endpoints.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Requests carrying this header (or with request.state.read_your_writes set)
+# read from the primary so they observe their own just-committed writes.
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+# Lag is zero when the replica has replayed everything it received, which
+# keeps an idle primary from looking like a lagging replica.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaLagMonitor:
+    """
+    Periodically probes replica lag and decides whether reads may use it.
+    Probes are rate-limited so request handling rarely pays for them.
+    """
+
+    def __init__(self, max_lag: float, interval: float):
+        self.max_lag = max_lag
+        self.interval = interval
+        self.lag_seconds: Optional[float] = None
+        self.healthy = False
+        self.checked_at = 0.0
+        self.last_error: Optional[str] = None
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+        self._lock = threading.Lock()
+
+    def _probe(self) -> None:
+        try:
+            with replica_engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    conn.execute(text("SELECT 1"))
+                    lag = 0.0
+            self.lag_seconds = lag
+            self.healthy = lag <= self.max_lag
+            self.last_error = None
+            if not self.healthy:
+                logger.warning(f"Replica lag {lag:.1f}s exceeds {self.max_lag}s - reading from primary")
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)
+            logger.warning(f"Replica lag probe failed, reading from primary: {e}")
+
+    def replica_available(self) -> bool:
+        if replica_engine is None:
+            return False
+        now = time.monotonic()
+        if now - self.checked_at >= self.interval and self._lock.acquire(blocking=False):
+            try:
+                self.checked_at = now
+                self._probe()
+            finally:
+                self._lock.release()
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {
+            "configured": replica_engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag,
+            "last_error": self.last_error,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+replica_monitor = ReplicaLagMonitor(
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+)
+
+
+def wants_read_your_writes(request: Request) -> bool:
+    """Whether this request asked to read from the primary."""
+    if getattr(request.state, "read_your_writes", False):
+        return True
+    return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
+
+def get_read_db(request: Request):
+    """
+    Dependency to get a session for read-only endpoints.
+    Uses the replica when configured and fresh, otherwise the primary.
+    """
+    use_replica = (
+        ReadSessionLocal is not None
+        and not wants_read_your_writes(request)
+        and replica_monitor.replica_available()
+    )
+    if use_replica:
+        replica_monitor.replica_reads += 1
+        db = ReadSessionLocal()
+    else:
+        if ReadSessionLocal is not None:
+            replica_monitor.primary_fallbacks += 1
+        db = SessionLocal()
+    request.state.db_route = "replica" if use_replica else "primary"
+    try:
+        yield db
+    finally:
+        db.close()
+
+def open_read_session():
+    """
+    Session on the replica when configured and fresh, otherwise the primary.
+    For work that outlives the request, like streamed exports; the caller closes it.
+    """
+    if ReadSessionLocal is not None and replica_monitor.replica_available():
+        replica_monitor.replica_reads += 1
+        return ReadSessionLocal()
+    if ReadSessionLocal is not None:
+        replica_monitor.primary_fallbacks += 1
+    return SessionLocal()
+
+def get_pool_stats():
+    """
+    Snapshot of connection pool occupancy and checkout telemetry per engine.
+    """
+    stats = {
+        "primary": sync_pool_metrics.snapshot(engine.pool),
+        "primary_async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
+    if replica_engine is not None:
+        stats["replica"] = pool_metrics["replica"].snapshot(replica_engine.pool)
+    return stats
+
 def create_tables():
     """
     Create all tables in the database.
     This is typically done via Alembic migrations in production.
     """
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Connection pool configuration and telemetry for InsureFlow.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.config import settings
+
+# Upper bounds (milliseconds) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Thread-safe counters and wait-time histogram for one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.waits = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_sum_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_acquire(self, elapsed: float, exhausted: bool, timed_out: bool = False) -> None:
+        """Record how long a caller spent acquiring a connection."""
+        elapsed_ms = elapsed * 1000
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            self.wait_buckets[index] += 1
+            if exhausted:
+                self.waits += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def histogram(self) -> Dict[str, int]:
+        """Cumulative histogram in the Prometheus `le` style."""
+        result = {}
+        running = 0
+        for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets):
+            running += count
+            result[f"le_{bound}ms"] = running
+        result["le_inf"] = running + self.wait_buckets[-1]
+        return result
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_time_ms": {
+                    "count": self.wait_count,
+                    "sum": round(self.wait_sum_ms, 3),
+                    "avg": round(self.wait_sum_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "max": round(self.wait_max_ms, 3),
+                    "histogram": self.histogram(),
+                },
+            }
+        if pool is not None:
+            data["pool"] = pool_status(pool)
+        return data
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Live occupancy figures reported by the pool itself."""
+    status: Dict[str, Any] = {"class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    return status
+
+
+def instrumented_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """
+    Build a QueuePool subclass that times every connection checkout.
+    The subclass survives pool.recreate(), so engine.dispose() keeps the metrics.
+    """
+
+    def _do_get(self):
+        exhausted = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_acquire(time.perf_counter() - start, exhausted, timed_out=True)
+            raise
+        metrics.record_acquire(time.perf_counter() - start, exhausted)
+        return connection
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def pool_options() -> Dict[str, Any]:
+    """Engine keyword arguments for QueuePool-backed (non-SQLite) engines."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def attach_pool_listeners(engine, metrics: PoolMetrics) -> None:
+    """Count checkouts, checkins, new connections and invalidations."""
+    event.listen(engine, "connect", lambda *args: metrics.incr("connects"))
+    event.listen(engine, "checkout", lambda *args: metrics.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *args: metrics.incr("checkins"))
+    event.listen(engine, "invalidate", lambda *args: metrics.incr("invalidations"))
+
+
+# Registry of instrumented engines, reported by the admin pool-stats endpoint
+pool_metrics: Dict[str, PoolMetrics] = {}
@@ -0,0 +1,84 @@
+"""
+Shared outbound HTTP clients for InsureFlow.
+One long-lived httpx.AsyncClient per upstream keeps TCP/TLS connections
+alive between payment and settlement calls instead of reconnecting each time.
+"""
+import asyncio
+import importlib.util
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def upstream_timeout(read: float, connect: Optional[float] = None) -> httpx.Timeout:
+    """Per-call timeout: fail fast on connect, allow `read` seconds for the upstream to answer."""
+    return httpx.Timeout(
+        read,
+        connect=connect if connect is not None else settings.HTTP_CONNECT_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT,
+    )
+
+
+class UpstreamClients:
+    """
+    Registry of pooled async clients, keyed by upstream name.
+    Clients are created lazily and closed by the application lifespan.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, Optional[asyncio.AbstractEventLoop]]] = {}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        logger.info(f"🌐 Opening pooled HTTP client for {name} (http2={http2})")
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=upstream_timeout(settings.HTTP_READ_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for `name`, opening it on first use."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.get(name)
+        # Pooled connections belong to the loop that opened them; scripts that
+        # call asyncio.run() repeatedly get a fresh client per loop.
+        if entry is None or entry[0].is_closed or (entry[1] is not None and entry[1] is not loop):
+            entry = (self._build(name), loop)
+            self._clients[name] = entry
+        return entry[0]
+
+    async def aclose(self) -> None:
+        """Close every open client; called on application shutdown."""
+        clients, self._clients = self._clients, {}
+        for name, (client, _) in clients.items():
+            if not client.is_closed:
+                await client.aclose()
+                logger.info(f"🌐 Closed pooled HTTP client for {name}")
+
+
+http_clients = UpstreamClients()
+
+
+def squad_client() -> httpx.AsyncClient:
+    return http_clients.get("squad")
+
+
+def gaps_client() -> httpx.AsyncClient:
+    return http_clients.get("gaps")
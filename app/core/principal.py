@@ -0,0 +1,90 @@
+"""
+Token principal for InsureFlow.
+Identity and permissions carried in signed JWT claims, so authorization
+checks do not need to load the User row.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.models.user import ADMIN_ROLES, BROKER_ROLES, INSURANCE_ROLES, User, UserRole
+
+PERM_CREATE_POLICIES = "create_policies"
+PERM_MAKE_PAYMENTS = "make_payments"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller as described by its access token."""
+
+    id: int
+    email: str
+    role: UserRole
+    broker_id: Optional[int] = None
+    company_id: Optional[int] = None
+    can_create_policies: bool = False
+    can_make_payments: bool = False
+    token_version: int = 0
+
+    @property
+    def is_insurance_user(self) -> bool:
+        return self.role in INSURANCE_ROLES
+
+    @property
+    def is_broker_user(self) -> bool:
+        return self.role in BROKER_ROLES
+
+    @property
+    def can_perform_admin_actions(self) -> bool:
+        return self.role in ADMIN_ROLES
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        broker = user.broker_profile
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            broker_id=broker.id if broker else None,
+            company_id=broker.company_id if broker else None,
+            can_create_policies=bool(user.can_create_policies),
+            can_make_payments=bool(user.can_make_payments),
+            token_version=user.token_version or 0,
+        )
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> Optional["Principal"]:
+        """Build from decoded claims; None for tokens issued before claims were embedded."""
+        if "uid" not in claims or "role" not in claims or "ver" not in claims:
+            return None
+        perms = set(claims.get("perms") or [])
+        return cls(
+            id=int(claims["uid"]),
+            email=claims["sub"],
+            role=UserRole(claims["role"]),
+            broker_id=claims.get("broker_id"),
+            company_id=claims.get("company_id"),
+            can_create_policies=PERM_CREATE_POLICIES in perms,
+            can_make_payments=PERM_MAKE_PAYMENTS in perms,
+            token_version=int(claims["ver"]),
+        )
+
+    def to_claims(self) -> Dict[str, Any]:
+        perms = []
+        if self.can_create_policies:
+            perms.append(PERM_CREATE_POLICIES)
+        if self.can_make_payments:
+            perms.append(PERM_MAKE_PAYMENTS)
+        return {
+            "sub": self.email,
+            "uid": self.id,
+            "role": self.role.value,
+            "broker_id": self.broker_id,
+            "company_id": self.company_id,
+            "perms": perms,
+            "ver": self.token_version,
+        }
+
+
+def access_token_claims(user: User) -> Dict[str, Any]:
+    """Claims to sign into an access token for `user`."""
+    return Principal.from_user(user).to_claims()
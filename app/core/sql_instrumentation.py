@@ -0,0 +1,144 @@
+"""
+Per-request SQL instrumentation for InsureFlow.
+Counts queries and DB time per request, exposes them as Server-Timing headers,
+and warns about requests over budget or with likely N+1 query patterns.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar("sql_request_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+|__\[POSTCOMPILE_\w+\])(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so repeats with different parameters compare equal."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAM_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class RequestQueryStats:
+    """Queries executed while serving one request."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.fingerprints: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        key = fingerprint(statement)
+        with self._lock:
+            self.query_count += 1
+            self.db_time += elapsed
+            self.fingerprints[key] += 1
+
+    @property
+    def db_time_ms(self) -> float:
+        return self.db_time * 1000
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """SELECT fingerprints executed at least `threshold` times."""
+        return [
+            (statement, count)
+            for statement, count in self.fingerprints.most_common()
+            if count >= threshold and statement.upper().startswith(("SELECT", "WITH"))
+        ]
+
+    def server_timing(self) -> str:
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        return (
+            f'db;dur={self.db_time_ms:.2f};desc="{self.query_count} queries", '
+            f"app;dur={total_ms:.2f}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The start time lives on the execution context, not the pooled connection,
+    # so a statement that raises (no after_cursor_execute) leaves nothing behind
+    if context is not None and _current_stats.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_time = getattr(context, "_query_start", None)
+    if start_time is not None:
+        stats.record(statement, time.perf_counter() - start_time)
+        context._query_start = None
+
+
+_installed = False
+
+
+def install_sql_instrumentation() -> None:
+    """Attach cursor listeners to every engine (sync, async and replica)."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+class SQLInstrumentationMiddleware:
+    """
+    ASGI middleware that scopes query statistics to each HTTP request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope, stats: RequestQueryStats) -> None:
+        route = f"{scope.get('method', '')} {scope.get('path', '')}"
+
+        if stats.query_count > settings.SQL_QUERY_BUDGET or stats.db_time_ms > settings.SQL_TIME_BUDGET_MS:
+            logger.warning(
+                f"⚠️ SQL BUDGET EXCEEDED: {route} ran {stats.query_count} queries "
+                f"in {stats.db_time_ms:.1f}ms (budget: {settings.SQL_QUERY_BUDGET} queries, "
+                f"{settings.SQL_TIME_BUDGET_MS:.0f}ms)"
+            )
+
+        for statement, count in stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(f"🔁 POSSIBLE N+1: {route} repeated {count}x: {statement[:300]}")
@@ -0,0 +1,244 @@
+"""
+Authenticated-user cache for InsureFlow.
+Keeps a short-lived column snapshot of each user (and broker profile) keyed by
+token subject, so authenticated requests skip the per-request user lookup.
+Also caches per-user token versions used to revoke claim-based tokens.
+"""
+import enum
+import json
+import logging
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Type
+
+import sqlalchemy as sa
+from redis.exceptions import RedisError
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache import MemoryCache, sync_redis_client
+from app.core.config import settings
+from app.models.broker import Broker
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Never cached; loaded from the database on first access if a caller needs them
+_SENSITIVE_COLUMNS = {"hashed_password", "bvn"}
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode(column: sa.Column, value: Any) -> Any:
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, sa.Enum) and column_type.enum_class is not None:
+        return column_type.enum_class(value)
+    if isinstance(column_type, sa.DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, sa.Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, sa.Numeric) and not isinstance(column_type, sa.Float):
+        return Decimal(value)
+    return value
+
+
+def _snapshot(instance) -> Dict[str, Any]:
+    """JSON-safe copy of a row's loaded column values."""
+    return {
+        attr.key: _encode(getattr(instance, attr.key))
+        for attr in sa_inspect(type(instance)).column_attrs
+        if attr.key not in _SENSITIVE_COLUMNS
+    }
+
+
+def _restore(model: Type, data: Dict[str, Any]):
+    """Rebuild a detached instance whose snapshot values count as already loaded."""
+    columns = {attr.key: attr.columns[0] for attr in sa_inspect(model).column_attrs}
+    instance = model(**{key: _decode(columns[key], value) for key, value in data.items() if key in columns})
+    make_transient_to_detached(instance)
+    return instance
+
+
+class UserCache:
+    """
+    Size-bounded, short-TTL cache of authenticated users keyed by token subject.
+    Shared through Redis when configured, otherwise held per process.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, redis_client=None, prefix: str = "insureflow:user"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis = redis_client
+        self.memory = MemoryCache(max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _key(self, subject: str) -> str:
+        return f"{self.prefix}:{subject.lower()}"
+
+    def _read(self, key: str) -> Optional[str]:
+        if self.redis is not None:
+            try:
+                return self.redis.get(key)
+            except RedisError as e:
+                self._incr("errors")
+                logger.warning(f"User cache read failed: {e}")
+                return None
+        return self.memory.get(key)
+
+    def get(self, db: Session, subject: str) -> Optional[User]:
+        """Return the cached user attached to `db`, or None on a miss."""
+        if not settings.USER_CACHE_ENABLED:
+            return None
+        cached = self._read(self._key(subject))
+        if cached is None:
+            self._incr("misses")
+            return None
+
+        data = json.loads(cached)
+        user = _restore(User, data["user"])
+        broker = _restore(Broker, data["broker"]) if data.get("broker") else None
+        set_committed_value(user, "broker_profile", broker)
+        self._incr("hits")
+        # load=False attaches the snapshot to this session without a SELECT
+        return db.merge(user, load=False)
+
+    def set(self, subject: str, user: User) -> None:
+        if not settings.USER_CACHE_ENABLED:
+            return
+        broker = user.broker_profile
+        value = json.dumps({
+            "user": _snapshot(user),
+            "broker": _snapshot(broker) if broker is not None else None,
+        })
+        key = self._key(subject)
+        if self.redis is not None:
+            try:
+                self.redis.set(key, value, ex=self.ttl)
+            except RedisError as e:
+                self._incr("errors")
+                logger.warning(f"User cache write failed: {e}")
+        else:
+            self.memory.set(key, value, ex=self.ttl)
+
+    def invalidate(self, *subjects: Optional[str]) -> None:
+        """Drop cached entries after profile, permission or status changes."""
+        keys = [self._key(subject) for subject in set(filter(None, subjects))]
+        if not keys:
+            return
+        if self.redis is not None:
+            try:
+                self.redis.delete(*keys)
+            except RedisError as e:
+                self._incr("errors")
+                logger.warning(f"User cache invalidation failed: {e}")
+        self.memory.delete(*keys)
+        self._incr("invalidations")
+
+    def invalidate_users(self, users: Iterable[Optional[User]]) -> None:
+        self.invalidate(*(user.email for user in users if user is not None))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "redis" if self.redis is not None else "memory",
+                "enabled": settings.USER_CACHE_ENABLED,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+class TokenVersionCache:
+    """
+    Current token version per user id. Claim-based tokens are valid only while
+    their `ver` claim matches; bumping the version revokes every issued token.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, redis_client=None, prefix: str = "insureflow:tokver"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.redis = redis_client
+        self.memory = MemoryCache(max_entries)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _store(self, user_id: int, version: int) -> None:
+        key = self._key(user_id)
+        if self.redis is not None:
+            try:
+                self.redis.set(key, str(version), ex=self.ttl)
+                return
+            except RedisError as e:
+                logger.warning(f"Token version cache write failed: {e}")
+        self.memory.set(key, str(version), ex=self.ttl)
+
+    def current(self, db: Session, user_id: int) -> Optional[int]:
+        """Token version for `user_id`, or None when the user no longer exists."""
+        key = self._key(user_id)
+        cached = None
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(key)
+            except RedisError as e:
+                logger.warning(f"Token version cache read failed: {e}")
+        if cached is None:
+            cached = self.memory.get(key)
+        if cached is not None:
+            return int(cached)
+
+        version = db.query(User.token_version).filter(User.id == user_id).scalar()
+        if version is not None:
+            self._store(user_id, version)
+        return version
+
+    def set(self, user_id: int, version: int) -> None:
+        """Publish a bumped version so revocation applies immediately."""
+        self.memory.delete(self._key(user_id))
+        self._store(user_id, version)
+
+    def forget(self, user_id: int) -> None:
+        key = self._key(user_id)
+        if self.redis is not None:
+            try:
+                self.redis.delete(key)
+            except RedisError as e:
+                logger.warning(f"Token version cache invalidation failed: {e}")
+        self.memory.delete(key)
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    redis_client=sync_redis_client if settings.USER_CACHE_SHARED else None,
+)
+
+token_versions = TokenVersionCache(
+    ttl=settings.USER_CACHE_TTL,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    redis_client=sync_redis_client if settings.USER_CACHE_SHARED else None,
+)
@@ -0,0 +1,26 @@
+"""
+Conditional aggregate helpers for single-pass KPI queries.
+PostgreSQL gets native `AGG(...) FILTER (WHERE ...)`; other dialects use the
+portable `SUM(CASE WHEN ... END)` form.
+"""
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+
+def supports_filter_clause(db: Session) -> bool:
+    """Whether the session's database understands aggregate FILTER clauses."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def count_where(condition, native: bool):
+    """COUNT(*) of rows matching `condition`; 0 when none match."""
+    if native:
+        return func.count().filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def sum_where(expression, condition, native: bool):
+    """SUM(expression) over rows matching `condition`; NULL when none match."""
+    if native:
+        return func.sum(expression).filter(condition)
+    return func.sum(case((condition, expression)))
@@ -0,0 +1,37 @@
+"""
+Async CRUD operations for the daily metrics rollups.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.daily_metrics import Dimensions, MetricDeltas, dimensions
+from app.models.policy import Policy
+from app.models.premium import Premium
+from app.models.virtual_account_transaction import VirtualAccountTransaction, TransactionStatus
+
+
+async def apply(db: AsyncSession, deltas: MetricDeltas) -> None:
+    """
+    Add `deltas` to the rollups inside the caller's transaction (the caller commits).
+    """
+    for statement in deltas.statements(db.get_bind().dialect.name):
+        await db.execute(statement)
+
+async def move_policy(db: AsyncSession, policy: Policy, old_dims: Dimensions) -> None:
+    """
+    Re-key a policy's whole contribution after its broker, company or type changed.
+    """
+    new_dims = dimensions(policy)
+    if new_dims == old_dims:
+        return
+    premiums = (await db.execute(
+        select(Premium).where(Premium.policy_id == policy.id)
+    )).scalars().all()
+    transactions = (await db.execute(
+        select(VirtualAccountTransaction).where(
+            VirtualAccountTransaction.policy_id == policy.id,
+            VirtualAccountTransaction.status == TransactionStatus.COMPLETED
+        )
+    )).scalars().all()
+    await apply(db, MetricDeltas()
+                .add_policy_history(policy, premiums, transactions, old_dims, sign=-1)
+                .add_policy_history(policy, premiums, transactions, new_dims))
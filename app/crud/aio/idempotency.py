@@ -0,0 +1,94 @@
+"""
+Async CRUD operations for the idempotency registry.
+A key is claimed with an INSERT on its unique index before any work starts, so
+of several concurrent deliveries of one event exactly one proceeds; the others
+see the claim (or, once done, the stored result).
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+
+# Outcomes of claim_idempotency_key
+CLAIMED = "claimed"  # the caller owns the key and does the work
+COMPLETED = "completed"  # already done; answer with the stored result
+IN_PROGRESS = "in_progress"  # another worker holds a fresh claim
+
+
+async def get_idempotency_key(db: AsyncSession, key: str) -> Optional[IdempotencyKey]:
+    """
+    Looks up a key on its unique index.
+    """
+    result = await db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key))
+    return result.scalars().first()
+
+async def claim_idempotency_key(
+    db: AsyncSession, key: str, stale_after: float
+) -> Tuple[str, Optional[IdempotencyKey]]:
+    """
+    Claim `key` for the caller (committed at once). A claim older than
+    `stale_after` seconds is taken over, for workers that died mid-event.
+    """
+    now = datetime.utcnow()
+    record = await get_idempotency_key(db, key)
+    if record is None:
+        record = IdempotencyKey(key=key, status=IdempotencyStatus.IN_PROGRESS.value, locked_at=now)
+        db.add(record)
+        try:
+            await db.commit()
+            return CLAIMED, record
+        except IntegrityError:
+            # A concurrent delivery claimed it first
+            await db.rollback()
+            record = await get_idempotency_key(db, key)
+
+    if record.status == IdempotencyStatus.COMPLETED.value:
+        return COMPLETED, record
+
+    if record.locked_at < now - timedelta(seconds=stale_after):
+        taken = await db.execute(
+            update(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS.value,
+                IdempotencyKey.locked_at == record.locked_at
+            ).values(locked_at=now)
+        )
+        await db.commit()
+        if taken.rowcount == 1:
+            return CLAIMED, record
+    return IN_PROGRESS, record
+
+async def complete_idempotency_key(db: AsyncSession, key: str, result: Dict[str, Any]) -> None:
+    """
+    Store the result of a claimed key inside the caller's transaction (the caller commits).
+    """
+    await db.execute(
+        update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+            status=IdempotencyStatus.COMPLETED.value,
+            result=json.dumps(result, default=str),
+            completed_at=datetime.utcnow()
+        )
+    )
+
+async def release_idempotency_key(db: AsyncSession, key: str) -> None:
+    """
+    Drop an unfinished claim so a retry can process the event again.
+    """
+    await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS.value
+        )
+    )
+    await db.commit()
+
+def replayed_result(record: IdempotencyKey) -> Dict[str, Any]:
+    """
+    The stored result of a completed key, flagged as a replay.
+    """
+    result = json.loads(record.result) if record.result else {"success": True}
+    result["replayed"] = True
+    return result
@@ -0,0 +1,28 @@
+"""
+Async CRUD operations for the Notification model.
+"""
+from datetime import datetime
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.notification import Notification, NotificationType
+
+
+async def dismiss_payment_reminders(db: AsyncSession, policy_ids: List[int]) -> int:
+    """
+    Dismiss the open payment reminders of paid policies in one UPDATE (the caller commits).
+    Returns how many were dismissed.
+    """
+    if not policy_ids:
+        return 0
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.policy_id.in_(policy_ids),
+            Notification.type == NotificationType.PAYMENT_REMINDER.value,
+            Notification.is_dismissed == False
+        )
+        .values(is_dismissed=True, dismissed_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
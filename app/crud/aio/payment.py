@@ -0,0 +1,85 @@
+"""
+Async CRUD operations for the Payment model.
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy import exists, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.payment import Payment
+from app.schemas.payment import PaymentCreate
+
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+async def create_payment(db: AsyncSession, payment: PaymentCreate) -> Payment:
+    """
+    Creates a new payment record in the database.
+    """
+    db_payment = Payment(**payment.model_dump())
+    db.add(db_payment)
+    await db.commit()
+    await db.refresh(db_payment)
+    return db_payment
+
+async def insert_payments(db: AsyncSession, payments: List[PaymentCreate], **fields: Any) -> int:
+    """
+    Inserts payment records with one multi-row INSERT inside the caller's
+    transaction (the caller commits). `fields` are set on every record.
+    """
+    if not payments:
+        return 0
+    await db.execute(insert(Payment), [{**payment.model_dump(), **fields} for payment in payments])
+    return len(payments)
+
+async def upsert_payments(db: AsyncSession, payments: List[PaymentCreate], **fields: Any) -> int:
+    """
+    Writes payment records with one INSERT ... ON CONFLICT on the transaction
+    reference (the caller commits): new references are inserted, records already
+    there (the pending ones written when the payment was initiated) take the new
+    amount, status and payer details. `fields` are set on every record.
+    """
+    if not payments:
+        return 0
+    rows = [{**payment.model_dump(), **fields} for payment in payments]
+    make_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if make_insert is None:
+        await _upsert_payments_portable(db, rows)
+        return len(rows)
+
+    statement = make_insert(Payment.__table__).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=["transaction_reference"],
+        set_={
+            **{column: statement.excluded[column] for column in rows[0] if column != "transaction_reference"},
+            "updated_at": datetime.utcnow(),
+        },
+    ))
+    return len(rows)
+
+async def _upsert_payments_portable(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    upsert_payments for dialects without ON CONFLICT: per reference, an UPDATE
+    of the existing record, then an INSERT ... SELECT adding it when it is still missing.
+    """
+    table = Payment.__table__
+    for row in rows:
+        same_reference = table.c.transaction_reference == row["transaction_reference"]
+        await db.execute(update(table).where(same_reference).values(
+            **{column: value for column, value in row.items() if column != "transaction_reference"},
+            updated_at=datetime.utcnow(),
+        ))
+        await db.execute(insert(table).from_select(
+            list(row),
+            select(*(literal(value, table.c[column].type) for column, value in row.items()))
+            .where(~exists().where(same_reference)),
+        ))
+
+async def get_payment_by_transaction_ref(db: AsyncSession, transaction_ref: str) -> Payment | None:
+    """
+    Retrieves a payment from the database by its transaction reference.
+    """
+    result = await db.execute(select(Payment).where(Payment.transaction_reference == transaction_ref))
+    return result.scalars().first()
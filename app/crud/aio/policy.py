@@ -0,0 +1,77 @@
+"""
+Async CRUD operations for the Policy model.
+"""
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.core.cache import response_cache
+from app.crud import daily_metrics
+from app.crud.aio import daily_metrics as aio_daily_metrics
+from app.models.policy import Policy
+from app.schemas.policy import PolicyCreate, PolicyUpdate
+
+async def get_policy(db: AsyncSession, policy_id: int) -> Optional[Policy]:
+    """
+    Retrieves a policy from the database by its ID with user data.
+    """
+    result = await db.execute(
+        select(Policy).options(joinedload(Policy.user)).where(Policy.id == policy_id)
+    )
+    return result.scalars().first()
+
+async def get_policies_by_ids(db: AsyncSession, policy_ids: List[int]) -> List[Policy]:
+    """
+    Retrieves policies by their IDs with user data, in one query.
+    """
+    if not policy_ids:
+        return []
+    result = await db.execute(
+        select(Policy).options(joinedload(Policy.user)).where(Policy.id.in_(policy_ids))
+    )
+    return list(result.scalars().all())
+
+async def get_policy_with_parties(db: AsyncSession, policy_id: int) -> Optional[Policy]:
+    """
+    Retrieves a policy with its user and broker loaded for payment processing.
+    """
+    result = await db.execute(
+        select(Policy)
+        .options(joinedload(Policy.user), joinedload(Policy.broker))
+        .where(Policy.id == policy_id)
+    )
+    return result.scalars().first()
+
+async def create_policy(db: AsyncSession, policy: PolicyCreate, user_id: int, company_id: int) -> Policy:
+    """
+    Creates a new policy in the database.
+    """
+    db_policy = Policy(
+        **policy.model_dump(),
+        user_id=user_id,
+        company_id=company_id
+    )
+    db.add(db_policy)
+    await db.flush()
+    await aio_daily_metrics.apply(db, daily_metrics.MetricDeltas().add_policy(db_policy))
+    await db.commit()
+    await response_cache.ainvalidate(reason="policy created")
+    # Reload with the user so callers can use it without lazy loading
+    return await get_policy(db, db_policy.id)
+
+async def update_policy(db: AsyncSession, policy_id: int, policy_update: PolicyUpdate) -> Optional[Policy]:
+    """
+    Updates an existing policy in the database.
+    """
+    db_policy = await get_policy(db, policy_id)
+    if db_policy:
+        update_data = policy_update.model_dump(exclude_unset=True)
+        old_dims = daily_metrics.dimensions(db_policy)
+        for key, value in update_data.items():
+            setattr(db_policy, key, value)
+        db.add(db_policy)
+        await aio_daily_metrics.move_policy(db, db_policy, old_dims)
+        await db.commit()
+        await db.refresh(db_policy)
+        await response_cache.ainvalidate(reason="policy updated")
+    return db_policy
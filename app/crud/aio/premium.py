@@ -0,0 +1,103 @@
+"""
+Async CRUD operations for the Premium model.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models.premium import Premium, PaymentStatus
+from app.models.policy import Policy
+
+
+async def get_premium(db: AsyncSession, premium_id: int) -> Optional[Premium]:
+    """
+    Retrieves a premium from the database by its ID with policy and user data.
+    """
+    result = await db.execute(
+        select(Premium)
+        .options(joinedload(Premium.policy).joinedload(Policy.user))
+        .where(Premium.id == premium_id)
+    )
+    return result.scalars().first()
+
+async def get_unpaid_premiums_by_policy(db: AsyncSession, policy_id: int) -> List[Premium]:
+    """
+    Retrieves all unpaid premiums for a single policy with policy and user data.
+    """
+    result = await db.execute(
+        select(Premium)
+        .options(joinedload(Premium.policy).joinedload(Policy.user))
+        .where(
+            Premium.policy_id == policy_id,
+            Premium.payment_status != PaymentStatus.PAID
+        )
+    )
+    return list(result.scalars().all())
+
+async def get_premiums_with_payers(db: AsyncSession, premium_ids: List[int]) -> List[Premium]:
+    """
+    Retrieves premiums by their IDs with policy and user data, in one query.
+    """
+    result = await db.execute(
+        select(Premium)
+        .options(joinedload(Premium.policy).joinedload(Policy.user))
+        .where(Premium.id.in_(premium_ids))
+        .order_by(Premium.id)
+    )
+    return list(result.scalars().all())
+
+async def get_premiums_by_ids(db: AsyncSession, premium_ids: List[int]) -> List[Premium]:
+    """
+    Retrieves a list of premiums by their IDs.
+    """
+    result = await db.execute(select(Premium).where(Premium.id.in_(premium_ids)))
+    return list(result.scalars().all())
+
+async def get_unpaid_premiums_for_policies(db: AsyncSession, policy_ids: List[int]) -> List[Premium]:
+    """
+    Retrieves all unpaid premiums for a given list of policy IDs.
+    """
+    result = await db.execute(
+        select(Premium).where(
+            Premium.policy_id.in_(policy_ids),
+            Premium.payment_status != PaymentStatus.PAID
+        )
+    )
+    return list(result.scalars().all())
+
+async def mark_premiums_paid(db: AsyncSession, amounts: Dict[int, Decimal], payment_date: date) -> List[int]:
+    """
+    Mark premiums paid with their own amounts in one UPDATE (the caller commits).
+    Premiums already paid are left alone; returns the ids of the premiums updated.
+    """
+    if not amounts:
+        return []
+    unpaid = and_(Premium.id.in_(list(amounts)), Premium.payment_status != PaymentStatus.PAID)
+    statement = update(Premium).values(
+        payment_status=PaymentStatus.PAID,
+        paid_amount=case(amounts, value=Premium.id),
+        payment_date=payment_date
+    ).execution_options(synchronize_session=False)
+
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(statement.where(unpaid).returning(Premium.id))
+        return list(result.scalars().all())
+    # No UPDATE ... RETURNING: lock the unpaid rows first, then update exactly those
+    ids = list((await db.execute(select(Premium.id).where(unpaid).with_for_update())).scalars().all())
+    if ids:
+        await db.execute(statement.where(Premium.id.in_(ids)))
+    return ids
+
+async def set_paid_amounts(db: AsyncSession, amounts: Dict[int, Decimal]) -> None:
+    """
+    Set the paid amount of each premium in one UPDATE (the caller commits).
+    """
+    if amounts:
+        await db.execute(
+            update(Premium)
+            .where(Premium.id.in_(list(amounts)))
+            .values(paid_amount=case(amounts, value=Premium.id))
+            .execution_options(synchronize_session=False)
+        )
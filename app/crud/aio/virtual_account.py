@@ -0,0 +1,157 @@
+"""
+Async CRUD operations for Virtual Account model.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from decimal import Decimal
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.virtual_account import VirtualAccount, VirtualAccountStatus
+from app.models.virtual_account_transaction import VirtualAccountTransaction
+
+
+async def get_virtual_account(db: AsyncSession, virtual_account_id: int) -> Optional[VirtualAccount]:
+    """Get a virtual account by ID."""
+    result = await db.execute(select(VirtualAccount).where(VirtualAccount.id == virtual_account_id))
+    return result.scalars().first()
+
+
+async def get_virtual_account_by_number(db: AsyncSession, virtual_account_number: str) -> Optional[VirtualAccount]:
+    """Get a virtual account by account number."""
+    result = await db.execute(
+        select(VirtualAccount).where(VirtualAccount.virtual_account_number == virtual_account_number)
+    )
+    return result.scalars().first()
+
+
+async def get_virtual_account_by_user(db: AsyncSession, user_id: int) -> Optional[VirtualAccount]:
+    """Get the first virtual account for a user."""
+    result = await db.execute(select(VirtualAccount).where(VirtualAccount.user_id == user_id))
+    return result.scalars().first()
+
+
+async def get_virtual_accounts_by_user(db: AsyncSession, user_id: int) -> List[VirtualAccount]:
+    """Get all virtual accounts for a user."""
+    result = await db.execute(select(VirtualAccount).where(VirtualAccount.user_id == user_id))
+    return list(result.scalars().all())
+
+
+async def get_active_virtual_accounts(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[VirtualAccount]:
+    """Get all active virtual accounts."""
+    result = await db.execute(
+        select(VirtualAccount)
+        .where(VirtualAccount.status == VirtualAccountStatus.ACTIVE)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def apply_balance_delta(
+    db: AsyncSession,
+    virtual_account_id: int,
+    credit_amount: Decimal = Decimal("0"),
+    debit_amount: Decimal = Decimal("0"),
+    allow_overdraft: bool = True,
+    transaction_at: Optional[datetime] = None
+) -> Optional[Row]:
+    """
+    Move a virtual account's balance inside the database with one
+    UPDATE ... RETURNING, so concurrent credits and debits never overwrite each
+    other. The row stays locked until the caller's transaction ends (the caller commits).
+    `transaction_at` is the created_at of the ledger entries behind the move, if any.
+    Returns (current_balance, total_credits, total_debits), or None when the account
+    does not exist or, without `allow_overdraft`, cannot cover the debit.
+    """
+    conditions = [VirtualAccount.id == virtual_account_id]
+    if not allow_overdraft:
+        conditions.append(VirtualAccount.current_balance >= debit_amount)
+    values = dict(
+        current_balance=VirtualAccount.current_balance + credit_amount - debit_amount,
+        total_credits=VirtualAccount.total_credits + credit_amount,
+        total_debits=VirtualAccount.total_debits + debit_amount,
+        last_activity_at=datetime.utcnow()
+    )
+    if transaction_at is not None:
+        values["last_transaction_at"] = transaction_at
+    result = await db.execute(
+        update(VirtualAccount)
+        .where(*conditions)
+        .values(**values)
+        .returning(VirtualAccount.current_balance, VirtualAccount.total_credits, VirtualAccount.total_debits)
+        .execution_options(synchronize_session="fetch")
+    )
+    return result.first()
+
+
+async def apply_balance_deltas(
+    db: AsyncSession,
+    deltas: Dict[int, Tuple[Decimal, Decimal]],
+    transaction_at: Optional[datetime] = None
+) -> Dict[int, Row]:
+    """
+    Apply {virtual_account_id: (credit_amount, debit_amount)} in ascending id
+    order, so transactions touching the same accounts lock them in the same
+    order and cannot deadlock. The caller commits.
+    """
+    return {
+        virtual_account_id: await apply_balance_delta(
+            db, virtual_account_id, credit_amount, debit_amount, transaction_at=transaction_at
+        )
+        for virtual_account_id, (credit_amount, debit_amount) in sorted(deltas.items())
+    }
+
+
+async def update_virtual_account_balance(
+    db: AsyncSession,
+    virtual_account_id: int,
+    credit_amount: Decimal = None,
+    debit_amount: Decimal = None
+) -> Optional[VirtualAccount]:
+    """Update virtual account balance."""
+    balances = await apply_balance_delta(
+        db, virtual_account_id, credit_amount or Decimal("0"), debit_amount or Decimal("0")
+    )
+    if balances is None:
+        return None
+
+    await db.commit()
+    return await get_virtual_account(db, virtual_account_id)
+
+
+async def insert_virtual_account_transactions(db: AsyncSession, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Inserts ledger entries with one multi-row INSERT inside the caller's
+    transaction (the caller commits). A key missing from some rows is written
+    as NULL for them. Returns the ids by transaction reference.
+    """
+    if not rows:
+        return {}
+    # Rows with different keys (or NULLs) would be sent as separate INSERTs
+    columns = set().union(*rows)
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+    result = await db.execute(
+        insert(VirtualAccountTransaction)
+        .returning(VirtualAccountTransaction.transaction_reference, VirtualAccountTransaction.id)
+        .execution_options(render_nulls=True),
+        rows
+    )
+    return dict(result.all())
+
+
+async def get_virtual_account_transactions(
+    db: AsyncSession,
+    virtual_account_id: int,
+    skip: int = 0,
+    limit: int = 100
+) -> List[VirtualAccountTransaction]:
+    """Get transactions for a virtual account."""
+    result = await db.execute(
+        select(VirtualAccountTransaction)
+        .where(VirtualAccountTransaction.virtual_account_id == virtual_account_id)
+        .order_by(VirtualAccountTransaction.transaction_date.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
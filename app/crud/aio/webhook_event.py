@@ -0,0 +1,108 @@
+"""
+Async CRUD operations for the webhook inbox.
+Workers claim due events with FOR UPDATE SKIP LOCKED, so any number of workers
+(in the API process or separate ones) can drain the inbox without taking the
+same event twice. Outcome updates are guarded by the claim's attempt number,
+so a worker whose claim timed out cannot overwrite a newer attempt.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
+
+
+async def create_webhook_event(
+    db: AsyncSession,
+    payload: str,
+    event_type: Optional[str] = None,
+    transaction_reference: Optional[str] = None,
+    source: str = "squad_co"
+) -> WebhookEvent:
+    """
+    Store a verified webhook for the workers.
+    """
+    event = WebhookEvent(
+        source=source,
+        event_type=event_type,
+        transaction_reference=transaction_reference,
+        payload=payload,
+        status=WebhookEventStatus.PENDING.value
+    )
+    db.add(event)
+    await db.commit()
+    return event
+
+async def claim_webhook_events(db: AsyncSession, limit: int = 1, claim_timeout: float = 600.0) -> List[WebhookEvent]:
+    """
+    Claim up to `limit` due events, oldest first: pending ones whose retry time
+    has come, and claimed ones whose worker has not reported back in `claim_timeout` seconds.
+    """
+    now = datetime.utcnow()
+    events = (await db.execute(
+        select(WebhookEvent).where(or_(
+            and_(WebhookEvent.status == WebhookEventStatus.PENDING.value, WebhookEvent.next_attempt_at <= now),
+            and_(WebhookEvent.status == WebhookEventStatus.PROCESSING.value,
+                 WebhookEvent.started_at < now - timedelta(seconds=claim_timeout))
+        )).order_by(
+            WebhookEvent.next_attempt_at, WebhookEvent.id
+        ).limit(limit).with_for_update(skip_locked=True)
+    )).scalars().all()
+
+    for event in events:
+        event.status = WebhookEventStatus.PROCESSING.value
+        event.started_at = now
+        event.attempts += 1
+    await db.commit()
+    return list(events)
+
+async def mark_webhook_event_processed(db: AsyncSession, event: WebhookEvent) -> bool:
+    """
+    Record a successful attempt with its duration and end-to-end latency.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(WebhookEvent).where(
+            WebhookEvent.id == event.id,
+            WebhookEvent.status == WebhookEventStatus.PROCESSING.value,
+            WebhookEvent.attempts == event.attempts
+        ).values(
+            status=WebhookEventStatus.PROCESSED.value,
+            processed_at=now,
+            processing_ms=int((now - event.started_at).total_seconds() * 1000),
+            latency_ms=int((now - event.received_at).total_seconds() * 1000),
+            last_error=None
+        )
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def mark_webhook_event_failed(
+    db: AsyncSession,
+    event: WebhookEvent,
+    error: str,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float
+) -> bool:
+    """
+    Record a failed attempt: retry after an exponential backoff, or leave the
+    event as failed once `max_attempts` have been used.
+    """
+    now = datetime.utcnow()
+    exhausted = event.attempts >= max_attempts
+    delay = min(max_delay, base_delay * 2 ** (event.attempts - 1))
+    result = await db.execute(
+        update(WebhookEvent).where(
+            WebhookEvent.id == event.id,
+            WebhookEvent.status == WebhookEventStatus.PROCESSING.value,
+            WebhookEvent.attempts == event.attempts
+        ).values(
+            status=(WebhookEventStatus.FAILED if exhausted else WebhookEventStatus.PENDING).value,
+            next_attempt_at=now if exhausted else now + timedelta(seconds=delay),
+            processing_ms=int((now - event.started_at).total_seconds() * 1000),
+            last_error=error
+        )
+    )
+    await db.commit()
+    return result.rowcount == 1
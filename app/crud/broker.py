@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 from app.models.broker import Broker
 from app.schemas.broker import BrokerCreate
 from app.schemas import broker as schemas_broker
+from app.core.user_cache import user_cache
+from app.crud import user as crud_user
 
 
 def get_broker_by_user_id(db: Session, user_id: int):
@@ -14,6 +16,7 @@ def update_broker(db: Session, db_broker: Broker, broker_in: schemas_broker.Brok
     db.add(db_broker)
     db.commit()
     db.refresh(db_broker)
+    user_cache.invalidate_users([db_broker.user])
     return db_broker
 
 
@@ -28,4 +31,6 @@ def create_broker_profile(db: Session, user_id: int, broker_data: dict) -> Broke
     db.add(broker)
     db.commit()
     db.refresh(broker)
+    # Tokens issued before the profile existed carry no broker_id claim
+    crud_user.revoke_user_tokens(db, user_id)
     return broker 
\ No newline at end of file
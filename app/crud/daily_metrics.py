@@ -0,0 +1,322 @@
+"""
+CRUD operations for the daily metrics rollups.
+Writers collect counter changes in a MetricDeltas and apply them in the same
+transaction as the change they describe; `rebuild_daily_metrics` recomputes a
+date range from the source tables for backfills and drift repair.
+"""
+import enum
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func, insert, literal, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.daily_metrics import DailyMetric, NO_BROKER, NO_COMPANY, NO_POLICY_TYPE
+from app.models.policy import Policy
+from app.models.premium import Premium, PaymentStatus
+from app.models.virtual_account_transaction import VirtualAccountTransaction, TransactionStatus
+
+COUNT_COLUMNS = (
+    "new_policies",
+    "premiums_billed_count",
+    "premiums_collected_count",
+    "transaction_count",
+)
+AMOUNT_COLUMNS = (
+    "premiums_billed_amount",
+    "premiums_collected_amount",
+    "transaction_volume",
+    "fees_collected",
+    "platform_commission",
+    "insureflow_commission",
+    "habari_commission",
+)
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+Key = Tuple[date, int, int, str]
+_KEY_COLUMNS = ("metric_date", "broker_id", "company_id", "policy_type")
+
+
+def as_date(value: Any) -> date:
+    """Normalize DATE()/date/datetime results (SQLite returns strings) to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _amount(value: Any) -> Decimal:
+    if value is None:
+        return Decimal("0")
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _policy_type(value: Any) -> str:
+    if value is None:
+        return NO_POLICY_TYPE
+    return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+Dimensions = Tuple[int, int, str]
+
+
+def dimensions(policy: Optional[Policy]) -> Dimensions:
+    """Rollup dimensions (broker, company, policy type) a policy's facts are counted under."""
+    if policy is None:
+        return NO_BROKER, NO_COMPANY, NO_POLICY_TYPE
+    return policy.broker_id or NO_BROKER, policy.company_id or NO_COMPANY, _policy_type(policy.policy_type)
+
+
+def _collection_day(premium: Premium) -> date:
+    return premium.payment_date or datetime.utcnow().date()
+
+
+class MetricDeltas:
+    """Counter changes grouped by rollup key; methods return self so they chain."""
+
+    def __init__(self):
+        self._rows: Dict[Key, Dict[str, Any]] = {}
+
+    def add(self, day: Any, dims: Dimensions, **counters: Any) -> "MetricDeltas":
+        key = (as_date(day), *dims)
+        row = self._rows.setdefault(key, defaultdict(int))
+        for column, value in counters.items():
+            row[column] += _amount(value) if column in AMOUNT_COLUMNS else int(value or 0)
+        return self
+
+    def add_policy(self, policy: Policy, dims: Optional[Dimensions] = None, sign: int = 1) -> "MetricDeltas":
+        return self.add(policy.created_at or datetime.utcnow(), dims or dimensions(policy), new_policies=sign)
+
+    def add_premium_billed(self, premium: Premium, dims: Dimensions, sign: int = 1) -> "MetricDeltas":
+        return self.add(
+            premium.due_date,
+            dims,
+            premiums_billed_count=sign,
+            premiums_billed_amount=sign * _amount(premium.amount),
+        )
+
+    def add_premium_collected(self, premium: Premium, dims: Dimensions, sign: int = 1) -> "MetricDeltas":
+        return self.add(
+            _collection_day(premium),
+            dims,
+            premiums_collected_count=sign,
+            premiums_collected_amount=sign * _amount(premium.paid_amount),
+        )
+
+    def add_premium(self, premium: Premium, dims: Dimensions, sign: int = 1) -> "MetricDeltas":
+        """Everything one premium contributes: billed, and collected once paid."""
+        self.add_premium_billed(premium, dims, sign)
+        if premium.payment_status == PaymentStatus.PAID:
+            self.add_premium_collected(premium, dims, sign)
+        return self
+
+    def add_transaction(self, transaction: VirtualAccountTransaction, dims: Dimensions, sign: int = 1) -> "MetricDeltas":
+        """Only completed transactions count towards volume and commissions."""
+        if transaction.status != TransactionStatus.COMPLETED:
+            return self
+        return self.add(
+            transaction.transaction_date or datetime.utcnow(),
+            dims,
+            transaction_count=sign,
+            transaction_volume=sign * _amount(transaction.principal_amount),
+            fees_collected=sign * _amount(transaction.fee_charged),
+            platform_commission=sign * _amount(transaction.total_platform_commission),
+            insureflow_commission=sign * _amount(transaction.insureflow_commission),
+            habari_commission=sign * _amount(transaction.habari_commission),
+        )
+
+    def add_policy_history(
+        self,
+        policy: Policy,
+        premiums: Iterable[Premium],
+        transactions: Iterable[VirtualAccountTransaction],
+        dims: Optional[Dimensions] = None,
+        sign: int = 1,
+    ) -> "MetricDeltas":
+        """A policy's full contribution, counted under `dims` (default: its current dimensions)."""
+        dims = dims or dimensions(policy)
+        self.add_policy(policy, dims, sign)
+        for premium in premiums:
+            self.add_premium(premium, dims, sign)
+        for transaction in transactions:
+            self.add_transaction(transaction, dims, sign)
+        return self
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Non-zero rows in key order (a stable lock order for concurrent upserts)."""
+        rows = []
+        for key in sorted(self._rows):
+            counters = {column: value for column, value in self._rows[key].items() if value}
+            if counters:
+                metric_date, broker_id, company_id, policy_type = key
+                rows.append({
+                    "metric_date": metric_date,
+                    "broker_id": broker_id,
+                    "company_id": company_id,
+                    "policy_type": policy_type,
+                    **counters,
+                })
+        return rows
+
+    def statements(self, dialect_name: str) -> list:
+        """
+        One additive upsert per rollup key. Dialects without ON CONFLICT get an
+        UPDATE of the existing row followed by an INSERT ... SELECT that only
+        adds the row when it is still missing.
+        """
+        make_insert = _UPSERT_INSERTS.get(dialect_name)
+        if make_insert is None:
+            return self._portable_statements()
+
+        table = DailyMetric.__table__
+        statements = []
+        for row in self.rows():
+            counters = [column for column in row if column in COUNT_COLUMNS or column in AMOUNT_COLUMNS]
+            statement = make_insert(table).values(**row)
+            statements.append(statement.on_conflict_do_update(
+                index_elements=["metric_date", "broker_id", "company_id", "policy_type"],
+                set_={
+                    **{column: table.c[column] + statement.excluded[column] for column in counters},
+                    "updated_at": datetime.utcnow(),
+                },
+            ))
+        return statements
+
+    def _portable_statements(self) -> list:
+        table = DailyMetric.__table__
+        statements = []
+        for row in self.rows():
+            counters = [column for column in row if column in COUNT_COLUMNS or column in AMOUNT_COLUMNS]
+            same_key = and_(*(table.c[column] == row[column] for column in _KEY_COLUMNS))
+            statements.append(update(table).where(same_key).values(
+                **{column: table.c[column] + row[column] for column in counters},
+                updated_at=datetime.utcnow(),
+            ))
+            statements.append(insert(table).from_select(
+                list(row),
+                select(*(literal(value, table.c[column].type) for column, value in row.items()))
+                .where(~exists().where(same_key)),
+            ))
+        return statements
+
+
+def apply(db: Session, deltas: MetricDeltas) -> None:
+    """Add `deltas` to the rollups inside the caller's transaction (the caller commits)."""
+    for statement in deltas.statements(db.get_bind().dialect.name):
+        db.execute(statement)
+
+
+def record_policy_created(db: Session, policy: Policy) -> None:
+    apply(db, MetricDeltas().add_policy(policy))
+
+
+def record_premium_collected(db: Session, premium: Premium, policy: Optional[Policy]) -> None:
+    apply(db, MetricDeltas().add_premium_collected(premium, dimensions(policy)))
+
+
+def move_policy(db: Session, policy: Policy, old_dims: Dimensions) -> None:
+    """Re-key a policy's whole contribution after its broker, company or type changed."""
+    new_dims = dimensions(policy)
+    if new_dims == old_dims:
+        return
+    premiums = db.query(Premium).filter(Premium.policy_id == policy.id).all()
+    transactions = db.query(VirtualAccountTransaction).filter(
+        VirtualAccountTransaction.policy_id == policy.id,
+        VirtualAccountTransaction.status == TransactionStatus.COMPLETED
+    ).all()
+    apply(db, MetricDeltas()
+          .add_policy_history(policy, premiums, transactions, old_dims, sign=-1)
+          .add_policy_history(policy, premiums, transactions, new_dims))
+
+
+def rebuild_daily_metrics(db: Session, start: date, end: date) -> int:
+    """
+    Recompute the rollups for days in [start, end) from the source tables.
+    Replaces existing rows for those days; returns the number of rows written.
+    The caller commits.
+    """
+    start_at = datetime.combine(start, time.min)
+    end_at = datetime.combine(end, time.min)
+    deltas = MetricDeltas()
+
+    def row_dimensions(row) -> Dimensions:
+        return row.broker_id or NO_BROKER, row.company_id or NO_COMPANY, _policy_type(row.policy_type)
+
+    policy_dimensions = (Policy.broker_id, Policy.company_id, Policy.policy_type)
+
+    created_day = func.date(Policy.created_at)
+    for row in db.query(
+        created_day.label("day"), *policy_dimensions, func.count(Policy.id).label("count")
+    ).filter(
+        Policy.created_at >= start_at, Policy.created_at < end_at
+    ).group_by(created_day, *policy_dimensions):
+        deltas.add(row.day, row_dimensions(row), new_policies=row.count)
+
+    for row in db.query(
+        Premium.due_date.label("day"), *policy_dimensions,
+        func.count(Premium.id).label("count"), func.sum(Premium.amount).label("amount")
+    ).join(Policy, Premium.policy_id == Policy.id).filter(
+        Premium.due_date >= start, Premium.due_date < end
+    ).group_by(Premium.due_date, *policy_dimensions):
+        deltas.add(row.day, row_dimensions(row), premiums_billed_count=row.count, premiums_billed_amount=row.amount)
+
+    # Premiums paid without a recorded payment date count on the day they were updated
+    collected_day = func.coalesce(Premium.payment_date, func.date(Premium.updated_at))
+    for row in db.query(
+        collected_day.label("day"), *policy_dimensions,
+        func.count(Premium.id).label("count"), func.sum(Premium.paid_amount).label("amount")
+    ).join(Policy, Premium.policy_id == Policy.id).filter(
+        Premium.payment_status == PaymentStatus.PAID,
+        or_(
+            and_(Premium.payment_date >= start, Premium.payment_date < end),
+            and_(Premium.payment_date.is_(None), Premium.updated_at >= start_at, Premium.updated_at < end_at),
+        )
+    ).group_by(collected_day, *policy_dimensions):
+        deltas.add(row.day, row_dimensions(row), premiums_collected_count=row.count, premiums_collected_amount=row.amount)
+
+    VAT = VirtualAccountTransaction
+    transaction_day = func.date(VAT.transaction_date)
+    for row in db.query(
+        transaction_day.label("day"), *policy_dimensions,
+        func.count(VAT.id).label("count"),
+        func.sum(VAT.principal_amount).label("volume"),
+        func.sum(VAT.fee_charged).label("fees"),
+        func.sum(VAT.total_platform_commission).label("platform"),
+        func.sum(VAT.insureflow_commission).label("insureflow"),
+        func.sum(VAT.habari_commission).label("habari"),
+    ).outerjoin(Policy, VAT.policy_id == Policy.id).filter(
+        VAT.status == TransactionStatus.COMPLETED,
+        VAT.transaction_date >= start_at,
+        VAT.transaction_date < end_at
+    ).group_by(transaction_day, *policy_dimensions):
+        deltas.add(
+            row.day,
+            row_dimensions(row),
+            transaction_count=row.count,
+            transaction_volume=row.volume,
+            fees_collected=row.fees,
+            platform_commission=row.platform,
+            insureflow_commission=row.insureflow,
+            habari_commission=row.habari,
+        )
+
+    db.query(DailyMetric).filter(
+        DailyMetric.metric_date >= start, DailyMetric.metric_date < end
+    ).delete(synchronize_session=False)
+    rows = deltas.rows()
+    if rows:
+        now = datetime.utcnow()
+        columns = COUNT_COLUMNS + AMOUNT_COLUMNS
+        db.execute(insert(DailyMetric), [
+            {**{column: 0 for column in columns}, **row, "updated_at": now} for row in rows
+        ])
+    return len(rows)
@@ -4,10 +4,14 @@ CRUD operations for dashboard data and analytics.
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc, asc
 from datetime import date, datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from decimal import Decimal
 
+from app.crud import virtual_account as crud_virtual_account
+from app.crud.aggregation import count_where, sum_where, supports_filter_clause
+from app.crud.time_buckets import add_months, aggregate_by_bucket, bucket_label
 from app.models import policy, premium, broker, user
+from app.models.daily_metrics import DailyMetric
 from app.models.premium import PaymentStatus
 from app.models.user import User, UserRole
 from app.models.virtual_account import VirtualAccount, VirtualAccountStatus
@@ -18,80 +22,139 @@ from app.schemas.dashboard import (
     RecentPolicy
 )
 
-def get_dashboard_kpis(db: Session, current_user: User) -> DashboardKPIS:
+def _visibility(current_user: User) -> Tuple[str, Optional[int]]:
     """
-    Calculate and return Key Performance Indicators based on the user's role.
-    Enhanced with additional metrics.
+    Which policies the user may see: ("all", None), ("broker", broker id),
+    ("customer", user id), or ("none", None) for a broker user without a broker profile.
+    """
+    if current_user.role == UserRole.BROKER or current_user.is_broker_user:
+        broker_profile = current_user.broker_profile
+        if not broker_profile:
+            return "none", None
+        return "broker", broker_profile.id
+    if current_user.role == UserRole.CUSTOMER:
+        return "customer", current_user.id
+    return "all", None
+
+def _policy_scope(current_user: User) -> Optional[list]:
+    """
+    Policy filters limiting KPIs to what the user may see.
+    Returns None for a broker user without a broker profile (nothing visible).
+    """
+    kind, key = _visibility(current_user)
+    if kind == "none":
+        return None
+    if kind == "broker":
+        return [policy.Policy.broker_id == key]
+    if kind == "customer":
+        return [policy.Policy.user_id == key]
+    return []
+
+def cache_scope(current_user: User) -> str:
+    """
+    Cache key part for the user's dashboards, from the same rules as the KPI
+    filters: users who see the same policies share an entry.
+    """
+    kind, key = _visibility(current_user)
+    if kind == "broker":
+        return f"broker:{key}"
+    if kind == "customer":
+        return f"user:{key}"
+    return kind
+
+def _policy_counts(db: Session, filters: list, native: bool):
+    """
+    One pass over policies: total and due-this-week counts.
     """
     today = date.today()
-    start_of_month = today.replace(day=1)
     start_of_week = today - timedelta(days=today.weekday())
+    Policy = policy.Policy
 
-    # Base queries that can be filtered
-    policy_query = db.query(policy.Policy)
-    premium_query = db.query(premium.Premium)
+    return db.query(
+        func.count(Policy.id).label("total"),
+        count_where(
+            and_(Policy.due_date >= start_of_week, Policy.due_date < start_of_week + timedelta(days=7)), native
+        ).label("due_this_week"),
+    ).filter(*filters).one()
 
-    if current_user.role == UserRole.BROKER or current_user.is_broker_user:
-        # Filter by broker
-        broker_profile = current_user.broker_profile
-        if broker_profile:
-            policy_query = policy_query.filter(policy.Policy.broker_id == broker_profile.id)
-            premium_query = premium_query.join(policy.Policy).filter(policy.Policy.broker_id == broker_profile.id)
-        else:
-            return _empty_kpis()
+def _new_policy_counts(db: Session, current_user: Optional[User], native: bool) -> Tuple[int, int]:
+    """
+    Policies created this month and last month, read from the daily rollups.
+    Pass no user for platform-wide counts. Customers are not a rollup
+    dimension, so their counts come from their own policies.
+    """
+    start_of_month = date.today().replace(day=1)
+    last_month_start = (start_of_month - timedelta(days=1)).replace(day=1)
 
-    elif current_user.role == UserRole.CUSTOMER:
-        policy_query = policy_query.filter(policy.Policy.user_id == current_user.id)
-        premium_query = premium_query.join(policy.Policy).filter(policy.Policy.user_id == current_user.id)
+    if current_user is not None and current_user.role == UserRole.CUSTOMER:
+        Policy = policy.Policy
+        row = db.query(
+            count_where(Policy.created_at >= start_of_month, native).label("this_month"),
+            count_where(
+                and_(Policy.created_at >= last_month_start, Policy.created_at < start_of_month), native
+            ).label("last_month"),
+        ).filter(Policy.user_id == current_user.id).one()
+        return row.this_month or 0, row.last_month or 0
 
-    # Calculate enhanced KPIs
-    new_policies_count = policy_query.filter(
-        policy.Policy.start_date >= start_of_month
-    ).count()
+    query = db.query(
+        sum_where(DailyMetric.new_policies, DailyMetric.metric_date >= start_of_month, native).label("this_month"),
+        sum_where(DailyMetric.new_policies, DailyMetric.metric_date < start_of_month, native).label("last_month"),
+    ).filter(DailyMetric.metric_date >= last_month_start)
+    filters = _policy_scope(current_user) if current_user is not None else []
+    if filters:
+        query = query.filter(DailyMetric.broker_id == current_user.broker_profile.id)
+    row = query.one()
+    return int(row.this_month or 0), int(row.last_month or 0)
 
-    total_policies = policy_query.count()
+def get_dashboard_kpis(db: Session, current_user: User) -> DashboardKPIS:
+    """
+    Calculate and return Key Performance Indicators based on the user's role.
+    One conditional-aggregate statement per table; month counts come from the rollups.
+    """
+    filters = _policy_scope(current_user)
+    if filters is None:
+        return _empty_kpis()
 
-    outstanding_premiums = premium_query.with_entities(func.sum(premium.Premium.amount)).filter(
-        premium.Premium.payment_status != PaymentStatus.PAID
-    ).scalar() or 0.0
-    
-    total_premium_collected = premium_query.with_entities(func.sum(premium.Premium.paid_amount)).filter(
-        premium.Premium.payment_status == PaymentStatus.PAID
-    ).scalar() or 0.0
+    native = supports_filter_clause(db)
+    Premium = premium.Premium
 
-    average_policy_value = float(total_premium_collected / total_policies) if total_policies > 0 else 0.0
+    policy_counts = _policy_counts(db, filters, native)
+    new_this_month, _ = _new_policy_counts(db, current_user, native)
 
-    policies_due_this_week = policy_query.filter(
-        and_(
-            policy.Policy.due_date >= start_of_week,
-            policy.Policy.due_date < start_of_week + timedelta(days=7)
-        )
-    ).count()
+    unpaid = Premium.payment_status != PaymentStatus.PAID
+    paid = Premium.payment_status == PaymentStatus.PAID
+    premium_query = db.query(
+        func.count(Premium.id).label("total"),
+        count_where(paid, native).label("paid"),
+        count_where(Premium.is_overdue, native).label("overdue"),
+        sum_where(Premium.outstanding_amount, unpaid, native).label("outstanding"),
+        sum_where(Premium.paid_amount, paid, native).label("collected"),
+    )
+    if filters:
+        premium_query = premium_query.join(policy.Policy, Premium.policy_id == policy.Policy.id).filter(*filters)
+    premium_totals = premium_query.one()
 
-    overdue_payments = premium_query.filter(
-        and_(
-            premium.Premium.payment_status != PaymentStatus.PAID,
-            premium.Premium.due_date < today
-        )
-    ).count()
+    total_policies = policy_counts.total or 0
+    total_premium_collected = premium_totals.collected or 0.0
+    total_premiums = premium_totals.total or 0
+
+    average_policy_value = float(total_premium_collected / total_policies) if total_policies > 0 else 0.0
 
     # Calculate conversion rate (simplified as paid vs total premiums)
-    total_premiums = premium_query.count()
-    paid_premiums = premium_query.filter(premium.Premium.payment_status == PaymentStatus.PAID).count()
-    conversion_rate = float(paid_premiums / total_premiums * 100) if total_premiums > 0 else 0.0
+    conversion_rate = float(premium_totals.paid / total_premiums * 100) if total_premiums > 0 else 0.0
 
     # Broker count
     broker_count = db.query(func.count(broker.Broker.id)).scalar() if current_user.can_perform_admin_actions else 1
 
     return DashboardKPIS(
-        new_policies_this_month=new_policies_count,
-        outstanding_premiums_total=float(outstanding_premiums),
+        new_policies_this_month=new_this_month,
+        outstanding_premiums_total=float(premium_totals.outstanding or 0.0),
         broker_count=broker_count,
         total_policies=total_policies,
         total_premium_collected=float(total_premium_collected),
         average_policy_value=average_policy_value,
-        policies_due_this_week=policies_due_this_week,
-        overdue_payments=overdue_payments,
+        policies_due_this_week=policy_counts.due_this_week,
+        overdue_payments=premium_totals.overdue,
         conversion_rate=conversion_rate
     )
 
@@ -100,66 +163,44 @@ def get_enhanced_dashboard_kpis(db: Session, current_user: User) -> EnhancedDash
     Get enhanced KPIs with virtual account and commission data.
     """
     base_kpis = get_dashboard_kpis(db, current_user)
-    
-    # Virtual account metrics
-    virtual_accounts = db.query(VirtualAccount)
+    native = supports_filter_clause(db)
+    
+    # Virtual account metrics in one pass
+    va_query = db.query(
+        func.count(VirtualAccount.id).label("total"),
+        count_where(VirtualAccount.status == VirtualAccountStatus.ACTIVE, native).label("active"),
+        func.sum(VirtualAccount.current_balance).label("balance"),
+        # Platform commission metrics (InsureFlow + Habari split)
+        func.sum(VirtualAccount.total_credits * VirtualAccount.platform_commission_rate).label("platform_commission"),
+        func.sum(VirtualAccount.total_credits * VirtualAccount.insureflow_commission_rate).label("insureflow_commission"),
+        func.sum(VirtualAccount.total_credits * VirtualAccount.habari_commission_rate).label("habari_commission"),
+    )
     if current_user.is_broker_user and not current_user.can_perform_admin_actions:
-        virtual_accounts = virtual_accounts.filter(VirtualAccount.user_id == current_user.id)
-    
-    virtual_accounts_count = virtual_accounts.count()
-    active_virtual_accounts = virtual_accounts.filter(
-        VirtualAccount.status == VirtualAccountStatus.ACTIVE
-    ).count()
-    
-    total_virtual_account_balance = virtual_accounts.with_entities(
-        func.sum(VirtualAccount.current_balance)
-    ).scalar() or 0.0
-    
-    # Platform commission metrics (InsureFlow + Habari split)
-    total_platform_commission = virtual_accounts.with_entities(
-        func.sum(VirtualAccount.total_credits * VirtualAccount.platform_commission_rate)
-    ).scalar() or 0.0
-    
-    insureflow_commission_total = virtual_accounts.with_entities(
-        func.sum(VirtualAccount.total_credits * VirtualAccount.insureflow_commission_rate)
-    ).scalar() or 0.0
-    
-    habari_commission_total = virtual_accounts.with_entities(
-        func.sum(VirtualAccount.total_credits * VirtualAccount.habari_commission_rate)
-    ).scalar() or 0.0
+        va_query = va_query.filter(VirtualAccount.user_id == current_user.id)
+    va_totals = va_query.one()
     
     # Pending settlements
-    pending_settlements = db.query(VirtualAccountTransaction).filter(
+    pending_settlements = db.query(func.count(VirtualAccountTransaction.id)).filter(
         and_(
             VirtualAccountTransaction.status == TransactionStatus.PENDING,
             VirtualAccountTransaction.transaction_indicator == TransactionIndicator.D
         )
-    ).count()
+    ).scalar()
     
-    # Top performing broker (by transaction volume, not commission since that goes to platform)
-    top_broker = db.query(broker.Broker).join(VirtualAccount).group_by(
-        broker.Broker.id
+    # Top performing broker (by transaction volume, not commission since that goes to platform).
+    # Brokers and virtual accounts are linked through the broker's user account.
+    top_broker = db.query(broker.Broker.name).join(
+        VirtualAccount, VirtualAccount.user_id == broker.Broker.user_id
+    ).group_by(
+        broker.Broker.id, broker.Broker.name
     ).order_by(
         desc(func.sum(VirtualAccount.total_credits))
     ).first()
     
     top_performing_broker = top_broker.name if top_broker else None
     
-    # Monthly growth rate (simplified calculation)
-    today = date.today()
-    last_month = today.replace(day=1) - timedelta(days=1)
-    last_month_start = last_month.replace(day=1)
-    
-    current_month_policies = db.query(policy.Policy).filter(
-        policy.Policy.start_date >= today.replace(day=1)
-    ).count()
-    
-    last_month_policies = db.query(policy.Policy).filter(
-        and_(
-            policy.Policy.start_date >= last_month_start,
-            policy.Policy.start_date < today.replace(day=1)
-        )
-    ).count()
+    # Monthly growth rate (simplified calculation) over all policies
+    current_month_policies, last_month_policies = _new_policy_counts(db, None, native)
     
     monthly_growth_rate = float(
         (current_month_policies - last_month_policies) / last_month_policies * 100
@@ -167,12 +208,12 @@ def get_enhanced_dashboard_kpis(db: Session, current_user: User) -> EnhancedDash
     
     return EnhancedDashboardKPIS(
         **base_kpis.dict(),
-        total_platform_commission=float(total_platform_commission),
-        insureflow_commission_total=float(insureflow_commission_total),
-        habari_commission_total=float(habari_commission_total),
-        virtual_accounts_count=virtual_accounts_count,
-        active_virtual_accounts=active_virtual_accounts,
-        total_virtual_account_balance=float(total_virtual_account_balance),
+        total_platform_commission=float(va_totals.platform_commission or 0.0),
+        insureflow_commission_total=float(va_totals.insureflow_commission or 0.0),
+        habari_commission_total=float(va_totals.habari_commission or 0.0),
+        virtual_accounts_count=va_totals.total,
+        active_virtual_accounts=va_totals.active,
+        total_virtual_account_balance=float(va_totals.balance or 0.0),
         pending_settlements=pending_settlements,
         top_performing_broker=top_performing_broker,
         monthly_growth_rate=monthly_growth_rate
@@ -225,48 +266,45 @@ def get_recent_policies(db: Session, current_user: User, limit: int = 5) -> List
 
 def get_policy_trends(db: Session, current_user: User, period: str = "monthly") -> TimeSeriesData:
     """
-    Get policy creation trends over time.
+    Get policy creation trends over time from the daily rollups, one point per
+    day, week or month of the window (empty periods count as zero).
     """
     today = date.today()
     
     if period == "daily":
         start_date = today - timedelta(days=30)
-        date_format = "%Y-%m-%d"
-        date_trunc = func.date(policy.Policy.created_at)
     elif period == "weekly":
         start_date = today - timedelta(weeks=12)
-        date_format = "%Y-W%U"
-        date_trunc = func.date_trunc('week', policy.Policy.created_at)
     else:  # monthly
-        start_date = today - timedelta(days=365)
-        date_format = "%Y-%m"
-        date_trunc = func.date_trunc('month', policy.Policy.created_at)
-    
-    query = db.query(
-        date_trunc.label('period'),
-        func.count(policy.Policy.id).label('count')
-    ).filter(
-        policy.Policy.created_at >= start_date
-    ).group_by('period').order_by('period')
+        period = "monthly"
+        start_date = add_months(today, -11)
     
+    filters = ()
     # Apply user-specific filters
     if current_user.is_broker_user and not current_user.can_perform_admin_actions:
         broker_profile = current_user.broker_profile
         if broker_profile:
-            query = query.filter(policy.Policy.broker_id == broker_profile.id)
-    
-    results = query.all()
+            filters = (DailyMetric.broker_id == broker_profile.id,)
+    
+    buckets = aggregate_by_bucket(
+        db,
+        DailyMetric.metric_date,
+        {"count": func.sum(DailyMetric.new_policies)},
+        start_date,
+        today + timedelta(days=1),
+        period,
+        filters
+    )
     
-    data_points = []
-    total = 0
-    for result in results:
-        period_date = result.period.date() if hasattr(result.period, 'date') else result.period
-        data_points.append(ChartDataPoint(
-            label=period_date.strftime(date_format),
-            value=float(result.count),
+    data_points = [
+        ChartDataPoint(
+            label=bucket_label(period_date, period),
+            value=float(values["count"]),
             date=period_date
-        ))
-        total += result.count
+        )
+        for period_date, values in buckets
+    ]
+    total = sum(int(values["count"]) for _, values in buckets)
     
     # Calculate growth rate
     growth_rate = 0.0
@@ -314,9 +352,75 @@ def get_policy_type_distribution(db: Session, current_user: User) -> PieChartDat
         total=float(total)
     )
 
-def get_broker_performance_list(db: Session, current_user: User, limit: int = 10) -> List[BrokerPerformance]:
+# Broker commission on collected premiums
+BROKER_COMMISSION_RATE = 0.01
+
+def _broker_leaderboard(db: Session, native: bool):
+    """
+    Every broker with policy and premium totals, last activity and leaderboard
+    position, as one ranked subquery. Premiums are totalled per policy first so
+    a policy with several premiums is still counted once.
+    """
+    Policy = policy.Policy
+    Premium = premium.Premium
+    Broker = broker.Broker
+    paid = Premium.payment_status == PaymentStatus.PAID
+
+    premium_totals = db.query(
+        Premium.policy_id.label("policy_id"),
+        func.sum(Premium.amount).label("total_premium"),
+        sum_where(Premium.paid_amount, paid, native).label("total_paid"),
+        count_where(paid, native).label("paid_premiums"),
+    ).group_by(Premium.policy_id).subquery("premium_totals")
+
+    total_premium = func.coalesce(func.sum(premium_totals.c.total_premium), 0)
+    return db.query(
+        Broker.id.label("broker_id"),
+        Broker.name.label("broker_name"),
+        Broker.agency_name.label("organization_name"),
+        func.count(Policy.id).label("policies_count"),
+        total_premium.label("total_premium"),
+        func.coalesce(func.sum(premium_totals.c.total_paid), 0).label("total_paid"),
+        count_where(premium_totals.c.paid_premiums > 0, native).label("paid_policies"),
+        func.max(Policy.created_at).label("last_policy_date"),
+        # Ties broken by broker id so every broker has a distinct, stable position
+        func.row_number().over(order_by=(total_premium.desc(), Broker.id)).label("ranking"),
+    ).outerjoin(
+        Policy, Policy.broker_id == Broker.id
+    ).outerjoin(
+        premium_totals, premium_totals.c.policy_id == Policy.id
+    ).group_by(
+        Broker.id, Broker.name, Broker.agency_name
+    ).subquery("leaderboard")
+
+def _broker_performance(row) -> BrokerPerformance:
+    policies_count = row.policies_count or 0
+    total_premium = float(row.total_premium or 0)
+    total_paid = float(row.total_paid or 0)
+    last_policy_date = row.last_policy_date
+    if isinstance(last_policy_date, str):  # SQLite returns MAX() of a timestamp as text
+        last_policy_date = datetime.fromisoformat(last_policy_date)
+    return BrokerPerformance(
+        broker_id=row.broker_id,
+        broker_name=row.broker_name,
+        organization_name=row.organization_name,
+        policies_count=policies_count,
+        paid_policies=row.paid_policies or 0,
+        total_premium=total_premium,
+        total_paid=total_paid,
+        commission_earned=total_paid * BROKER_COMMISSION_RATE,
+        average_deal_size=total_premium / policies_count if policies_count else 0.0,
+        conversion_rate=(row.paid_policies or 0) / policies_count * 100 if policies_count else 0.0,
+        last_policy_date=last_policy_date,
+        ranking=row.ranking
+    )
+
+def get_broker_performance_list(
+    db: Session, current_user: User, limit: int = 10, after_rank: Optional[int] = None
+) -> List[BrokerPerformance]:
     """
-    Get top performing brokers with detailed metrics.
+    Get top performing brokers with detailed metrics in one query.
+    Pass the last `ranking` already seen as `after_rank` to page through the full leaderboard.
     """
     if not current_user.can_perform_admin_actions and not current_user.is_insurance_user:
         # Non-admin, non-insurance users can only see their own performance
@@ -324,143 +428,49 @@ def get_broker_performance_list(db: Session, current_user: User, limit: int = 10
             return [get_broker_individual_performance(db, current_user.broker_profile.id)]
         return []
     
-    # Get broker performance data
-    broker_stats = db.query(
-        broker.Broker.id,
-        broker.Broker.name,
-        broker.Broker.agency_name,
-        func.count(policy.Policy.id).label('total_policies'),
-        func.sum(premium.Premium.amount).label('total_premiums'),
-        func.sum(premium.Premium.paid_amount).label('total_paid')
-    ).outerjoin(
-        policy.Policy, broker.Broker.id == policy.Policy.broker_id
-    ).outerjoin(
-        premium.Premium, policy.Policy.id == premium.Premium.policy_id
-    ).group_by(
-        broker.Broker.id, broker.Broker.name, broker.Broker.agency_name
-    ).order_by(
-        desc('total_premiums')
-    ).limit(limit).all()
-    
-    performance_list = []
-    for rank, stats in enumerate(broker_stats, 1):
-        # Calculate additional metrics
-        commission_rate = 0.01  # 1% commission
-        commission_earned = float(stats.total_paid or 0) * commission_rate
-        
-        conversion_rate = 0.0
-        if stats.total_policies and stats.total_premiums:
-            paid_policies = db.query(policy.Policy).join(premium.Premium).filter(
-                and_(
-                    policy.Policy.broker_id == stats.id,
-                    premium.Premium.payment_status == PaymentStatus.PAID
-                )
-            ).count()
-            conversion_rate = (paid_policies / stats.total_policies) * 100
-        
-        average_deal_size = float(stats.total_premiums / stats.total_policies) if stats.total_policies else 0.0
-        
-        # Get last activity
-        last_policy = db.query(policy.Policy).filter(
-            policy.Policy.broker_id == stats.id
-        ).order_by(desc(policy.Policy.created_at)).first()
-        
-        last_activity = last_policy.created_at if last_policy else None
-        
-        performance_list.append(BrokerPerformance(
-            broker_id=stats.id,
-            broker_name=stats.name,
-            organization_name=stats.agency_name,
-            total_policies=stats.total_policies or 0,
-            total_premiums=float(stats.total_premiums or 0),
-            commission_earned=commission_earned,
-            conversion_rate=conversion_rate,
-            client_retention_rate=85.0,  # Placeholder - would need more complex calculation
-            average_deal_size=average_deal_size,
-            last_activity=last_activity,
-            rank=rank
-        ))
-    
-    return performance_list
+    leaderboard = _broker_leaderboard(db, supports_filter_clause(db))
+    query = db.query(leaderboard)
+    if after_rank is not None:
+        query = query.filter(leaderboard.c.ranking > after_rank)
+    rows = query.order_by(leaderboard.c.ranking).limit(limit).all()
+    return [_broker_performance(row) for row in rows]
 
 def get_broker_individual_performance(db: Session, broker_id: int) -> BrokerPerformance:
     """
-    Get performance metrics for a specific broker.
+    Get performance metrics for a specific broker, ranked against all brokers.
     """
-    broker_obj = db.query(broker.Broker).filter(broker.Broker.id == broker_id).first()
-    if not broker_obj:
+    leaderboard = _broker_leaderboard(db, supports_filter_clause(db))
+    row = db.query(leaderboard).filter(leaderboard.c.broker_id == broker_id).first()
+    if not row:
         raise ValueError("Broker not found")
-    
-    # Calculate metrics
-    total_policies = db.query(policy.Policy).filter(policy.Policy.broker_id == broker_id).count()
-    
-    total_premiums = db.query(func.sum(premium.Premium.amount)).join(policy.Policy).filter(
-        policy.Policy.broker_id == broker_id
-    ).scalar() or 0
-    
-    total_paid = db.query(func.sum(premium.Premium.paid_amount)).join(policy.Policy).filter(
-        and_(
-            policy.Policy.broker_id == broker_id,
-            premium.Premium.payment_status == PaymentStatus.PAID
-        )
-    ).scalar() or 0
-    
-    commission_earned = float(total_paid) * 0.01  # 1% commission
-    
-    # Conversion rate
-    paid_policies = db.query(policy.Policy).join(premium.Premium).filter(
-        and_(
-            policy.Policy.broker_id == broker_id,
-            premium.Premium.payment_status == PaymentStatus.PAID
-        )
-    ).count()
-    
-    conversion_rate = (paid_policies / total_policies * 100) if total_policies > 0 else 0.0
-    
-    return BrokerPerformance(
-        broker_id=broker_id,
-        broker_name=broker_obj.name,
-        organization_name=broker_obj.agency_name,
-        total_policies=total_policies,
-        total_premiums=float(total_premiums),
-        commission_earned=commission_earned,
-        conversion_rate=conversion_rate,
-        client_retention_rate=85.0,  # Placeholder
-        average_deal_size=float(total_premiums / total_policies) if total_policies > 0 else 0.0,
-        last_activity=None,  # Would need to calculate
-        rank=1
-    )
+    return _broker_performance(row)
 
 def get_virtual_account_summaries(db: Session, current_user: User, limit: int = 5) -> List[VirtualAccountSummary]:
     """
-    Get virtual account summaries for dashboard.
+    Get virtual account summaries for dashboard, with each account's latest transaction
+    looked up in the same query.
     """
-    query = db.query(VirtualAccount)
-    
+    user_id = None
     if current_user.is_broker_user and not current_user.can_perform_admin_actions:
-        query = query.filter(VirtualAccount.user_id == current_user.id)
+        user_id = current_user.id
     
-    accounts = query.order_by(desc(VirtualAccount.current_balance)).limit(limit).all()
+    rows = crud_virtual_account.get_virtual_accounts_with_latest_transaction(
+        db, user_id=user_id, order_by=[desc(VirtualAccount.current_balance)], limit=limit
+    )
     
-    summaries = []
-    for account in accounts:
-        # Get last transaction
-        last_transaction = db.query(VirtualAccountTransaction).filter(
-            VirtualAccountTransaction.virtual_account_id == account.id
-        ).order_by(desc(VirtualAccountTransaction.created_at)).first()
-        
-        summaries.append(VirtualAccountSummary(
+    return [
+        VirtualAccountSummary(
             account_id=account.id,
             account_number=account.virtual_account_number,
             account_type=account.account_type.value,
             current_balance=float(account.current_balance),
             total_credits=float(account.total_credits),
             platform_commission_earned=float(account.total_platform_commission),
-            last_transaction=last_transaction.created_at if last_transaction else None,
+            last_transaction=last_transaction.created_at if last_transaction else account.last_transaction_at,
             status=account.status.value
-        ))
-    
-    return summaries
+        )
+        for account, last_transaction in rows
+    ]
 
 def _empty_kpis() -> DashboardKPIS:
     """Return mock KPIs for users with no data access to prevent NaN calculations."""
@@ -2,13 +2,18 @@
 CRUD operations for InsureFlow internal admin dashboard.
 Handles transaction monitoring, commission analytics, and platform management.
 """
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from enum import Enum
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc, asc
 from sqlalchemy.sql import text
 
+from app.crud.aggregation import sum_where, supports_filter_clause
+from app.crud.pagination import keyset_paginate
+from app.crud.time_buckets import add_months, aggregate_by_bucket, bucket_label, bucket_start
+from app.models.daily_metrics import DailyMetric
 from app.models.virtual_account import VirtualAccount, VirtualAccountStatus
 from app.models.virtual_account_transaction import VirtualAccountTransaction, TransactionType, TransactionStatus, TransactionIndicator
 from app.models.user import User, UserRole
@@ -21,28 +26,24 @@ from app.schemas.dashboard import (
 )
 
 
-def get_transaction_logs(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
-    filters: Optional[TransactionFilter] = None
-) -> List[TransactionLogEntry]:
-    """
-    Get transaction logs with filtering and pagination for admin monitoring.
-    """
-    query = db.query(
-        VirtualAccountTransaction,
-        VirtualAccount.virtual_account_number,
-        User.first_name,
-        User.last_name,
-        User.username
-    ).join(
-        VirtualAccount, VirtualAccountTransaction.virtual_account_id == VirtualAccount.id
-    ).join(
-        User, VirtualAccount.user_id == User.id
-    )
-    
-    # Apply filters
+def _decimal(value) -> Decimal:
+    """SUM() result as a Decimal (NULL when no rows; float on SQLite)."""
+    if value is None:
+        return Decimal('0')
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+# Columns of a transaction export, in file order
+EXPORT_COLUMNS = [
+    "transaction_reference", "virtual_account_number", "user_name",
+    "transaction_type", "transaction_indicator", "status", "principal_amount",
+    "settled_amount", "fee_charged", "insureflow_commission", "habari_commission",
+    "currency", "sender_name", "policy_id", "transaction_date"
+]
+
+
+def _filter_transaction_logs(query, filters: Optional[TransactionFilter]):
+    """Apply a TransactionFilter to a query joining transactions, accounts and users."""
     if filters:
         if filters.start_date:
             query = query.filter(VirtualAccountTransaction.transaction_date >= filters.start_date)
@@ -62,17 +63,79 @@ def get_transaction_logs(
             query = query.filter(VirtualAccount.id == filters.virtual_account_id)
         if filters.policy_id:
             query = query.filter(VirtualAccountTransaction.policy_id == filters.policy_id)
+    return query
+
+
+def iter_transaction_export_rows(
+    db: Session,
+    filters: Optional[TransactionFilter] = None,
+    batch_size: int = 1000
+) -> Iterator[tuple]:
+    """
+    Yield transaction rows in EXPORT_COLUMNS order, oldest first, through a
+    server-side cursor `batch_size` rows at a time. Plain column tuples, so
+    nothing accumulates in the session however many rows are read.
+    """
+    query = db.query(
+        VirtualAccountTransaction.transaction_reference,
+        VirtualAccount.virtual_account_number,
+        func.coalesce(func.nullif(User.full_name, ''), User.username),
+        VirtualAccountTransaction.transaction_type,
+        VirtualAccountTransaction.transaction_indicator,
+        VirtualAccountTransaction.status,
+        VirtualAccountTransaction.principal_amount,
+        VirtualAccountTransaction.settled_amount,
+        VirtualAccountTransaction.fee_charged,
+        VirtualAccountTransaction.insureflow_commission,
+        VirtualAccountTransaction.habari_commission,
+        VirtualAccountTransaction.currency,
+        VirtualAccountTransaction.sender_name,
+        VirtualAccountTransaction.policy_id,
+        VirtualAccountTransaction.transaction_date
+    ).join(
+        VirtualAccount, VirtualAccountTransaction.virtual_account_id == VirtualAccount.id
+    ).join(
+        User, VirtualAccount.user_id == User.id
+    )
+    query = _filter_transaction_logs(query, filters).order_by(
+        VirtualAccountTransaction.created_at, VirtualAccountTransaction.id
+    ).execution_options(stream_results=True, yield_per=batch_size)
     
-    # Order by most recent first
-    query = query.order_by(desc(VirtualAccountTransaction.created_at))
+    for row in query:
+        yield tuple(value.value if isinstance(value, Enum) else value for value in row)
+
+
+def get_transaction_logs(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[TransactionFilter] = None,
+    cursor: Optional[str] = None
+) -> List[TransactionLogEntry]:
+    """
+    Get transaction logs, newest first, with filtering and offset or cursor pagination for admin monitoring.
+    """
+    query = db.query(
+        VirtualAccountTransaction,
+        VirtualAccount.virtual_account_number,
+        User.full_name,
+        User.username
+    ).join(
+        VirtualAccount, VirtualAccountTransaction.virtual_account_id == VirtualAccount.id
+    ).join(
+        User, VirtualAccount.user_id == User.id
+    )
+    query = _filter_transaction_logs(query, filters)
     
-    # Apply pagination
-    results = query.offset(skip).limit(limit).all()
+    # Most recent first, one page
+    results = keyset_paginate(
+        query, VirtualAccountTransaction.created_at, VirtualAccountTransaction.id, skip, limit, cursor
+    ).all()
     
     # Transform to TransactionLogEntry
     logs = []
-    for transaction, account_number, first_name, last_name, username in results:
-        user_name = f"{first_name or ''} {last_name or ''}".strip() or username
+    for transaction, account_number, full_name, username in results:
+        user_name = (full_name or '').strip() or username
         
         logs.append(TransactionLogEntry(
             id=transaction.id,
@@ -99,71 +162,55 @@ def get_transaction_logs(
     return logs
 
 
-def get_commission_analytics(db: Session) -> CommissionAnalytics:
+def get_revenue_totals(db: Session) -> Dict[str, Any]:
     """
-    Calculate comprehensive commission analytics for InsureFlow.
+    InsureFlow revenue (its 0.75% share) all-time, this month, today and last month,
+    with month-on-month growth, in one pass over the daily rollups.
     """
-    # Total InsureFlow revenue (0.75% of all transactions)
-    total_revenue = db.query(
-        func.sum(VirtualAccountTransaction.insureflow_commission)
-    ).filter(
-        VirtualAccountTransaction.status == TransactionStatus.COMPLETED
-    ).scalar() or Decimal('0')
-    
-    # Monthly revenue (current month)
-    current_month_start = date.today().replace(day=1)
-    monthly_revenue = db.query(
-        func.sum(VirtualAccountTransaction.insureflow_commission)
-    ).filter(
-        and_(
-            VirtualAccountTransaction.status == TransactionStatus.COMPLETED,
-            VirtualAccountTransaction.transaction_date >= current_month_start
-        )
-    ).scalar() or Decimal('0')
-    
-    # Daily revenue (today)
+    native = supports_filter_clause(db)
     today = date.today()
-    daily_revenue = db.query(
-        func.sum(VirtualAccountTransaction.insureflow_commission)
-    ).filter(
-        and_(
-            VirtualAccountTransaction.status == TransactionStatus.COMPLETED,
-            func.date(VirtualAccountTransaction.transaction_date) == today
-        )
-    ).scalar() or Decimal('0')
-    
-    # Revenue growth rate (comparing this month to last month)
-    last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-    last_month_end = current_month_start - timedelta(days=1)
-    
-    last_month_revenue = db.query(
-        func.sum(VirtualAccountTransaction.insureflow_commission)
-    ).filter(
-        and_(
-            VirtualAccountTransaction.status == TransactionStatus.COMPLETED,
-            VirtualAccountTransaction.transaction_date >= last_month_start,
-            VirtualAccountTransaction.transaction_date <= last_month_end
-        )
-    ).scalar() or Decimal('0')
-    
-    revenue_growth_rate = float(
-        (monthly_revenue - last_month_revenue) / last_month_revenue * 100
-    ) if last_month_revenue > 0 else 0.0
+    current_month_start = today.replace(day=1)
+    last_month_start = add_months(current_month_start, -1)
+    
+    revenue = DailyMetric.insureflow_commission
+    totals = db.query(
+        func.sum(revenue).label("total"),
+        sum_where(revenue, DailyMetric.metric_date >= current_month_start, native).label("monthly"),
+        sum_where(revenue, DailyMetric.metric_date == today, native).label("daily"),
+        sum_where(
+            revenue,
+            and_(DailyMetric.metric_date >= last_month_start, DailyMetric.metric_date < current_month_start),
+            native
+        ).label("last_month"),
+        func.sum(DailyMetric.transaction_count).label("transaction_count"),
+    ).one()
+    
+    total_revenue = _decimal(totals.total)
+    monthly_revenue = _decimal(totals.monthly)
+    last_month_revenue = _decimal(totals.last_month)
+    transaction_count = int(totals.transaction_count or 0)
     
-    # Average commission per transaction
-    transaction_count = db.query(
-        func.count(VirtualAccountTransaction.id)
-    ).filter(
-        VirtualAccountTransaction.status == TransactionStatus.COMPLETED
-    ).scalar() or 0
-    
-    avg_commission = total_revenue / transaction_count if transaction_count > 0 else Decimal('0')
-    
-    # Top revenue generating brokers (based on transaction volume from their VAs)
+    return {
+        "total_revenue": total_revenue,
+        "monthly_revenue": monthly_revenue,
+        "daily_revenue": _decimal(totals.daily),
+        "last_month_revenue": last_month_revenue,
+        # Comparing this month to last month
+        "growth_rate": float(
+            (monthly_revenue - last_month_revenue) / last_month_revenue * 100
+        ) if last_month_revenue > 0 else 0.0,
+        "transaction_count": transaction_count,
+        "avg_commission_per_transaction": total_revenue / transaction_count if transaction_count > 0 else Decimal('0'),
+    }
+
+
+def get_top_revenue_brokers(db: Session, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Brokers whose virtual accounts generated the most InsureFlow commission.
+    """
     top_brokers = db.query(
         User.id,
-        User.first_name,
-        User.last_name,
+        User.full_name,
         User.username,
         func.sum(VirtualAccountTransaction.insureflow_commission).label('total_commission'),
         func.count(VirtualAccountTransaction.id).label('transaction_count')
@@ -177,52 +224,65 @@ def get_commission_analytics(db: Session) -> CommissionAnalytics:
             User.role.in_([UserRole.BROKER, UserRole.BROKER_ADMIN, UserRole.BROKER_ACCOUNTANT])
         )
     ).group_by(
-        User.id, User.first_name, User.last_name, User.username
+        User.id, User.full_name, User.username
     ).order_by(
         desc('total_commission')
-    ).limit(10).all()
+    ).limit(limit).all()
     
-    top_revenue_brokers = [
+    return [
         {
             "user_id": broker.id,
-            "name": f"{broker.first_name or ''} {broker.last_name or ''}".strip() or broker.username,
+            "name": broker.full_name or broker.username,
             "total_commission": float(broker.total_commission),
             "transaction_count": broker.transaction_count
         }
         for broker in top_brokers
     ]
-    
-    # Monthly trends (last 12 months)
-    monthly_trends = []
-    for i in range(12):
-        month_start = (current_month_start - timedelta(days=i*30)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_revenue = db.query(
-            func.sum(VirtualAccountTransaction.insureflow_commission)
-        ).filter(
-            and_(
-                VirtualAccountTransaction.status == TransactionStatus.COMPLETED,
-                VirtualAccountTransaction.transaction_date >= month_start,
-                VirtualAccountTransaction.transaction_date <= month_end
-            )
-        ).scalar() or Decimal('0')
-        
-        monthly_trends.append({
-            "month": month_start.strftime("%Y-%m"),
-            "revenue": float(month_revenue)
-        })
-    
-    monthly_trends.reverse()  # Chronological order
+
+
+def get_revenue_trends(db: Session, period: str = "monthly", months: int = 12) -> List[Dict[str, Any]]:
+    """
+    InsureFlow revenue per day, week, month or year over the last `months` calendar
+    months (including this one), oldest first, with empty periods as zero.
+    Items carry "month", "period" and "revenue".
+    """
+    today = date.today()
+    end = add_months(today, 1)
+    start = bucket_start(add_months(today, 1 - months), period)
+    
+    buckets = aggregate_by_bucket(
+        db,
+        DailyMetric.metric_date,
+        {"revenue": func.sum(DailyMetric.insureflow_commission)},
+        start,
+        end,
+        period
+    )
+    return [
+        {
+            # "month" (the bucket's calendar month) is the original key; "period" labels the bucket itself
+            "month": bucket_day.strftime("%Y-%m"),
+            "period": bucket_label(bucket_day, period),
+            "revenue": float(values["revenue"])
+        }
+        for bucket_day, values in buckets
+    ]
+
+
+def get_commission_analytics(db: Session) -> CommissionAnalytics:
+    """
+    Calculate comprehensive commission analytics for InsureFlow.
+    """
+    totals = get_revenue_totals(db)
     
     return CommissionAnalytics(
-        total_revenue_generated=total_revenue,
-        monthly_revenue=monthly_revenue,
-        daily_revenue=daily_revenue,
-        revenue_growth_rate=revenue_growth_rate,
-        avg_commission_per_transaction=avg_commission,
-        top_revenue_generating_brokers=top_revenue_brokers,
-        monthly_trends=monthly_trends
+        total_revenue_generated=totals["total_revenue"],
+        monthly_revenue=totals["monthly_revenue"],
+        daily_revenue=totals["daily_revenue"],
+        revenue_growth_rate=totals["growth_rate"],
+        avg_commission_per_transaction=totals["avg_commission_per_transaction"],
+        top_revenue_generating_brokers=get_top_revenue_brokers(db),
+        monthly_trends=get_revenue_trends(db, "monthly", 12)
     )
 
 
@@ -240,11 +300,12 @@ def get_platform_health_metrics(db: Session) -> PlatformHealthMetrics:
     ).count()
     
     # Transaction metrics
-    today = date.today()
+    day_start, day_end, _ = financial_report_range("daily")
     failed_transactions_today = db.query(VirtualAccountTransaction).filter(
         and_(
             VirtualAccountTransaction.status == TransactionStatus.FAILED,
-            func.date(VirtualAccountTransaction.transaction_date) == today
+            VirtualAccountTransaction.transaction_date >= day_start,
+            VirtualAccountTransaction.transaction_date < day_end
         )
     ).count()
     
@@ -256,11 +317,7 @@ def get_platform_health_metrics(db: Session) -> PlatformHealthMetrics:
     ).count()
     
     # Total transaction volume
-    total_transaction_volume = db.query(
-        func.sum(VirtualAccountTransaction.principal_amount)
-    ).filter(
-        VirtualAccountTransaction.status == TransactionStatus.COMPLETED
-    ).scalar() or Decimal('0')
+    total_transaction_volume = _decimal(db.query(func.sum(DailyMetric.transaction_volume)).scalar())
     
     # Webhook success rate (last 24 hours)
     yesterday = datetime.now() - timedelta(days=1)
@@ -314,51 +371,72 @@ def get_platform_health_metrics(db: Session) -> PlatformHealthMetrics:
     )
 
 
-def get_financial_report(db: Session, period: str = "monthly") -> FinancialReport:
+def financial_report_range(period: str = "monthly", today: Optional[date] = None) -> Tuple[datetime, datetime, str]:
     """
-    Generate financial report for accounting and reconciliation.
+    Half-open [start, end) timestamps and label of the current day, month, quarter or year.
     """
-    # Determine date range based on period
+    today = today or date.today()
     if period == "daily":
-        start_date = date.today()
-        end_date = start_date
-        report_period = start_date.strftime("%Y-%m-%d")
-    elif period == "monthly":
-        start_date = date.today().replace(day=1)
-        end_date = date.today()
-        report_period = start_date.strftime("%Y-%m")
-    else:  # yearly
-        start_date = date.today().replace(month=1, day=1)
-        end_date = date.today()
-        report_period = str(start_date.year)
-    
-    # Transaction metrics
-    transactions = db.query(VirtualAccountTransaction).filter(
-        and_(
-            func.date(VirtualAccountTransaction.transaction_date) >= start_date,
-            func.date(VirtualAccountTransaction.transaction_date) <= end_date,
-            VirtualAccountTransaction.status == TransactionStatus.COMPLETED
-        )
+        start_day, end_day = today, today + timedelta(days=1)
+        label = today.strftime("%Y-%m-%d")
+    elif period == "quarterly":
+        start_day = today.replace(month=(today.month - 1) // 3 * 3 + 1, day=1)
+        end_day = add_months(start_day, 3)
+        label = f"{today.year}-Q{(today.month - 1) // 3 + 1}"
+    elif period == "yearly":
+        start_day, end_day = today.replace(month=1, day=1), today.replace(year=today.year + 1, month=1, day=1)
+        label = str(today.year)
+    else:  # monthly
+        start_day, end_day = today.replace(day=1), add_months(today, 1)
+        label = start_day.strftime("%Y-%m")
+    return datetime.combine(start_day, time.min), datetime.combine(end_day, time.min), label
+
+
+def get_financial_report(
+    db: Session,
+    period: str = "monthly",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> FinancialReport:
+    """
+    Generate financial report for accounting and reconciliation.
+    Covers the current `period`, or the custom range [start, end) when both are given.
+    Transactions are filtered on the raw transaction_date so an index on it applies.
+    """
+    if start is not None and end is not None:
+        report_period = f"{start.isoformat()} to {end.isoformat()}"
+    else:
+        start, end, report_period = financial_report_range(period)
+    
+    in_period = and_(
+        VirtualAccountTransaction.transaction_date >= start,
+        VirtualAccountTransaction.transaction_date < end,
+        VirtualAccountTransaction.status == TransactionStatus.COMPLETED
     )
     
-    total_transactions = transactions.count()
-    
-    # Financial metrics
-    gross_transaction_volume = transactions.with_entities(
-        func.sum(VirtualAccountTransaction.principal_amount)
-    ).scalar() or Decimal('0')
-    
-    total_fees_collected = transactions.with_entities(
-        func.sum(VirtualAccountTransaction.fee_charged)
-    ).scalar() or Decimal('0')
-    
-    insureflow_commission_earned = transactions.with_entities(
-        func.sum(VirtualAccountTransaction.insureflow_commission)
-    ).scalar() or Decimal('0')
-    
-    habari_commission_paid = transactions.with_entities(
-        func.sum(VirtualAccountTransaction.habari_commission)
-    ).scalar() or Decimal('0')
+    # Completed transactions per type; the period totals are the sum of the groups
+    by_type = db.query(
+        VirtualAccountTransaction.transaction_type,
+        func.count(VirtualAccountTransaction.id).label("count"),
+        func.sum(VirtualAccountTransaction.principal_amount).label("volume"),
+        func.sum(VirtualAccountTransaction.fee_charged).label("fees"),
+        func.sum(VirtualAccountTransaction.insureflow_commission).label("insureflow"),
+        func.sum(VirtualAccountTransaction.habari_commission).label("habari"),
+    ).filter(in_period).group_by(VirtualAccountTransaction.transaction_type).all()
+    
+    transaction_breakdown = {tx_type.value: 0 for tx_type in TransactionType}
+    total_transactions = 0
+    gross_transaction_volume = Decimal('0')
+    total_fees_collected = Decimal('0')
+    insureflow_commission_earned = Decimal('0')
+    habari_commission_paid = Decimal('0')
+    for row in by_type:
+        transaction_breakdown[row.transaction_type.value] = row.count
+        total_transactions += row.count
+        gross_transaction_volume += _decimal(row.volume)
+        total_fees_collected += _decimal(row.fees)
+        insureflow_commission_earned += _decimal(row.insureflow)
+        habari_commission_paid += _decimal(row.habari)
     
     net_revenue = insureflow_commission_earned - total_fees_collected
     
@@ -372,14 +450,6 @@ def get_financial_report(db: Session, period: str = "monthly") -> FinancialRepor
         )
     ).scalar() or Decimal('0')
     
-    # Transaction breakdown by type
-    transaction_breakdown = {}
-    for tx_type in TransactionType:
-        count = transactions.filter(
-            VirtualAccountTransaction.transaction_type == tx_type
-        ).count()
-        transaction_breakdown[tx_type.value] = count
-    
     # Top policies by transaction volume
     top_policies = db.query(
         Policy.id,
@@ -390,11 +460,7 @@ def get_financial_report(db: Session, period: str = "monthly") -> FinancialRepor
     ).join(
         VirtualAccountTransaction, Policy.id == VirtualAccountTransaction.policy_id
     ).filter(
-        and_(
-            func.date(VirtualAccountTransaction.transaction_date) >= start_date,
-            func.date(VirtualAccountTransaction.transaction_date) <= end_date,
-            VirtualAccountTransaction.status == TransactionStatus.COMPLETED
-        )
+        in_period
     ).group_by(
         Policy.id, Policy.policy_name, Policy.company_name
     ).order_by(
@@ -1,14 +1,15 @@
 """
 CRUD operations for the Notification model.
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_
+from datetime import date, datetime, timedelta
+from sqlalchemy import DateTime, Integer, Select, String, cast, false, func, insert, literal, select, update
 
+from app.crud.pagination import keyset_paginate
 from app.models.notification import Notification, NotificationType
 from app.models.user import User, UserRole
-from app.models.policy import Policy
+from app.models.policy import Policy, PolicyStatus
 from app.models.broker import Broker
 from app.models.premium import Premium, PaymentStatus
 
@@ -47,10 +48,11 @@ def get_broker_notifications(
     db: Session,
     broker_id: int,
     unread_only: bool = False,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None
 ) -> List[Notification]:
     """
-    Get notifications for a specific broker.
+    Get notifications for a specific broker, newest first, starting after `cursor` when given.
     """
     query = db.query(Notification).filter(
         Notification.broker_id == broker_id,
@@ -60,7 +62,7 @@ def get_broker_notifications(
     if unread_only:
         query = query.filter(Notification.is_read == False)
     
-    return query.order_by(Notification.created_at.desc()).limit(limit).all()
+    return keyset_paginate(query, Notification.created_at, Notification.id, limit=limit, cursor=cursor).all()
 
 
 def mark_notification_as_read(db: Session, notification_id: int, broker_id: int) -> Optional[Notification]:
@@ -110,111 +112,177 @@ def get_unread_count(db: Session, broker_id: int) -> int:
     ).count()
 
 
-def get_overdue_policies_without_recent_reminders(
-    db: Session,
-    max_days_overdue: int = 30,
-    reminder_cooldown_hours: int = 24
-) -> List[tuple]:
+def _days_overdue(end_date, today: date, dialect_name: str):
+    """Whole days between a policy's end date and `today`, in SQL."""
+    if dialect_name == "sqlite":
+        return cast(func.julianday(literal(today)) - func.julianday(end_date), Integer)
+    return literal(today) - end_date
+
+
+def _naira_text(amount, dialect_name: str):
     """
-    Get policies that are overdue but haven't had reminders sent recently.
-    This is an optimized query that performs calculations in the database.
-    Uses PostgreSQL-compatible date functions.
-    Returns tuples of (policy, broker, customer, days_overdue, outstanding_amount).
+    An amount as text with thousands separators and kobo, like f"{amount:,.2f}", in SQL.
+    Other dialects get the plain rounded amount, without separators.
     """
-    now = datetime.utcnow()
-    reminder_cooldown_date = now - timedelta(hours=reminder_cooldown_hours)
-    
-    # Subquery to calculate outstanding amounts and filter for unpaid premiums
-    outstanding_subquery = db.query(
-        Premium.policy_id,
-        func.sum(Premium.outstanding_amount).label("total_outstanding")
-    ).filter(
-        Premium.payment_status != PaymentStatus.PAID
-    ).group_by(Premium.policy_id).subquery()
-
-    # Calculate days overdue using PostgreSQL-compatible functions
-    days_overdue_expr = func.current_date() - Policy.end_date
-
-    # Main query to get overdue policies
-    query = db.query(
-        Policy,
-        Broker,
-        User,
-        days_overdue_expr.label("days_overdue"),
-        outstanding_subquery.c.total_outstanding
-    ).join(
-        Broker, Policy.broker_id == Broker.id
-    ).join(
-        User, Policy.user_id == User.id
-    ).join(
-        outstanding_subquery, Policy.id == outstanding_subquery.c.policy_id
-    ).filter(
-        # Policy is active
-        Policy.status == "active",
-        # Policy is associated with a broker
-        Policy.broker_id.isnot(None),
-        # User is a customer (not an admin or broker policy)
-        User.role == UserRole.CUSTOMER,
-        # Outstanding amount is greater than 0
-        outstanding_subquery.c.total_outstanding > 0,
-        # Policy is overdue but not more than max_days_overdue
-        and_(
-            days_overdue_expr > 0,
-            days_overdue_expr <= max_days_overdue
-        ),
-        # Reminder has not been sent recently (or ever)
-        (Policy.reminder_sent_at.is_(None) | (Policy.reminder_sent_at < reminder_cooldown_date))
-    )
-    
-    return query.all()
+    if dialect_name == "postgresql":
+        return func.to_char(amount, "FM999,999,999,990.00")
+    if dialect_name == "sqlite":
+        kobo = cast(func.round(amount * 100), Integer)
+        return func.printf("%,d.%02d", kobo / 100, kobo % 100)
+    return cast(func.round(amount, 2), String)
 
 
-def get_overdue_policies_for_manual_reminders(
+def overdue_reminder_candidates(
     db: Session,
+    max_days_overdue: Optional[int] = None,
+    reminder_cooldown_hours: Optional[int] = None,
     broker_ids: Optional[List[int]] = None,
-    policy_ids: Optional[List[int]] = None
-) -> List[tuple]:
+    policy_ids: Optional[List[int]] = None,
+    policy_id_range: Optional[Tuple[int, int]] = None
+) -> Select:
     """
-    Get overdue policies for manual reminders, filtered by broker or policy IDs.
+    SELECT of the active, overdue broker policies with an outstanding balance
+    that a payment reminder should go out for, one row per policy, with the
+    reminder's recipient, title and message computed in the database.
+    `max_days_overdue` and `reminder_cooldown_hours` limit how far past due
+    and how recently reminded a policy may be (automatic reminders); the id
+    filters pick brokers or policies (manual reminders).
     """
-    now = datetime.utcnow()
+    dialect_name = db.get_bind().dialect.name
+    today = date.today()
 
-    outstanding_subquery = db.query(
+    outstanding = select(
         Premium.policy_id,
         func.sum(Premium.outstanding_amount).label("total_outstanding")
-    ).filter(
+    ).where(
         Premium.payment_status != PaymentStatus.PAID
-    ).group_by(Premium.policy_id).subquery()
-
-    days_overdue_expr = func.current_date() - Policy.end_date
+    )
+    if policy_id_range:
+        # Only total the chunk's premiums
+        outstanding = outstanding.where(Premium.policy_id.between(*policy_id_range))
+    outstanding = outstanding.group_by(Premium.policy_id).subquery()
 
-    query = db.query(
-        Policy,
-        Broker,
-        User,
-        days_overdue_expr.label("days_overdue"),
-        outstanding_subquery.c.total_outstanding
+    days_overdue = _days_overdue(Policy.end_date, today, dialect_name)
+    customer_name = func.coalesce(User.full_name, "")
+    query = select(
+        Policy.id.label("policy_id"),
+        Policy.policy_number,
+        Broker.user_id.label("broker_user_id"),
+        Broker.name.label("broker_name"),
+        User.full_name.label("customer_name"),
+        days_overdue.label("days_overdue"),
+        outstanding.c.total_outstanding.label("outstanding_amount"),
+        (literal("Payment Reminder - Policy ") + Policy.policy_number).label("title"),
+        (
+            literal("Policy ") + Policy.policy_number + " for " + customer_name
+            + " is " + cast(days_overdue, String) + " days overdue. Outstanding amount: ₦"
+            + _naira_text(outstanding.c.total_outstanding, dialect_name)
+            + ". Please follow up with the customer."
+        ).label("message"),
     ).join(
         Broker, Policy.broker_id == Broker.id
     ).join(
         User, Policy.user_id == User.id
     ).join(
-        outstanding_subquery, Policy.id == outstanding_subquery.c.policy_id
-    ).filter(
-        Policy.status == "active",
-        Policy.broker_id.isnot(None),
+        outstanding, Policy.id == outstanding.c.policy_id
+    ).where(
+        Policy.status == PolicyStatus.ACTIVE,
+        # User is a customer (not an admin or broker policy)
         User.role == UserRole.CUSTOMER,
-        outstanding_subquery.c.total_outstanding > 0,
-        days_overdue_expr > 0
+        outstanding.c.total_outstanding > 0,
+        # A plain end_date range, so the (status, end_date) index applies
+        Policy.end_date < today
     )
 
+    if max_days_overdue is not None:
+        query = query.where(Policy.end_date >= today - timedelta(days=max_days_overdue))
+    if reminder_cooldown_hours is not None:
+        reminder_cooldown_date = datetime.utcnow() - timedelta(hours=reminder_cooldown_hours)
+        query = query.where(Policy.reminder_sent_at.is_(None) | (Policy.reminder_sent_at < reminder_cooldown_date))
     if broker_ids:
-        query = query.filter(Policy.broker_id.in_(broker_ids))
-    
+        query = query.where(Policy.broker_id.in_(broker_ids))
     if policy_ids:
-        query = query.filter(Policy.id.in_(policy_ids))
+        query = query.where(Policy.id.in_(policy_ids))
+    if policy_id_range:
+        query = query.where(Policy.id.between(*policy_id_range))
+    return query
 
-    return query.all()
+
+def insert_payment_reminders(db: Session, candidates: Select, created_at: datetime) -> int:
+    """
+    One INSERT ... SELECT writing a reminder notification for every candidate,
+    all stamped `created_at` so the run's rows can be found again (the caller commits).
+    Returns how many were created.
+    """
+    rows = candidates.subquery()
+    result = db.execute(
+        insert(Notification).from_select(
+            ["broker_id", "policy_id", "type", "title", "message", "is_read", "is_dismissed", "created_at"],
+            select(
+                rows.c.broker_user_id,
+                rows.c.policy_id,
+                literal(NotificationType.PAYMENT_REMINDER.value),
+                rows.c.title,
+                rows.c.message,
+                false(),
+                false(),
+                literal(created_at, DateTime)
+            )
+        )
+    )
+    return result.rowcount
+
+
+def _reminders_created_at(created_at: datetime) -> list:
+    return [
+        Notification.type == NotificationType.PAYMENT_REMINDER.value,
+        Notification.created_at == created_at
+    ]
+
+
+def stamp_reminded_policies(db: Session, created_at: datetime) -> int:
+    """
+    One UPDATE ... FROM notifications setting reminder_sent_at on the policies
+    reminded at `created_at` (the caller commits).
+    """
+    result = db.execute(
+        update(Policy)
+        .where(Policy.id == Notification.policy_id, *_reminders_created_at(created_at))
+        .values(reminder_sent_at=created_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def get_reminded_broker_ids(db: Session, created_at: datetime) -> Set[int]:
+    """
+    Broker users who got a reminder at `created_at`.
+    """
+    return set(db.execute(
+        select(Notification.broker_id).where(*_reminders_created_at(created_at)).distinct()
+    ).scalars())
+
+
+def get_reminder_sample(db: Session, candidates: Select, created_at: datetime, limit: int) -> List[Dict[str, Any]]:
+    """
+    Up to `limit` of the reminders created at `created_at`, described from the
+    candidate rows they were made from. Must run before the policies are stamped.
+    """
+    rows = candidates.subquery()
+    sample = db.execute(
+        select(
+            Notification.id.label("notification_id"),
+            rows.c.policy_id,
+            rows.c.policy_number,
+            rows.c.broker_name,
+            rows.c.customer_name,
+            rows.c.outstanding_amount,
+            rows.c.days_overdue
+        ).join(
+            Notification, Notification.policy_id == rows.c.policy_id
+        ).where(*_reminders_created_at(created_at)).order_by(Notification.id).limit(limit)
+    ).mappings().all()
+    return [{**row, "sent_at": created_at.isoformat()} for row in sample]
 
 
 def cleanup_old_notifications(db: Session, days_old: int = 30) -> int:
@@ -2,10 +2,11 @@
 CRUD operations for the Payment model.
 """
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, joinedload
+from sqlalchemy import func, insert, or_, select
+from app.crud.pagination import keyset_paginate
 from app.models.payment import Payment, PaymentTransactionStatus
 from app.schemas.payment import SquadCoTransactionData, PaymentCreate
 from app.models.premium import Premium, PaymentStatus
@@ -13,6 +14,8 @@ from app.models.policy import Policy
 from app.models.broker import Broker
 from app.models.user import User
 
+PENDING_STATUSES = (PaymentTransactionStatus.PENDING, PaymentTransactionStatus.PROCESSING)
+
 def create_payment(db: Session, payment: PaymentCreate) -> Payment:
     """
     Creates a new payment record in the database.
@@ -23,6 +26,16 @@ def create_payment(db: Session, payment: PaymentCreate) -> Payment:
     db.refresh(db_payment)
     return db_payment
 
+def insert_payments(db: Session, payments: List[PaymentCreate], **fields: Any) -> int:
+    """
+    Inserts payment records with one multi-row INSERT inside the caller's
+    transaction (the caller commits). `fields` are set on every record.
+    """
+    if not payments:
+        return 0
+    db.execute(insert(Payment), [{**payment.model_dump(), **fields} for payment in payments])
+    return len(payments)
+
 def get_payment_by_transaction_ref(db: Session, transaction_ref: str) -> Payment | None:
     """
     Retrieves a payment from the database by its transaction reference.
@@ -38,6 +51,54 @@ def get_payment_by_premium_and_ref(db: Session, premium_id: int, transaction_ref
         Payment.transaction_reference == transaction_ref
     ).first()
 
+def _filter_payments(query: Query, filters: Optional[Dict[str, Any]]) -> Query:
+    """Apply the history filters; raises ValueError for an unknown status."""
+    if filters and filters.get('status'):
+        query = query.filter(Payment.status == PaymentTransactionStatus(str(filters['status']).upper()))
+    return query
+
+def _owned_by(query: Query, user_id: int) -> Query:
+    """Payments for policies the user holds or brokers."""
+    broker_ids = select(Broker.id).where(Broker.user_id == user_id)
+    return query.join(Premium, Payment.premium_id == Premium.id).join(Policy, Premium.policy_id == Policy.id).filter(
+        or_(Policy.user_id == user_id, Policy.broker_id.in_(broker_ids))
+    )
+
+def get_payments(
+    db: Session, skip: int = 0, limit: int = 100, filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None
+) -> List[Payment]:
+    """
+    Retrieves a page of payments, newest first.
+    """
+    query = _filter_payments(db.query(Payment), filters)
+    return keyset_paginate(query, Payment.created_at, Payment.id, skip, limit, cursor).all()
+
+def get_payments_by_user(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100,
+    filters: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None
+) -> List[Payment]:
+    """
+    Retrieves a page of the user's payments, newest first.
+    """
+    query = _filter_payments(_owned_by(db.query(Payment), user_id), filters)
+    return keyset_paginate(query, Payment.created_at, Payment.id, skip, limit, cursor).all()
+
+def get_pending_payments(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Payment]:
+    """
+    Retrieves a page of pending or processing payments, newest first.
+    """
+    query = db.query(Payment).filter(Payment.status.in_(PENDING_STATUSES))
+    return keyset_paginate(query, Payment.created_at, Payment.id, skip, limit, cursor).all()
+
+def get_pending_payments_by_user(
+    db: Session, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Payment]:
+    """
+    Retrieves a page of the user's pending or processing payments, newest first.
+    """
+    query = _owned_by(db.query(Payment), user_id).filter(Payment.status.in_(PENDING_STATUSES))
+    return keyset_paginate(query, Payment.created_at, Payment.id, skip, limit, cursor).all()
+
 def update_payment_status(db: Session, payment: Payment, webhook_data: SquadCoTransactionData) -> Payment:
     """
     Updates the status of a payment based on webhook data.
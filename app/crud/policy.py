@@ -3,6 +3,9 @@ CRUD operations for the Policy model.
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
+from app.core.cache import response_cache
+from app.crud import daily_metrics
+from app.crud.pagination import keyset_paginate
 from app.models.policy import Policy
 from app.schemas.policy import PolicyCreate, PolicyUpdate
 
@@ -12,17 +15,21 @@ def get_policy(db: Session, policy_id: int) -> Optional[Policy]:
     """
     return db.query(Policy).options(joinedload(Policy.user)).filter(Policy.id == policy_id).first()
 
-def get_policies(db: Session, skip: int = 0, limit: int = 100) -> List[Policy]:
+def get_policies(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Policy]:
     """
-    Retrieves a list of policies from the database with user data.
+    Retrieves a page of policies, newest first, from the database with user data.
     """
-    return db.query(Policy).options(joinedload(Policy.user)).offset(skip).limit(limit).all()
+    query = db.query(Policy).options(joinedload(Policy.user))
+    return keyset_paginate(query, Policy.created_at, Policy.id, skip, limit, cursor).all()
 
-def get_policies_by_broker(db: Session, broker_id: int, skip: int = 0, limit: int = 100) -> List[Policy]:
+def get_policies_by_broker(
+    db: Session, broker_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Policy]:
     """
-    Retrieves a list of policies for a specific broker from the database with user data.
+    Retrieves a page of policies for a specific broker, newest first, from the database with user data.
     """
-    return db.query(Policy).options(joinedload(Policy.user)).filter(Policy.broker_id == broker_id).offset(skip).limit(limit).all()
+    query = db.query(Policy).options(joinedload(Policy.user)).filter(Policy.broker_id == broker_id)
+    return keyset_paginate(query, Policy.created_at, Policy.id, skip, limit, cursor).all()
 
 def create_policy(db: Session, policy: PolicyCreate, user_id: int, company_id: int) -> Policy:
     """
@@ -34,8 +41,11 @@ def create_policy(db: Session, policy: PolicyCreate, user_id: int, company_id: i
         company_id=company_id
     )
     db.add(db_policy)
+    db.flush()
+    daily_metrics.record_policy_created(db, db_policy)
     db.commit()
     db.refresh(db_policy)
+    response_cache.invalidate(reason="policy created")
     return db_policy
 
 def update_policy(db: Session, policy_id: int, policy_update: PolicyUpdate) -> Optional[Policy]:
@@ -45,11 +55,14 @@ def update_policy(db: Session, policy_id: int, policy_update: PolicyUpdate) -> O
     db_policy = get_policy(db, policy_id)
     if db_policy:
         update_data = policy_update.model_dump(exclude_unset=True)
+        old_dims = daily_metrics.dimensions(db_policy)
         for key, value in update_data.items():
             setattr(db_policy, key, value)
         db.add(db_policy)
+        daily_metrics.move_policy(db, db_policy, old_dims)
         db.commit()
         db.refresh(db_policy)
+        response_cache.invalidate(reason="policy updated")
     return db_policy
 
 def update_policy_payment_status(db, merchant_ref, status, tx_ref):
@@ -59,6 +72,7 @@ def update_policy_payment_status(db, merchant_ref, status, tx_ref):
     policy.payment_status = status
     policy.transaction_reference = tx_ref
     db.commit()
+    response_cache.invalidate(reason="policy payment status")
     # Optionally log the update
     # ...
 
@@ -68,7 +82,11 @@ def delete_policy(db: Session, policy_id: int) -> bool:
     """
     db_policy = get_policy(db, policy_id)
     if db_policy:
+        daily_metrics.apply(db, daily_metrics.MetricDeltas().add_policy_history(
+            db_policy, db_policy.premiums, [], sign=-1
+        ))
         db.delete(db_policy)
         db.commit()
+        response_cache.invalidate(reason="policy deleted")
         return True
     return False 
\ No newline at end of file
@@ -1,12 +1,21 @@
 """
 CRUD operations for the Premium model.
 """
-from typing import List, Optional
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session, joinedload
+from app.core.cache import response_cache
+from app.crud import daily_metrics
+from app.crud.pagination import keyset_paginate
 from app.models.premium import Premium, PaymentStatus
 from app.models.policy import Policy
 from app.schemas.premium import PremiumCreate, PremiumUpdate
 
+# Every status but PAID, spelled out so (policy_id, payment_status) lookups use the composite index
+UNPAID_STATUSES = tuple(status for status in PaymentStatus if status != PaymentStatus.PAID)
+
 
 def get_premium(db: Session, premium_id: int) -> Optional[Premium]:
     """
@@ -16,13 +25,14 @@ def get_premium(db: Session, premium_id: int) -> Optional[Premium]:
         joinedload(Premium.policy).joinedload(Policy.user)
     ).filter(Premium.id == premium_id).first()
 
-def get_premiums(db: Session, skip: int = 0, limit: int = 100) -> List[Premium]:
+def get_premiums(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Premium]:
     """
-    Retrieves a list of all premiums from the database with policy and user data.
+    Retrieves a page of premiums, newest first, from the database with policy and user data.
     """
-    return db.query(Premium).options(
+    query = db.query(Premium).options(
         joinedload(Premium.policy).joinedload(Policy.user)
-    ).offset(skip).limit(limit).all()
+    )
+    return keyset_paginate(query, Premium.created_at, Premium.id, skip, limit, cursor).all()
 
 def get_premiums_by_policy(db: Session, policy_id: int, skip: int = 0, limit: int = 100) -> List[Premium]:
     """
@@ -32,15 +42,18 @@ def get_premiums_by_policy(db: Session, policy_id: int, skip: int = 0, limit: in
         joinedload(Premium.policy).joinedload(Policy.user)
     ).filter(Premium.policy_id == policy_id).offset(skip).limit(limit).all()
 
-def get_premiums_by_broker(db: Session, broker_id: int, skip: int = 0, limit: int = 100) -> List[Premium]:
+def get_premiums_by_broker(
+    db: Session, broker_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> List[Premium]:
     """
-    Retrieves a list of premiums for policies belonging to a specific broker with policy and user data.
+    Retrieves a page of premiums, newest first, for policies belonging to a specific broker with policy and user data.
     """
-    return db.query(Premium).options(
+    query = db.query(Premium).options(
         joinedload(Premium.policy).joinedload(Policy.user)
     ).join(Policy).filter(
         Policy.broker_id == broker_id
-    ).offset(skip).limit(limit).all()
+    )
+    return keyset_paginate(query, Premium.created_at, Premium.id, skip, limit, cursor).all()
 
 def get_unpaid_premiums_by_policy(db: Session, policy_id: int) -> List[Premium]:
     """
@@ -50,9 +63,17 @@ def get_unpaid_premiums_by_policy(db: Session, policy_id: int) -> List[Premium]:
         joinedload(Premium.policy).joinedload(Policy.user)
     ).filter(
         Premium.policy_id == policy_id,
-        Premium.payment_status != PaymentStatus.PAID
+        Premium.payment_status.in_(UNPAID_STATUSES)
     ).all()
 
+def get_premiums_with_payers(db: Session, premium_ids: List[int]) -> List[Premium]:
+    """
+    Retrieves premiums by their IDs with policy and user data, in one query.
+    """
+    return db.query(Premium).options(
+        joinedload(Premium.policy).joinedload(Policy.user)
+    ).filter(Premium.id.in_(premium_ids)).order_by(Premium.id).all()
+
 def get_premiums_by_ids(db: Session, premium_ids: List[int]) -> List[Premium]:
     """
     Retrieves a list of premiums by their IDs.
@@ -65,7 +86,7 @@ def get_unpaid_premiums_for_policies(db: Session, policy_ids: List[int]) -> List
     """
     return db.query(Premium).filter(
         Premium.policy_id.in_(policy_ids),
-        Premium.payment_status != PaymentStatus.PAID
+        Premium.payment_status.in_(UNPAID_STATUSES)
     ).all()
 
 def create_premium(db: Session, premium: PremiumCreate) -> Premium:
@@ -74,8 +95,13 @@ def create_premium(db: Session, premium: PremiumCreate) -> Premium:
     """
     db_premium = Premium(**premium.model_dump())
     db.add(db_premium)
+    db.flush()
+    daily_metrics.apply(db, daily_metrics.MetricDeltas().add_premium(
+        db_premium, daily_metrics.dimensions(db_premium.policy)
+    ))
     db.commit()
     db.refresh(db_premium)
+    response_cache.invalidate(reason="premium created")
     return db_premium
 
 def update_premium(db: Session, premium_id: int, premium_update: PremiumUpdate) -> Optional[Premium]:
@@ -85,11 +111,15 @@ def update_premium(db: Session, premium_id: int, premium_update: PremiumUpdate)
     db_premium = get_premium(db, premium_id)
     if db_premium:
         update_data = premium_update.model_dump(exclude_unset=True)
+        dims = daily_metrics.dimensions(db_premium.policy)
+        metric_deltas = daily_metrics.MetricDeltas().add_premium(db_premium, dims, sign=-1)
         for key, value in update_data.items():
             setattr(db_premium, key, value)
         db.add(db_premium)
+        daily_metrics.apply(db, metric_deltas.add_premium(db_premium, dims))
         db.commit()
         db.refresh(db_premium)
+        response_cache.invalidate(reason="premium updated")
     return db_premium
 
 def delete_premium(db: Session, premium_id: int) -> bool:
@@ -98,26 +128,50 @@ def delete_premium(db: Session, premium_id: int) -> bool:
     """
     db_premium = get_premium(db, premium_id)
     if db_premium:
+        daily_metrics.apply(db, daily_metrics.MetricDeltas().add_premium(
+            db_premium, daily_metrics.dimensions(db_premium.policy), sign=-1
+        ))
         db.delete(db_premium)
         db.commit()
+        response_cache.invalidate(reason="premium deleted")
         return True
     return False
 
-from datetime import datetime
-from decimal import Decimal
-
 def update_premium_status_to_paid(db: Session, premium_id: int, amount_paid: Decimal = None, payment_date: datetime = None) -> Premium | None:
     """
     Updates the status of a premium to 'paid' and records payment details.
     """
-    premium = db.query(Premium).filter(Premium.id == premium_id).first()
+    premium = db.query(Premium).options(joinedload(Premium.policy)).filter(Premium.id == premium_id).first()
     if premium:
+        newly_paid = premium.payment_status != PaymentStatus.PAID
         premium.payment_status = PaymentStatus.PAID
         if amount_paid is not None:
             premium.paid_amount = amount_paid
         if payment_date:
             premium.payment_date = payment_date
         db.add(premium)
+        if newly_paid:
+            daily_metrics.record_premium_collected(db, premium, premium.policy)
         db.commit()
         db.refresh(premium)
-    return premium 
\ No newline at end of file
+        response_cache.invalidate(reason="premium paid")
+    return premium
+
+def mark_premiums_paid(db: Session, amounts: Dict[int, Decimal], payment_date: date) -> int:
+    """
+    Mark premiums paid with their own amounts in one UPDATE (the caller commits).
+    Premiums already paid are left alone; returns how many were updated.
+    """
+    if not amounts:
+        return 0
+    result = db.execute(
+        update(Premium)
+        .where(Premium.id.in_(list(amounts)), Premium.payment_status != PaymentStatus.PAID)
+        .values(
+            payment_status=PaymentStatus.PAID,
+            paid_amount=case(amounts, value=Premium.id),
+            payment_date=payment_date
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from sqlalchemy import and_
 
+from app.crud.pagination import keyset_paginate
 from app.models.support_ticket import SupportTicket, TicketStatus, TicketPriority, TicketCategory
 
 
@@ -78,11 +79,12 @@ def get_all_tickets(
     priority: Optional[str] = None,
     category: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ) -> List[SupportTicket]:
     """
-    Get all support tickets (admin only).
-    Supports filtering by status, priority, and category.
+    Get all support tickets (admin only), newest first.
+    Supports filtering by status, priority, and category, and paging by `skip` or `cursor`.
     """
     query = db.query(SupportTicket)
     
@@ -94,7 +96,7 @@ def get_all_tickets(
     if category and category.strip():
         query = query.filter(SupportTicket.category == category.strip().lower())
     
-    return query.order_by(SupportTicket.created_at.desc()).offset(skip).limit(limit).all()
+    return keyset_paginate(query, SupportTicket.created_at, SupportTicket.id, skip, limit, cursor).all()
 
 
 def update_ticket_status(
@@ -0,0 +1,122 @@
+"""
+Time-bucketed aggregation for trend charts.
+`aggregate_by_bucket` groups a date range into daily, weekly (Monday), monthly or
+yearly buckets in one GROUP BY and returns every bucket of the range, with
+zeros for buckets that have no rows.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import Date, cast, func
+from sqlalchemy.orm import Session
+
+from app.crud.daily_metrics import as_date
+
+PERIODS = ("daily", "weekly", "monthly", "yearly")
+
+LABEL_FORMATS = {
+    "daily": "%Y-%m-%d",
+    "weekly": "%G-W%V",
+    "monthly": "%Y-%m",
+    "yearly": "%Y",
+}
+
+# date_trunc units on PostgreSQL, date()/strftime() modifiers elsewhere
+_TRUNC_UNITS = {"daily": "day", "weekly": "week", "monthly": "month", "yearly": "year"}
+_SQLITE_BUCKETS = {
+    "daily": lambda column: func.date(column),
+    "weekly": lambda column: func.date(column, "weekday 0", "-6 days"),
+    "monthly": lambda column: func.strftime("%Y-%m-01", column),
+    "yearly": lambda column: func.strftime("%Y-01-01", column),
+}
+
+Bucket = Tuple[date, Dict[str, Any]]
+
+
+def _check_period(period: str) -> None:
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month `months` after (or before, when negative) `day`'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def bucket_start(day: date, period: str) -> date:
+    """Start of the bucket containing `day`."""
+    _check_period(period)
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    if period == "yearly":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start: date, period: str) -> date:
+    """Start of the bucket after the one starting at `start`."""
+    _check_period(period)
+    if period == "weekly":
+        return start + timedelta(weeks=1)
+    if period == "monthly":
+        return add_months(start, 1)
+    if period == "yearly":
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(start: date, end: date, period: str) -> List[date]:
+    """Starts of every bucket overlapping [start, end)."""
+    starts = []
+    current = bucket_start(start, period)
+    while current < end:
+        starts.append(current)
+        current = next_bucket(current, period)
+    return starts
+
+
+def bucket_label(start: date, period: str) -> str:
+    return start.strftime(LABEL_FORMATS[period])
+
+
+def bucket_expression(db: Session, column, period: str):
+    """SQL expression mapping `column` to the start date of its bucket."""
+    _check_period(period)
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc(_TRUNC_UNITS[period], column), Date)
+    return _SQLITE_BUCKETS[period](column)
+
+
+def aggregate_by_bucket(
+    db: Session,
+    column,
+    aggregates: Dict[str, Any],
+    start: date,
+    end: date,
+    period: str = "monthly",
+    filters: tuple = (),
+) -> List[Bucket]:
+    """
+    Evaluate `aggregates` (name -> SQL aggregate) per bucket of `column` for rows in
+    [start, end), in one GROUP BY. Returns (bucket start, {name: value}) for every
+    bucket of the range in order; buckets without rows get 0 for each aggregate.
+    """
+    bucket = bucket_expression(db, column, period).label("bucket")
+    rows = db.query(
+        bucket, *(aggregate.label(name) for name, aggregate in aggregates.items())
+    ).filter(
+        column >= start, column < end, *filters
+    ).group_by(bucket).all()
+
+    found = {as_date(row.bucket): row for row in rows}
+    buckets = []
+    for bucket_day in bucket_starts(start, end, period):
+        row = found.get(bucket_day)
+        buckets.append((bucket_day, {
+            name: (getattr(row, name) if row is not None else None) or 0
+            for name in aggregates
+        }))
+    return buckets
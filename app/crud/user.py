@@ -10,6 +10,10 @@ from app.models.user import User, UserRole
 from app.schemas.auth import UserCreate
 from app.schemas.user import UserUpdate
 from app.core.security import get_password_hash, verify_password
+from app.core.user_cache import token_versions, user_cache
+
+# Changing any of these revokes the user's issued tokens (their claims go stale)
+_TOKEN_CLAIM_FIELDS = {"email", "role", "is_active", "can_create_policies", "can_make_payments"}
 
 def get_user_by_email(db: Session, email: str) -> User:
     """
@@ -85,14 +89,54 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
     if not db_user:
         return None
     
+    previous_email = db_user.email
     update_data = user_update.dict(exclude_unset=True)
+    claims_changed = any(
+        getattr(db_user, field) != value
+        for field, value in update_data.items()
+        if field in _TOKEN_CLAIM_FIELDS
+    )
     for field, value in update_data.items():
         setattr(db_user, field, value)
+    if claims_changed:
+        db_user.token_version = (db_user.token_version or 0) + 1
     
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(previous_email, db_user.email)
+    if claims_changed:
+        token_versions.set(db_user.id, db_user.token_version)
     return db_user
 
+def revoke_user_tokens(db: Session, user_id: int) -> bool:
+    """
+    Bumps the user's token version so every access token issued so far is refused.
+    Returns True if successful, False if user not found.
+    """
+    db_user = get_user_by_id(db, user_id)
+    if not db_user:
+        return False
+    
+    db_user.token_version = (db_user.token_version or 0) + 1
+    db.commit()
+    user_cache.invalidate(db_user.email)
+    token_versions.set(db_user.id, db_user.token_version)
+    return True
+
+def update_user_password(db: Session, user_id: int, hashed_password: str) -> bool:
+    """
+    Stores a new password hash for a user.
+    Returns True if successful, False if user not found.
+    """
+    db_user = get_user_by_id(db, user_id)
+    if not db_user:
+        return False
+    
+    db_user.hashed_password = hashed_password
+    db.commit()
+    user_cache.invalidate(db_user.email)
+    return True
+
 def update_last_login(db: Session, user_id: int) -> bool:
     """
     Updates the last_login timestamp for a user.
@@ -104,6 +148,7 @@ def update_last_login(db: Session, user_id: int) -> bool:
     
     db_user.last_login = datetime.utcnow()
     db.commit()
+    user_cache.invalidate(db_user.email)
     return True
 
 def delete_user(db: Session, user_id: int) -> bool:
@@ -115,6 +160,9 @@ def delete_user(db: Session, user_id: int) -> bool:
     if not db_user:
         return False
     
+    email = db_user.email
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(email)
+    token_versions.forget(user_id)
     return True 
\ No newline at end of file
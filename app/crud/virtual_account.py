@@ -1,8 +1,10 @@
 """
 CRUD operations for Virtual Account model.
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, true, update
+from sqlalchemy.orm import Session, aliased
 from decimal import Decimal
 
 from app.models.virtual_account import VirtualAccount, VirtualAccountStatus, VirtualAccountType
@@ -34,6 +36,11 @@ def get_virtual_account_by_user(db: Session, user_id: int) -> Optional[VirtualAc
     return db.query(VirtualAccount).filter(VirtualAccount.user_id == user_id).first()
 
 
+def get_virtual_accounts_by_user(db: Session, user_id: int) -> List[VirtualAccount]:
+    """Get all virtual accounts for a user."""
+    return db.query(VirtualAccount).filter(VirtualAccount.user_id == user_id).all()
+
+
 def get_active_virtual_accounts(db: Session, skip: int = 0, limit: int = 100) -> List[VirtualAccount]:
     """Get all active virtual accounts."""
     return db.query(VirtualAccount).filter(
@@ -41,6 +48,49 @@ def get_active_virtual_accounts(db: Session, skip: int = 0, limit: int = 100) ->
     ).offset(skip).limit(limit).all()
 
 
+def get_virtual_accounts_with_latest_transaction(
+    db: Session,
+    user_id: Optional[int] = None,
+    status: Optional[VirtualAccountStatus] = None,
+    order_by: Optional[list] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Tuple[VirtualAccount, Optional[VirtualAccountTransaction]]]:
+    """
+    Get a page of virtual accounts, each with its newest transaction, in one statement.
+    The page is cut first, so the latest-transaction lookup only runs for the rows
+    returned: a LATERAL join on PostgreSQL, a correlated subquery elsewhere.
+    """
+    ordering = list(order_by or []) + [VirtualAccount.id]
+    accounts = db.query(VirtualAccount)
+    if user_id is not None:
+        accounts = accounts.filter(VirtualAccount.user_id == user_id)
+    if status is not None:
+        accounts = accounts.filter(VirtualAccount.status == status)
+    page = accounts.add_columns(
+        func.row_number().over(order_by=ordering).label("page_position")
+    ).order_by(*ordering).offset(skip).limit(limit).subquery("page")
+    account = aliased(VirtualAccount, page)
+
+    candidate = aliased(VirtualAccountTransaction)
+    newest_first = (candidate.created_at.desc(), candidate.id.desc())
+    if db.get_bind().dialect.name == "postgresql":
+        latest = select(candidate).where(
+            candidate.virtual_account_id == account.id
+        ).order_by(*newest_first).limit(1).lateral("latest_transaction")
+        transaction = aliased(VirtualAccountTransaction, latest)
+        query = db.query(account, transaction).outerjoin(latest, true())
+    else:
+        latest_id = select(candidate.id).where(
+            candidate.virtual_account_id == account.id
+        ).order_by(*newest_first).limit(1).scalar_subquery()
+        query = db.query(account, VirtualAccountTransaction).outerjoin(
+            VirtualAccountTransaction, VirtualAccountTransaction.id == latest_id
+        )
+
+    return [tuple(row) for row in query.order_by(page.c.page_position).all()]
+
+
 def get_virtual_accounts_by_type(
     db: Session, 
     account_type: VirtualAccountType, 
@@ -87,22 +137,28 @@ def update_virtual_account_balance(
     credit_amount: Decimal = None,
     debit_amount: Decimal = None
 ) -> Optional[VirtualAccount]:
-    """Update virtual account balance."""
-    virtual_account = get_virtual_account(db, virtual_account_id)
-    if not virtual_account:
+    """
+    Update virtual account balance with an in-database increment, so concurrent
+    updates cannot overwrite each other.
+    """
+    credit_amount = credit_amount or Decimal("0")
+    debit_amount = debit_amount or Decimal("0")
+    updated = db.execute(
+        update(VirtualAccount)
+        .where(VirtualAccount.id == virtual_account_id)
+        .values(
+            current_balance=VirtualAccount.current_balance + credit_amount - debit_amount,
+            total_credits=VirtualAccount.total_credits + credit_amount,
+            total_debits=VirtualAccount.total_debits + debit_amount,
+            last_activity_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if updated.rowcount == 0:
         return None
     
-    if credit_amount:
-        virtual_account.total_credits += credit_amount
-        virtual_account.current_balance += credit_amount
-    
-    if debit_amount:
-        virtual_account.total_debits += debit_amount
-        virtual_account.current_balance -= debit_amount
-    
     db.commit()
-    db.refresh(virtual_account)
-    return virtual_account
+    return get_virtual_account(db, virtual_account_id)
 
 
 def update_virtual_account_status(
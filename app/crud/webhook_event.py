@@ -0,0 +1,39 @@
+"""
+CRUD operations for the webhook inbox (monitoring side; workers use app/crud/aio/webhook_event.py).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
+
+
+def get_webhook_inbox_stats(db: Session, window_minutes: int = 60) -> Dict[str, Any]:
+    """
+    Inbox backlog by status, age of the oldest pending event, and processing
+    latency of the events processed in the last `window_minutes`.
+    """
+    now = datetime.utcnow()
+    counts = dict(db.query(WebhookEvent.status, func.count(WebhookEvent.id)).group_by(WebhookEvent.status).all())
+    oldest_pending = db.query(func.min(WebhookEvent.received_at)).filter(
+        WebhookEvent.status.in_([WebhookEventStatus.PENDING.value, WebhookEventStatus.PROCESSING.value])
+    ).scalar()
+    processed, avg_latency, max_latency, avg_processing = db.query(
+        func.count(WebhookEvent.id),
+        func.avg(WebhookEvent.latency_ms),
+        func.max(WebhookEvent.latency_ms),
+        func.avg(WebhookEvent.processing_ms)
+    ).filter(
+        WebhookEvent.status == WebhookEventStatus.PROCESSED.value,
+        WebhookEvent.processed_at >= now - timedelta(minutes=window_minutes)
+    ).one()
+
+    return {
+        "counts": {status.value: counts.get(status.value, 0) for status in WebhookEventStatus},
+        "oldest_pending_age_seconds": (now - oldest_pending).total_seconds() if oldest_pending else 0,
+        "window_minutes": window_minutes,
+        "processed_in_window": processed,
+        "avg_latency_ms": round(float(avg_latency or 0), 1),
+        "max_latency_ms": max_latency or 0,
+        "avg_processing_ms": round(float(avg_processing or 0), 1),
+    }
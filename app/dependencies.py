@@ -8,7 +8,9 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, get_read_db  # noqa: F401 - re-exported for routers
+from app.core.principal import Principal
+from app.core.user_cache import token_versions, user_cache
 from app.crud import user as crud_user
 from app.models.user import User, UserRole
 from app.schemas.auth import TokenData
@@ -26,37 +28,82 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), 
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """
-    Get current authenticated user from JWT token.
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def _decode_token(token: str) -> dict:
+    """
+    Decode and verify a JWT access token; raises 401 when it is invalid.
+    """
     try:
         payload = jwt.decode(
             token, 
             settings.jwt_secret, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _load_user(db: Session, email: str) -> Optional[User]:
+    user = user_cache.get(db, email)
+    if user is None:
+        user = crud_user.get_user_by_email(db, email=email)
+        if user is not None:
+            user_cache.set(email, user)
+    return user
+
+def get_current_user(
+    db: Session = Depends(get_db), 
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Get current authenticated user from JWT token.
+    """
+    payload = _decode_token(token)
+    token_data = TokenData(email=payload["sub"])
     
-    user = crud_user.get_user_by_email(db, email=token_data.email)
+    user = _load_user(db, token_data.email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if "ver" in payload and payload["ver"] != user.token_version:
+        raise _credentials_exception("Token has been revoked")
     return user
 
+def get_current_principal(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Get the caller from signed token claims without loading the user.
+    Only the token version is checked (usually from cache) so revoked tokens
+    are refused. Tokens issued before claims were embedded fall back to the user.
+    """
+    payload = _decode_token(token)
+    principal = Principal.from_claims(payload)
+    
+    if principal is None:
+        user = _load_user(db, payload["sub"])
+        if user is None:
+            raise _credentials_exception()
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, 
+                detail="Inactive user"
+            )
+        return Principal.from_user(user)
+    
+    # Deactivation and permission changes bump the version, revoking old tokens
+    if token_versions.current(db, principal.id) != principal.token_version:
+        raise _credentials_exception("Token has been revoked")
+    return principal
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -226,4 +273,84 @@ def get_user_with_any_role(allowed_roles: list[UserRole]):
             )
         return current_user
     
-    return role_dependency 
\ No newline at end of file
+    return role_dependency 
+
+
+def get_current_admin_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_admin_user.
+    """
+    if not principal.can_perform_admin_actions:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return principal
+
+def get_current_insureflow_admin_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_insureflow_admin.
+    """
+    if principal.role != UserRole.INSUREFLOW_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="InsureFlow platform admin privileges required. Only global administrators can access internal platform data."
+        )
+    return principal
+
+def get_current_broker_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_broker_user.
+    """
+    if not principal.is_broker_user:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Broker access required"
+        )
+    return principal
+
+def get_current_broker_or_admin_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_broker_or_admin_user.
+    """
+    if not (principal.is_broker_user or principal.can_perform_admin_actions):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Broker or admin access required"
+        )
+    return principal
+
+def get_current_insurance_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_insurance_user.
+    """
+    if not principal.is_insurance_user:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insurance company access required"
+        )
+    return principal
+
+def get_current_payment_processor_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """
+    Token-only variant of get_current_payment_processor.
+    """
+    if not (principal.is_broker_user and 
+            (principal.can_perform_admin_actions or principal.can_make_payments)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Payment processing access required. Must be Broker Admin or Accountant with payment permission."
+        )
+    return principal
@@ -1,14 +1,32 @@
 """
 Main entry point for the InsureFlow application.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.crud.pagination import NEXT_CURSOR_HEADER
+from app.core.http_client import http_clients
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware, install_sql_instrumentation
+from app.services.webhook_worker import webhook_worker
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Apply inbox webhooks in the background; the endpoint only stores them
+    if settings.WEBHOOK_WORKERS_ENABLED:
+        webhook_worker.start()
+    yield
+    await webhook_worker.stop()
+    # Drain pooled upstream connections (Squad Co, GAPS) on shutdown
+    await http_clients.aclose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -19,8 +37,14 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
+# Per-request query counts, DB time and N+1 warnings
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    install_sql_instrumentation()
+    app.add_middleware(SQLInstrumentationMiddleware)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
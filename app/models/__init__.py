@@ -12,6 +12,9 @@ from .notification import Notification
 from .support_ticket import SupportTicket, TicketStatus, TicketPriority, TicketCategory
 from .virtual_account import VirtualAccount, VirtualAccountType, VirtualAccountStatus
 from .virtual_account_transaction import VirtualAccountTransaction, TransactionType, TransactionStatus, TransactionIndicator
+from .daily_metrics import DailyMetric
+from .webhook_event import WebhookEvent, WebhookEventStatus
+from .idempotency_key import IdempotencyKey, IdempotencyStatus
 
 # Export all models for easy importing
 __all__ = [
@@ -40,4 +43,9 @@ __all__ = [
     "TransactionType",
     "TransactionStatus", 
     "TransactionIndicator",
+    "DailyMetric",
+    "WebhookEvent",
+    "WebhookEventStatus",
+    "IdempotencyKey",
+    "IdempotencyStatus",
 ] 
\ No newline at end of file
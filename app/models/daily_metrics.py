@@ -0,0 +1,57 @@
+"""
+Daily metrics rollup model for InsureFlow application.
+One row per day x broker x company x policy type, maintained incrementally by
+the writers that create policies, bill and collect premiums and record
+transactions, so analytics read a handful of rows per day instead of rescanning
+the source tables.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Date, Numeric, UniqueConstraint
+
+from app.core.database import Base
+
+# Dimension values used when a fact has no broker, company or policy
+NO_BROKER = 0
+NO_COMPANY = 0
+NO_POLICY_TYPE = ""
+
+
+class DailyMetric(Base):
+    """Per-day totals for one broker, company and policy type."""
+
+    __tablename__ = "daily_metrics"
+    __table_args__ = (
+        UniqueConstraint("metric_date", "broker_id", "company_id", "policy_type", name="uq_daily_metrics_key"),
+    )
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Rollup key (sentinels instead of NULL so the unique key also covers missing dimensions)
+    metric_date = Column(Date, nullable=False, index=True)
+    broker_id = Column(Integer, nullable=False, default=NO_BROKER, index=True)
+    company_id = Column(Integer, nullable=False, default=NO_COMPANY)
+    policy_type = Column(String(20), nullable=False, default=NO_POLICY_TYPE)
+
+    # Policies created on the day
+    new_policies = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Premiums billed (by due date) and collected (by payment date)
+    premiums_billed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    premiums_billed_amount = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+    premiums_collected_count = Column(Integer, nullable=False, default=0, server_default="0")
+    premiums_collected_amount = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+
+    # Completed virtual account transactions (all types) and their commission split
+    transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
+    transaction_volume = Column(Numeric(18, 2), nullable=False, default=0, server_default="0")
+    fees_collected = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+    platform_commission = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+    insureflow_commission = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+    habari_commission = Column(Numeric(15, 2), nullable=False, default=0, server_default="0")
+
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyMetric(date={self.metric_date}, broker_id={self.broker_id}, company_id={self.company_id}, policy_type='{self.policy_type}')>"
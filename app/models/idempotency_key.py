@@ -0,0 +1,38 @@
+"""
+Idempotency registry model for InsureFlow application.
+One row per processed external event (e.g. a Squad transaction reference),
+claimed before the event's work starts and completed with its result, so
+replayed deliveries are answered from here instead of being applied twice.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+import enum
+
+from app.core.database import Base
+
+
+class IdempotencyStatus(enum.Enum):
+    """Idempotency key status enumeration."""
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+
+class IdempotencyKey(Base):
+    """A claimed or completed external event."""
+
+    __tablename__ = "idempotency_keys"
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Event key, e.g. "squad_co:va:<transaction reference>"
+    key = Column(String(255), unique=True, index=True, nullable=False)
+    status = Column(String(20), nullable=False, default=IdempotencyStatus.IN_PROGRESS.value)
+    result = Column(Text, nullable=True)  # JSON result returned to replays
+
+    # Timestamps
+    locked_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # claim time, renewed on takeover
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey(key='{self.key}', status='{self.status}')>"
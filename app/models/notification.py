@@ -2,7 +2,7 @@
 Notification model for InsureFlow application.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, Boolean, Text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -20,6 +20,9 @@ class Notification(Base):
     """Notification model for broker dashboard notifications."""
     
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_broker_id_is_dismissed_is_read_created_at", "broker_id", "is_dismissed", "is_read", "created_at"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
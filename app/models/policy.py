@@ -2,7 +2,7 @@
 Policy model for InsureFlow application.
 """
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Text, Enum, Float, Boolean, Numeric
+from sqlalchemy import Column, Index, Integer, String, DateTime, Date, ForeignKey, Text, Enum, Float, Boolean, Numeric
 from sqlalchemy.orm import relationship
 import enum
 
@@ -40,6 +40,10 @@ class Policy(Base):
     """Policy model for managing insurance policies."""
     
     __tablename__ = "policies"
+    __table_args__ = (
+        Index("ix_policies_broker_id_created_at", "broker_id", "created_at"),
+        Index("ix_policies_status_end_date", "status", "end_date"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -64,7 +68,7 @@ class Policy(Base):
         default=PolicyStatus.PENDING.value
     )
     start_date = Column(Date, nullable=False)
-    due_date = Column(Date, nullable=False)  # When policy expires or needs renewal
+    due_date = Column(Date, nullable=False, index=True)  # When policy expires or needs renewal
     end_date = Column(Date, nullable=False)
     duration_months = Column(Integer, nullable=True)  # Duration in months for easier calculations
     reminder_sent_at = Column(DateTime, nullable=True)
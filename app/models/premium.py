@@ -1,10 +1,13 @@
 """
 Premium model for InsureFlow application.
 """
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Numeric, Enum
+from sqlalchemy import Column, Index, Integer, String, DateTime, Date, ForeignKey, Numeric, Enum, and_, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 import enum
 
 from app.core.database import Base
@@ -27,10 +30,46 @@ class BillingCycle(enum.Enum):
     ANNUAL = "ANNUAL"
 
 
+class days_after(FunctionElement):
+    """SQL date `days` days after a date column: days_after(date, days)."""
+    type = Date()
+    inherit_cache = True
+    name = "days_after"
+
+
+@compiles(days_after)
+def _days_after_default(element, compiler, **kw):
+    day, days = element.clauses
+    return f"({compiler.process(day, **kw)} + ({compiler.process(days, **kw)}) * INTERVAL '1' DAY)"
+
+
+@compiles(days_after, "mysql")
+@compiles(days_after, "mariadb")
+def _days_after_mysql(element, compiler, **kw):
+    day, days = element.clauses
+    return f"DATE_ADD({compiler.process(day, **kw)}, INTERVAL ({compiler.process(days, **kw)}) DAY)"
+
+
+@compiles(days_after, "postgresql")
+def _days_after_postgresql(element, compiler, **kw):
+    day, days = element.clauses
+    return f"({compiler.process(day, **kw)} + {compiler.process(days, **kw)})"
+
+
+@compiles(days_after, "sqlite")
+def _days_after_sqlite(element, compiler, **kw):
+    day, days = element.clauses
+    return f"date({compiler.process(day, **kw)}, ({compiler.process(days, **kw)}) || ' days')"
+
+
 class Premium(Base):
     """Premium model for managing policy premiums."""
     
     __tablename__ = "premiums"
+    __table_args__ = (
+        Index("ix_premiums_payment_status_due_date", "payment_status", "due_date"),
+        Index("ix_premiums_policy_id_payment_status", "policy_id", "payment_status"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -78,21 +117,33 @@ class Premium(Base):
     policy = relationship("Policy", back_populates="premiums")
     payments = relationship("Payment", back_populates="premium", cascade="all, delete-orphan")
     
-    @property
+    @hybrid_property
     def is_overdue(self) -> bool:
-        """Check if premium is overdue."""
+        """Unpaid past its grace period."""
         if self.payment_status == PaymentStatus.PAID:
             return False
         
-        today = date.today()
-        grace_period_end = self.due_date + datetime.timedelta(days=self.grace_period_days)
-        return today > grace_period_end
+        grace_period_end = self.due_date + timedelta(days=self.grace_period_days)
+        return date.today() > grace_period_end
+
+    @is_overdue.inplace.expression
+    @classmethod
+    def _is_overdue_expression(cls):
+        return and_(
+            cls.payment_status != PaymentStatus.PAID,
+            days_after(cls.due_date, cls.grace_period_days) < date.today()
+        )
     
-    @property
+    @hybrid_property
     def outstanding_amount(self) -> Decimal:
-        """Calculate outstanding amount."""
+        """Amount still to be paid."""
         paid = self.paid_amount or Decimal('0')
         return self.amount - paid
+
+    @outstanding_amount.inplace.expression
+    @classmethod
+    def _outstanding_amount_expression(cls):
+        return cls.amount - func.coalesce(cls.paid_amount, 0)
     
     def __repr__(self):
         return f"<Premium(id={self.id}, policy_id={self.policy_id}, amount={self.amount}, status='{self.payment_status.value}', due_date='{self.due_date}')>" 
\ No newline at end of file
@@ -2,7 +2,7 @@
 Support Ticket model for InsureFlow application.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -37,6 +37,9 @@ class SupportTicket(Base):
     """Support ticket model for broker support requests."""
     
     __tablename__ = "support_tickets"
+    __table_args__ = (
+        Index("ix_support_tickets_status_created_at", "status", "created_at"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
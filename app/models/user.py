@@ -21,6 +21,12 @@ class UserRole(enum.Enum):
     BROKER_ACCOUNTANT = "BROKER_ACCOUNTANT"
 
 
+# Role groups shared by User and token Principal permission checks
+INSURANCE_ROLES = frozenset({UserRole.INSURANCE_ADMIN, UserRole.INSURANCE_ACCOUNTANT})
+BROKER_ROLES = frozenset({UserRole.BROKER, UserRole.BROKER_ADMIN, UserRole.BROKER_ACCOUNTANT})
+ADMIN_ROLES = frozenset({UserRole.ADMIN, UserRole.INSURANCE_ADMIN, UserRole.BROKER_ADMIN})
+
+
 class User(Base):
     """User model for authentication and user management."""
     
@@ -55,6 +61,7 @@ class User(Base):
     is_verified = Column(Boolean, default=False, nullable=False)
     can_create_policies = Column(Boolean, default=False, nullable=False)  # For Insurance Accountants
     can_make_payments = Column(Boolean, default=False, nullable=False)  # For Broker Accountants
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped to revoke issued tokens
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -70,17 +77,17 @@ class User(Base):
     @property
     def is_insurance_user(self) -> bool:
         """Check if user belongs to insurance company roles."""
-        return self.role in [UserRole.INSURANCE_ADMIN, UserRole.INSURANCE_ACCOUNTANT]
+        return self.role in INSURANCE_ROLES
     
     @property
     def is_broker_user(self) -> bool:
         """Check if user belongs to broker roles."""
-        return self.role in [UserRole.BROKER, UserRole.BROKER_ADMIN, UserRole.BROKER_ACCOUNTANT]
+        return self.role in BROKER_ROLES
     
     @property
     def can_perform_admin_actions(self) -> bool:
         """Check if user can perform administrative actions."""
-        return self.role in [UserRole.ADMIN, UserRole.INSURANCE_ADMIN, UserRole.BROKER_ADMIN]
+        return self.role in ADMIN_ROLES
     
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', role='{self.role.value}')>" 
\ No newline at end of file
@@ -91,6 +91,7 @@ class VirtualAccount(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     last_activity_at = Column(DateTime, nullable=True)
+    last_transaction_at = Column(DateTime, nullable=True)  # created_at of the newest transaction
     
     # Add policy_id and relationship
     policy_id = Column(Integer, ForeignKey("policies.id"), nullable=True, index=True)
@@ -4,7 +4,7 @@ Tracks all transactions for Squad Co virtual accounts.
 """
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Enum, Boolean, Text
+from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, Numeric, Enum, Boolean, Text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -38,6 +38,11 @@ class VirtualAccountTransaction(Base):
     """Transaction model for virtual account operations."""
     
     __tablename__ = "virtual_account_transactions"
+    __table_args__ = (
+        Index("ix_virtual_account_transactions_status_transaction_date", "status", "transaction_date"),
+        Index("ix_virtual_account_transactions_status_transaction_indicator", "status", "transaction_indicator"),
+        Index("ix_virtual_account_transactions_virtual_account_id_created_at", "virtual_account_id", "created_at"),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,52 @@
+"""
+Webhook inbox model for InsureFlow application.
+Verified gateway webhooks are stored here and acknowledged at once; background
+workers claim pending rows, process them and record the outcome.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text
+import enum
+
+from app.core.database import Base
+
+
+class WebhookEventStatus(enum.Enum):
+    """Webhook inbox status enumeration."""
+    PENDING = "pending"  # waiting for a worker, possibly after a failed attempt
+    PROCESSING = "processing"  # claimed by a worker
+    PROCESSED = "processed"
+    FAILED = "failed"  # out of attempts
+
+
+class WebhookEvent(Base):
+    """A received webhook and its processing state."""
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        Index("ix_webhook_events_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Event details
+    source = Column(String(50), nullable=False, default="squad_co")
+    event_type = Column(String(100), nullable=True)
+    transaction_reference = Column(String(255), nullable=True, index=True)
+    payload = Column(Text, nullable=False)  # raw verified request body
+
+    # Processing state
+    status = Column(String(20), nullable=False, default=WebhookEventStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    processing_ms = Column(Integer, nullable=True)  # duration of the last attempt
+    latency_ms = Column(Integer, nullable=True)  # received -> processed
+
+    # Timestamps
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<WebhookEvent(id={self.id}, type='{self.event_type}', ref='{self.transaction_reference}', status='{self.status}')>"
@@ -6,6 +6,9 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from decimal import Decimal
 
+# Alias for models with a field named `date`, which would otherwise shadow the type
+DateType = date
+
 
 class DashboardKPIS(BaseModel):
     """Base KPI metrics for dashboard."""
@@ -44,7 +47,7 @@ class ChartDataPoint(BaseModel):
     label: str
     value: float
     percentage: Optional[float] = None
-    date: Optional[date] = None
+    date: Optional[DateType] = None
 
 
 class LineChartData(BaseModel):
@@ -61,7 +64,7 @@ class PieChartData(BaseModel):
 
 class PolicyTrend(BaseModel):
     """Policy trend data."""
-    date: date
+    date: DateType
     count: int
     premium_amount: float
 
@@ -97,8 +100,13 @@ class BrokerPerformance(BaseModel):
     """Broker performance metrics."""
     broker_id: int
     broker_name: str
+    organization_name: Optional[str] = None
     policies_count: int
+    paid_policies: int = 0
     total_premium: float
+    total_paid: float = 0.0
+    commission_earned: float = 0.0
+    average_deal_size: float = 0.0
     conversion_rate: float
     last_policy_date: Optional[datetime] = None
     ranking: int
@@ -100,6 +100,21 @@ class VirtualAccount(BaseModel):
     created_at: datetime
     updated_at: datetime
     last_activity_at: Optional[datetime] = None
+    last_transaction_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class VirtualAccountLatestTransaction(BaseModel):
+    """Newest transaction shown alongside a virtual account listing."""
+    id: int
+    transaction_reference: str
+    transaction_type: str
+    transaction_indicator: str
+    status: str
+    principal_amount: Decimal
+    transaction_date: datetime
+    created_at: datetime
     
     class Config:
         from_attributes = True
@@ -113,6 +128,8 @@ class VirtualAccountSummary(BaseModel):
     display_name: str
     current_balance: Decimal
     status: str
+    last_transaction_at: Optional[datetime] = None
+    last_transaction: Optional[VirtualAccountLatestTransaction] = None
     
     class Config:
         from_attributes = True
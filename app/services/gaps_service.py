@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, List
 from xml.etree import ElementTree as ET
 
 from app.core.config import settings
+from app.core.http_client import gaps_client, upstream_timeout
 
 logger = logging.getLogger(__name__)
 
@@ -35,17 +36,19 @@ class GapsService:
             return {"error": "GAPS service not configured"}
 
         url = f"{self.base_url}/{endpoint}"
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(url, content=payload, headers=self.headers)
-                response.raise_for_status()
-                return self._parse_response(response.text)
-            except httpx.HTTPStatusError as e:
-                logger.error(f"GAPS API HTTP error: {e.response.text}")
-                return {"error": f"GAPS API error: {e.response.text}"}
-            except Exception as e:
-                logger.error(f"Unexpected error communicating with GAPS: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+        client = gaps_client()
+        try:
+            response = await client.post(
+                url, content=payload, headers=self.headers, timeout=upstream_timeout(settings.GAPS_TIMEOUT)
+            )
+            response.raise_for_status()
+            return self._parse_response(response.text)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"GAPS API HTTP error: {e.response.text}")
+            return {"error": f"GAPS API error: {e.response.text}"}
+        except Exception as e:
+            logger.error(f"Unexpected error communicating with GAPS: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
     def _parse_response(self, xml_string: str) -> Dict[str, Any]:
         """Parse the XML response from GAPS."""
@@ -1,114 +1,115 @@
 """
 Service layer for notification-related operations.
 """
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
+from app.core.config import settings
 from app.crud import notification as crud_notification
 from app.crud import policy as crud_policy
 from app.crud import premium as crud_premium
-from app.models.policy import Policy
+from app.models.policy import Policy, PolicyStatus
 from app.models.premium import Premium
 from app.models.notification import Notification
 
 logger = logging.getLogger(__name__)
 
 
+def run_payment_reminders(
+    db: Session,
+    max_days_overdue: Optional[int] = None,
+    reminder_cooldown_hours: Optional[int] = None,
+    broker_ids: Optional[List[int]] = None,
+    policy_ids: Optional[List[int]] = None,
+    sample_size: int = 0,
+    chunk_size: Optional[int] = None
+) -> dict:
+    """
+    Send a payment reminder to the broker of every overdue policy matching the
+    filters (see crud_notification.overdue_reminder_candidates).
+
+    Each chunk of policy ids is handled by a few statements, whatever its size:
+    one INSERT ... SELECT creates the notifications, one UPDATE ... FROM stamps
+    reminder_sent_at, and the chunk is committed. Returns the counts and up to
+    `sample_size` of the reminders sent.
+    """
+    chunk_size = chunk_size or settings.REMINDER_CHUNK_SIZE
+    filters = dict(
+        max_days_overdue=max_days_overdue,
+        reminder_cooldown_hours=reminder_cooldown_hours,
+        broker_ids=broker_ids,
+        policy_ids=policy_ids
+    )
+
+    first_id, last_id = db.execute(
+        select(func.min(Policy.id), func.max(Policy.id)).where(
+            Policy.status == PolicyStatus.ACTIVE,
+            Policy.end_date < date.today()
+        )
+    ).one()
+
+    notifications_created = 0
+    brokers_notified = set()
+    reminders_sent = []
+    chunk_start = first_id
+    while chunk_start is not None and chunk_start <= last_id:
+        chunk_end = chunk_start + chunk_size - 1
+        candidates = crud_notification.overdue_reminder_candidates(
+            db, policy_id_range=(chunk_start, chunk_end), **filters
+        )
+        sent_at = datetime.utcnow()
+        created = crud_notification.insert_payment_reminders(db, candidates, sent_at)
+        if created:
+            brokers_notified |= crud_notification.get_reminded_broker_ids(db, sent_at)
+            if len(reminders_sent) < sample_size:
+                reminders_sent += crud_notification.get_reminder_sample(
+                    db, candidates, sent_at, sample_size - len(reminders_sent)
+                )
+            crud_notification.stamp_reminded_policies(db, sent_at)
+            db.commit()
+            notifications_created += created
+            logger.info(f"📨 REMINDERS: {created} created for policies {chunk_start}-{chunk_end}")
+        chunk_start = chunk_end + 1
+
+    return {
+        "notifications_created": notifications_created,
+        "brokers_notified": len(brokers_notified),
+        "policies_processed": notifications_created,
+        "reminders_sent": reminders_sent
+    }
+
+
 async def send_payment_reminders_to_brokers(
     db: Session,
     max_days_overdue: int = 30,
-    reminder_cooldown_hours: int = 24
+    reminder_cooldown_hours: int = 24,
+    sample_size: int = 0
 ) -> dict:
     """
-    High-level service to send payment reminders to brokers.
-    
-    This function:
-    1. Finds all overdue policies (1-30 days past due)
-    2. Filters out policies that had reminders sent recently
-    3. Creates notifications for brokers
-    4. Updates reminder timestamps on policies
-    
-    Returns summary of actions taken.
+    High-level service to send payment reminders to brokers for policies up to
+    `max_days_overdue` days past due that were not reminded in the last
+    `reminder_cooldown_hours` hours. Returns summary of actions taken.
     """
     try:
         logger.info(f"Starting automatic payment reminder process (max {max_days_overdue} days overdue)")
-        
-        # Get overdue policies that need reminders
-        overdue_policies = crud_notification.get_overdue_policies_without_recent_reminders(
-            db=db,
+        result = run_payment_reminders(
+            db,
             max_days_overdue=max_days_overdue,
-            reminder_cooldown_hours=reminder_cooldown_hours
+            reminder_cooldown_hours=reminder_cooldown_hours,
+            sample_size=sample_size
         )
-        
-        if not overdue_policies:
+
+        if not result["notifications_created"]:
             logger.info("No overdue policies found that need reminders")
-            return {
-                "success": True,
-                "message": "No overdue policies found that need reminders",
-                "notifications_created": 0,
-                "brokers_notified": 0,
-                "policies_processed": 0,
-                "reminders_sent": []
-            }
-        
-        notifications_created = 0
-        brokers_notified = set()
-        reminders_sent = []
-        
-        for policy, broker, customer, days_overdue, outstanding_amount in overdue_policies:
-            try:
-                # Create notification for the broker
-                notification = crud_notification.create_payment_reminder_notification(
-                    db=db,
-                    broker_id=broker.user_id,  # Broker's user ID
-                    policy_id=policy.id,
-                    outstanding_amount=outstanding_amount,
-                    days_overdue=days_overdue,
-                    policy_number=policy.policy_number,
-                    customer_name=customer.full_name
-                )
-                
-                # Update policy reminder timestamp
-                policy.reminder_sent_at = datetime.utcnow()
-                db.add(policy)
-                
-                notifications_created += 1
-                brokers_notified.add(broker.user_id)
-                
-                reminders_sent.append({
-                    "policy_id": policy.id,
-                    "policy_number": policy.policy_number,
-                    "broker_name": broker.name,
-                    "customer_name": customer.full_name,
-                    "outstanding_amount": outstanding_amount,
-                    "days_overdue": days_overdue,
-                    "notification_id": notification.id,
-                    "sent_at": datetime.utcnow().isoformat()
-                })
-                
-                logger.info(f"Created reminder notification for policy {policy.policy_number} -> broker {broker.name}")
-                
-            except Exception as e:
-                logger.error(f"Error creating reminder for policy {policy.id}: {str(e)}")
-                continue
-        
-        # Commit all changes
-        db.commit()
-        
-        success_message = f"Created {notifications_created} payment reminder notifications for {len(brokers_notified)} brokers"
+            return {"success": True, "message": "No overdue policies found that need reminders", **result}
+
+        success_message = f"Created {result['notifications_created']} payment reminder notifications for {result['brokers_notified']} brokers"
         logger.info(f"AUTOMATIC REMINDERS COMPLETE: {success_message}")
-        
-        return {
-            "success": True,
-            "message": success_message,
-            "notifications_created": notifications_created,
-            "brokers_notified": len(brokers_notified),
-            "policies_processed": len(overdue_policies),
-            "reminders_sent": reminders_sent
-        }
-        
+        return {"success": True, "message": success_message, **result}
+
     except Exception as e:
         logger.error(f"Error in send_payment_reminders_to_brokers: {str(e)}")
         db.rollback()
@@ -3,17 +3,25 @@ Service layer for payment-related operations.
 """
 import uuid
 import logging
+from datetime import date
 from decimal import Decimal
 from typing import List
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from app.core.cache import response_cache
+from app.crud import daily_metrics
 from app.crud import premium as crud_premium
 from app.crud import policy as crud_policy
 from app.crud import user as crud_user
 from app.crud import payment as crud_payment
+from app.crud.aio import policy as async_crud_policy
+from app.crud.aio import premium as async_crud_premium
+from app.crud.aio import payment as async_crud_payment
 from app.schemas.payment import PaymentCreate
-from app.models.payment import PaymentMethod
+from app.models.payment import PaymentMethod, PaymentTransactionStatus
+from app.models.premium import PaymentStatus
 from app.services.squad_co import squad_co_service
 from app.services.virtual_account_service import virtual_account_service
 
@@ -85,26 +93,21 @@ async def initiate_bulk_premium_payment(premium_ids: list[int], db: Session):
     if not premium_ids:
         raise HTTPException(status_code=400, detail="No premium IDs provided.")
 
-    premiums = crud_premium.get_premiums_by_ids(db, premium_ids=premium_ids)
-    if len(premiums) != len(premium_ids):
+    # Premiums with their policies and customers, in one query
+    premiums = crud_premium.get_premiums_with_payers(db, premium_ids=premium_ids)
+    if len(premiums) != len(set(premium_ids)):
         raise HTTPException(status_code=404, detail="One or more premiums not found.")
 
-    total_amount = Decimal('0')
-    customer_email = None
-    policy_ids = set()
-
     for premium in premiums:
-        if premium.payment_status.value == 'paid':
+        if premium.payment_status == PaymentStatus.PAID:
             raise HTTPException(status_code=400, detail=f"Premium {premium.id} has already been paid.")
-        total_amount += premium.amount
-        policy_ids.add(premium.policy_id)
 
     # Assume all premiums in a bulk payment belong to the same customer
-    first_policy = crud_policy.get_policy(db, policy_id=list(policy_ids)[0])
+    first_policy = premiums[0].policy
     if not first_policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     
-    customer = crud_user.get_user_by_id(db, user_id=first_policy.user_id)
+    customer = first_policy.user
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found for this policy")
     customer_email = customer.email
@@ -112,19 +115,29 @@ async def initiate_bulk_premium_payment(premium_ids: list[int], db: Session):
     # Simulate a successful payment
     transaction_ref = f"simulated_bulk_{uuid.uuid4()}"
 
-    for premium in premiums:
-        # Create a payment record
-        payment_create = PaymentCreate(
+    # One payment record per premium, written and marked paid in one commit
+    crud_payment.insert_payments(db, [
+        PaymentCreate(
             premium_id=premium.id,
             amount_paid=premium.amount,
-            payment_method=PaymentMethod.VIRTUAL_ACCOUNT,
-            transaction_reference=transaction_ref,
+            payment_method=PaymentMethod.BANK_TRANSFER,
+            status=PaymentTransactionStatus.SUCCESS,
+            transaction_reference=f"{transaction_ref}_premium_{premium.id}",
             payer_email=customer_email
         )
-        crud_payment.create_payment(db=db, payment=payment_create)
-
-        # Update the premium status
-        crud_premium.update_premium_status(db=db, premium_id=premium.id, status="paid")
+        for premium in premiums
+    ])
+    payment_day = date.today()
+    crud_premium.mark_premiums_paid(db, {premium.id: premium.amount for premium in premiums}, payment_day)
+    collected = daily_metrics.MetricDeltas()
+    for premium in premiums:
+        collected.add(
+            payment_day, daily_metrics.dimensions(premium.policy),
+            premiums_collected_count=1, premiums_collected_amount=premium.amount
+        )
+    daily_metrics.apply(db, collected)
+    db.commit()
+    await response_cache.ainvalidate(reason="bulk premium payment")
 
     return {
         "payment_url": f"https://example.com/simulated-payment/{transaction_ref}",
@@ -132,7 +145,7 @@ async def initiate_bulk_premium_payment(premium_ids: list[int], db: Session):
         "message": "Bulk payment successfully simulated."
     }
 
-async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
+async def initiate_bulk_policy_payment(policy_ids: list[int], db: AsyncSession):
     """
     Initiates bulk payment for multiple policies with comprehensive logging.
     """
@@ -144,13 +157,16 @@ async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
         raise HTTPException(status_code=400, detail="No policy IDs provided.")
 
     try:
-        # 1. Fetch all policies and validate
+        # 1. Fetch all policies (one query) and validate
         logger.info("📊 FETCHING AND VALIDATING POLICIES")
+        policies_by_id = {
+            policy.id: policy for policy in await async_crud_policy.get_policies_by_ids(db, policy_ids=policy_ids)
+        }
         policies = []
         total_amount = Decimal('0')
         
         for policy_id in policy_ids:
-            policy = crud_policy.get_policy(db, policy_id=policy_id)
+            policy = policies_by_id.get(policy_id)
             if not policy:
                 logger.error(f"❌ Policy {policy_id} not found")
                 raise HTTPException(status_code=404, detail=f"Policy {policy_id} not found")
@@ -162,7 +178,7 @@ async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
         logger.info(f"💰 TOTAL BULK PAYMENT AMOUNT: ₦{total_amount:,.2f}")
         
         # 2. Get customer information
-        customer = crud_user.get_user_by_id(db, user_id=policies[0].user_id)
+        customer = policies[0].user
         if not customer:
             logger.error(f"❌ Customer not found for user_id: {policies[0].user_id}")
             raise HTTPException(status_code=404, detail="Customer not found")
@@ -185,7 +201,7 @@ async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
         
         # 4. Get unpaid premiums
         logger.info("📋 FETCHING UNPAID PREMIUMS")
-        unpaid_premiums = crud_premium.get_unpaid_premiums_for_policies(db, policy_ids=policy_ids)
+        unpaid_premiums = await async_crud_premium.get_unpaid_premiums_for_policies(db, policy_ids=policy_ids)
         
         if not unpaid_premiums:
             logger.warning("⚠️ No outstanding premiums found for the selected policies")
@@ -227,20 +243,23 @@ async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
         logger.info(f"🔗 Payment URL: {payment_data.get('data', {}).get('checkout_url')}")
         logger.info(f"📝 Transaction Ref: {payment_data.get('data', {}).get('transaction_ref')}")
         
-        # 6. Create payment records
+        # 6. Create pending payment records, one per premium, in one INSERT;
+        # the charge.success webhook settles them by the same references
         logger.info("💾 CREATING PAYMENT RECORDS")
-        for premium in unpaid_premiums:
-            payment = crud_payment.create_payment(
-                db=db,
-                payment=PaymentCreate(
-                    premium_id=premium.id,
-                    amount=premium.amount,
-                    payment_method=PaymentMethod.BANK_TRANSFER,
-                    transaction_reference=payment_data.get("data", {}).get("transaction_ref"),
-                    status="pending"
-                )
+        transaction_ref = payment_data.get("data", {}).get("transaction_ref")
+        await async_crud_payment.insert_payments(db, [
+            PaymentCreate(
+                premium_id=premium.id,
+                amount_paid=premium.amount,
+                payment_method=PaymentMethod.BANK_TRANSFER,
+                transaction_reference=f"{transaction_ref}_premium_{premium.id}",
+                status=PaymentTransactionStatus.PENDING,
+                payer_email=customer.email
             )
-            logger.info(f"✅ Payment record created for Premium {premium.id}: ₦{premium.amount:,.2f}")
+            for premium in unpaid_premiums
+        ])
+        await db.commit()
+        logger.info(f"✅ {len(unpaid_premiums)} payment records created")
         
         logger.info("🎉 BULK PAYMENT INITIATION COMPLETED SUCCESSFULLY")
         
@@ -255,6 +274,8 @@ async def initiate_bulk_policy_payment(policy_ids: list[int], db: Session):
             "message": "Bulk payment initiated successfully. Redirect to Squad Co for payment."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ BULK PAYMENT FAILED: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Bulk payment failed: {str(e)}") 
\ No newline at end of file
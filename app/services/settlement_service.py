@@ -3,10 +3,12 @@ Settlement Service for InsureFlow application.
 Handles the settlement of funds from virtual accounts to insurance companies.
 """
 import logging
+from decimal import Decimal
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.gaps_service import gaps_service
-from app.crud import virtual_account as crud_virtual_account
+from app.crud.aio import virtual_account as crud_virtual_account
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -26,17 +28,28 @@ class SettlementService:
         # This is a placeholder for the full GAPS integration.
         return {"success": True, "message": f"Manual settlement for company {company_id} processed successfully"}
 
-    async def process_settlement(self, db: Session, virtual_account_id: int) -> Dict[str, Any]:
+    async def process_settlement(self, db: AsyncSession, virtual_account_id: int) -> Dict[str, Any]:
         """Process settlement for a virtual account."""
-        virtual_account = crud_virtual_account.get_virtual_account(db, virtual_account_id)
+        virtual_account = await crud_virtual_account.get_virtual_account(db, virtual_account_id)
         if not virtual_account:
             return {"error": "Virtual account not found"}
 
-        if virtual_account.current_balance <= 0:
+        amount = virtual_account.current_balance
+        if amount <= 0:
+            return {"error": "No balance to settle"}
+
+        # Take the amount off the account before the transfer, so a concurrent
+        # settlement cannot send the same funds twice and credits arriving while
+        # GAPS is called stay on the account
+        reserved = await crud_virtual_account.apply_balance_delta(
+            db, virtual_account_id, debit_amount=amount, allow_overdraft=False
+        )
+        await db.commit()
+        if reserved is None:
             return {"error": "No balance to settle"}
 
         insurance_company_account = {
-            "amount": float(virtual_account.current_balance),
+            "amount": float(amount),
             "payment_date": "2025-10-15",
             "reference": f"SETTLE_{virtual_account.id}",
             "remarks": "Settlement",
@@ -47,19 +60,29 @@ class SettlementService:
             "customer_acct_number": settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER,
         }
 
-        result = await gaps_service.initiate_single_transfer(insurance_company_account)
+        try:
+            result = await gaps_service.initiate_single_transfer(insurance_company_account)
+        except Exception:
+            await self._release_reserved(db, virtual_account_id, amount)
+            raise
 
         # Ensure result is a dictionary
         if not isinstance(result, dict):
             logger.error(f"Unexpected response type from GAPS service: {type(result)}. Response: {result}")
+            await self._release_reserved(db, virtual_account_id, amount)
             return {"error": f"Unexpected response type from GAPS service: {type(result)}"}
 
         if result.get("code") == "1000":
-            # Update the virtual account's balance
-            crud_virtual_account.update_virtual_account_balance(db, virtual_account_id, -virtual_account.current_balance)
+            logger.info(f"✅ SETTLEMENT SENT: ₦{amount:,} from virtual account {virtual_account_id}")
             return {"success": True, "message": "Settlement successful"}
         else:
+            await self._release_reserved(db, virtual_account_id, amount)
             return {"error": f"Settlement failed: {result.get('description', 'Unknown error')}"}
 
+    async def _release_reserved(self, db: AsyncSession, virtual_account_id: int, amount: Decimal) -> None:
+        """Undo a reservation whose transfer did not go through."""
+        await crud_virtual_account.apply_balance_delta(db, virtual_account_id, debit_amount=-amount)
+        await db.commit()
+        logger.warning(f"⚠️ SETTLEMENT RELEASED: ₦{amount:,} returned to virtual account {virtual_account_id}")
 
 settlement_service = SettlementService()
@@ -6,6 +6,7 @@ import hmac
 import httpx
 import logging
 from app.core.config import settings
+from app.core.http_client import squad_client, upstream_timeout
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict, Any
@@ -26,6 +27,8 @@ class SquadCoService:
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json",
         }
+        self._timeout = upstream_timeout(settings.SQUAD_TIMEOUT)
+        self._verify_timeout = upstream_timeout(settings.SQUAD_VERIFY_TIMEOUT)
 
     def _extract_error_message(self, response) -> str:
         """Extract error message from Squad API response."""
@@ -56,20 +59,20 @@ class SquadCoService:
         logger.info("📞 Calling Squad Co API for Virtual Account Creation")
         logger.info(f"📋 Virtual Account Request Payload: {request_payload}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, json=request_payload, headers=self.headers)
-                response.raise_for_status()
-                result = response.json()
-                logger.info(f"Squad API Response: {result}")
-                return result
-            except httpx.HTTPStatusError as e:
-                error_detail = self._extract_error_message(e.response)
-                logger.error(f"Squad API HTTP error: {error_detail}")
-                return {"error": f"Squad API error: {error_detail}"}
-            except Exception as e:
-                logger.error(f"Unexpected error creating virtual account: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+        client = squad_client()
+        try:
+            response = await client.post(url, json=request_payload, headers=self.headers, timeout=self._timeout)
+            response.raise_for_status()
+            result = response.json()
+            logger.info(f"Squad API Response: {result}")
+            return result
+        except httpx.HTTPStatusError as e:
+            error_detail = self._extract_error_message(e.response)
+            logger.error(f"Squad API HTTP error: {error_detail}")
+            return {"error": f"Squad API error: {error_detail}"}
+        except Exception as e:
+            logger.error(f"Unexpected error creating virtual account: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
     async def simulate_payment(self, virtual_account_number: str, amount: Decimal) -> Dict[str, Any]:
         """
@@ -91,23 +94,23 @@ class SquadCoService:
         logger.info(f"Simulating payment: {amount} NGN to {virtual_account_number}")
         logger.info(f"Simulate Payment Payload: {payload}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Payment simulation result: {result}")
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = self._extract_error_message(e.response)
-                logger.error(f"Squad API HTTP error during payment simulation: {error_detail}")
-                return {"error": f"Squad API error: {error_detail}"}
-                
-            except Exception as e:
-                logger.error(f"Unexpected error during payment simulation: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+        client = squad_client()
+        try:
+            response = await client.post(url, json=payload, headers=self.headers, timeout=self._timeout)
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"Payment simulation result: {result}")
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            error_detail = self._extract_error_message(e.response)
+            logger.error(f"Squad API HTTP error during payment simulation: {error_detail}")
+            return {"error": f"Squad API error: {error_detail}"}
+            
+        except Exception as e:
+            logger.error(f"Unexpected error during payment simulation: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
     async def initiate_transfer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -121,20 +124,20 @@ class SquadCoService:
         logger.info("📞 Calling Squad Co API for Fund Transfer")
         logger.info(f"📋 Fund Transfer Request Payload: {payload}")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(url, json=payload, headers=self.headers)
-                response.raise_for_status()
-                result = response.json()
-                logger.info(f"Squad API Transfer Response: {result}")
-                return result
-            except httpx.HTTPStatusError as e:
-                error_detail = self._extract_error_message(e.response)
-                logger.error(f"Squad API HTTP error during transfer: {error_detail}")
-                return {"error": f"Squad API error: {error_detail}"}
-            except Exception as e:
-                logger.error(f"Unexpected error during transfer: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+        client = squad_client()
+        try:
+            response = await client.post(url, json=payload, headers=self.headers, timeout=self._timeout)
+            response.raise_for_status()
+            result = response.json()
+            logger.info(f"Squad API Transfer Response: {result}")
+            return result
+        except httpx.HTTPStatusError as e:
+            error_detail = self._extract_error_message(e.response)
+            logger.error(f"Squad API HTTP error during transfer: {error_detail}")
+            return {"error": f"Squad API error: {error_detail}"}
+        except Exception as e:
+            logger.error(f"Unexpected error during transfer: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
     def verify_webhook_signature(self, request_body: bytes, signature: str) -> bool:
         """
@@ -186,45 +189,45 @@ class SquadCoService:
         
         logger.info(f"Initiating Squad payment: amount={amount_to_send} NGN, email={email}, ref={payload['transaction_ref']}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:  # Increased timeout
+        client = squad_client()
+        try:
+            response = await client.post(url, json=payload, headers=self.headers, timeout=self._timeout)
+            
+            # Log the response for debugging
+            logger.info(f"Squad API response status: {response.status_code}")
+            logger.info(f"Squad API response body: {response.text}")
+            
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"Squad payment initiated successfully: {result.get('data', {}).get('transaction_ref', 'N/A')}")
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            # Handle specific HTTP errors
+            error_detail = f"HTTP {e.response.status_code}"
             try:
-                response = await client.post(url, json=payload, headers=self.headers)
-                
-                # Log the response for debugging
-                logger.info(f"Squad API response status: {response.status_code}")
-                logger.info(f"Squad API response body: {response.text}")
-                
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Squad payment initiated successfully: {result.get('data', {}).get('transaction_ref', 'N/A')}")
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                # Handle specific HTTP errors
-                error_detail = f"HTTP {e.response.status_code}"
-                try:
-                    error_data = e.response.json()
-                    if 'message' in error_data:
-                        error_detail = error_data['message']
-                    elif 'errors' in error_data:
-                        error_detail = str(error_data['errors'])
-                    elif 'data' in error_data and 'message' in error_data['data']:
-                        error_detail = error_data['data']['message']
-                except:
-                    error_detail = e.response.text
-                
-                logger.error(f"Squad API HTTP error: {error_detail}")
-                return {"error": f"Squad API error: {error_detail}"}
-                
-            except httpx.RequestError as e:
-                # Handle network-related errors
-                logger.error(f"Network error contacting Squad: {str(e)}")
-                return {"error": f"Network error while contacting Squad: {str(e)}"}
-                
-            except Exception as e:
-                logger.error(f"Unexpected error in Squad payment initiation: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+                error_data = e.response.json()
+                if 'message' in error_data:
+                    error_detail = error_data['message']
+                elif 'errors' in error_data:
+                    error_detail = str(error_data['errors'])
+                elif 'data' in error_data and 'message' in error_data['data']:
+                    error_detail = error_data['data']['message']
+            except:
+                error_detail = e.response.text
+            
+            logger.error(f"Squad API HTTP error: {error_detail}")
+            return {"error": f"Squad API error: {error_detail}"}
+            
+        except httpx.RequestError as e:
+            # Handle network-related errors
+            logger.error(f"Network error contacting Squad: {str(e)}")
+            return {"error": f"Network error while contacting Squad: {str(e)}"}
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in Squad payment initiation: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
     async def verify_payment(self, transaction_ref: str):
         """
@@ -238,34 +241,34 @@ class SquadCoService:
         
         logger.info(f"Verifying Squad payment: {transaction_ref}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        client = squad_client()
+        try:
+            response = await client.get(url, headers=self.headers, timeout=self._verify_timeout)
+            
+            logger.info(f"Squad verify response status: {response.status_code}")
+            logger.info(f"Squad verify response body: {response.text}")
+            
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"Squad payment verification result: {result.get('data', {}).get('transaction_status', 'Unknown')}")
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            error_detail = f"HTTP {e.response.status_code}"
             try:
-                response = await client.get(url, headers=self.headers)
-                
-                logger.info(f"Squad verify response status: {response.status_code}")
-                logger.info(f"Squad verify response body: {response.text}")
-                
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Squad payment verification result: {result.get('data', {}).get('transaction_status', 'Unknown')}")
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = f"HTTP {e.response.status_code}"
-                try:
-                    error_data = e.response.json()
-                    if 'message' in error_data:
-                        error_detail = error_data['message']
-                except:
-                    error_detail = e.response.text
-                
-                logger.error(f"Squad API verification error: {error_detail}")
-                return {"error": f"Squad API verification error: {error_detail}"}
-                
-            except Exception as e:
-                logger.error(f"Unexpected error in Squad payment verification: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
+                error_data = e.response.json()
+                if 'message' in error_data:
+                    error_detail = error_data['message']
+            except:
+                error_detail = e.response.text
+            
+            logger.error(f"Squad API verification error: {error_detail}")
+            return {"error": f"Squad API verification error: {error_detail}"}
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in Squad payment verification: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
 
 # Create a single instance of the service to be used across the application
 squad_co_service = SquadCoService() 
\ No newline at end of file
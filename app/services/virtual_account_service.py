@@ -7,21 +7,27 @@ import json
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict, Any, Optional, List
-from sqlalchemy.orm import Session
-import os
-import requests
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
+from app.core.cache import response_cache
 from app.core.config import settings
+from app.core.http_client import squad_client, upstream_timeout
 from app.models.virtual_account import VirtualAccount, VirtualAccountType, VirtualAccountStatus
 from app.models.virtual_account_transaction import VirtualAccountTransaction, TransactionType, TransactionStatus, TransactionIndicator
 from app.models.user import User
-from app.crud import virtual_account as crud_virtual_account
-from app.crud import policy as crud_policy
-from app.crud import premium as crud_premium
-from app.crud import payment as crud_payment
-from app.models.policy import Policy, PolicyStatus
-from app.models.premium import PaymentStatus as PremiumPaymentStatus
+from app.crud.aio import virtual_account as crud_virtual_account
+from app.crud.aio import policy as crud_policy
+from app.crud.aio import premium as crud_premium
+from app.crud.aio import payment as crud_payment
+from app.crud.aio import daily_metrics as aio_daily_metrics
+from app.crud.aio import idempotency as crud_idempotency
+from app.crud.aio import notification as crud_notification
+from app.crud.daily_metrics import MetricDeltas, dimensions as metric_dimensions
+from app.models.policy import PolicyStatus
+from app.models.premium import Premium, PaymentStatus as PremiumPaymentStatus
 from app.schemas.payment import PaymentCreate
 from app.models.payment import PaymentMethod, PaymentTransactionStatus
 from app.services.settlement_service import settlement_service
@@ -45,10 +51,12 @@ class VirtualAccountService:
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json",
         }
+        # InsureFlow settlement VA ids by account number
+        self._settlement_account_ids: Dict[str, int] = {}
     
     async def create_individual_virtual_account(
         self, 
-        db: Session,
+        db: AsyncSession,
         user: User,
         policy_id: Optional[int] = None,
         customer_identifier: Optional[str] = None
@@ -65,7 +73,7 @@ class VirtualAccountService:
             return {"error": "Virtual account service not configured"}
         
         # Check if user already has a virtual account
-        existing_va = crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
+        existing_va = await crud_virtual_account.get_virtual_account_by_user(db, user_id=user.id)
         if existing_va:
             logger.info(f"✅ User already has virtual account: {existing_va.virtual_account_number}")
             return {
@@ -157,8 +165,8 @@ class VirtualAccountService:
             
             logger.info("💾 SAVING VIRTUAL ACCOUNT TO DATABASE")
             db.add(virtual_account)
-            db.commit()
-            db.refresh(virtual_account)
+            await db.commit()
+            await db.refresh(virtual_account)
             
             logger.info(f"✅ Virtual account saved to database with ID: {virtual_account.id}")
             logger.info(f"🎉 VIRTUAL ACCOUNT CREATION COMPLETED SUCCESSFULLY")
@@ -179,7 +187,7 @@ class VirtualAccountService:
     
     async def create_business_virtual_account(
         self,
-        db: Session,
+        db: AsyncSession,
         user: User,
         business_name: str,
         customer_identifier: Optional[str] = None
@@ -237,8 +245,8 @@ class VirtualAccountService:
             )
             
             db.add(virtual_account)
-            db.commit()
-            db.refresh(virtual_account)
+            await db.commit()
+            await db.refresh(virtual_account)
             
             logger.info(f"Business virtual account created successfully: {virtual_account.virtual_account_number}")
             return {"success": True, "virtual_account": virtual_account, "squad_response": result}
@@ -258,12 +266,44 @@ class VirtualAccountService:
     
     async def process_webhook_transaction(
         self,
-        db: Session,
+        db: AsyncSession,
         webhook_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Process incoming webhook transaction from Squad Co.
-        Handles fund distribution and commission calculation.
+        Handles fund distribution and commission calculation. Squad retries webhooks:
+        a transaction reference that was already processed returns the original result.
+        """
+        transaction_ref = webhook_data.get("transaction_reference")
+        if not transaction_ref:
+            return await self._apply_webhook_transaction(db, webhook_data)
+
+        idempotency_key = f"squad_co:va:{transaction_ref}"
+        outcome, record = await crud_idempotency.claim_idempotency_key(
+            db, idempotency_key, stale_after=settings.WEBHOOK_CLAIM_TIMEOUT
+        )
+        if outcome == crud_idempotency.COMPLETED:
+            logger.info(f"🔁 DUPLICATE WEBHOOK: {transaction_ref} already processed, returning original result")
+            return crud_idempotency.replayed_result(record)
+        if outcome == crud_idempotency.IN_PROGRESS:
+            logger.info(f"⏳ DUPLICATE WEBHOOK: {transaction_ref} is being processed by another worker")
+            return {"error": f"Transaction {transaction_ref} is already being processed"}
+
+        result = await self._apply_webhook_transaction(db, webhook_data, idempotency_key)
+        if "error" in result:
+            await crud_idempotency.release_idempotency_key(db, idempotency_key)
+        return result
+
+    async def _apply_webhook_transaction(
+        self,
+        db: AsyncSession,
+        webhook_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply a webhook transaction as one unit of work: policy and premium
+        updates, payment records, ledger entries, balances, rollups and the
+        idempotency key (if any) all land in a single commit, or none of them do.
         """
         try:
             transaction_ref = webhook_data.get("transaction_reference")
@@ -278,7 +318,7 @@ class VirtualAccountService:
             logger.info(f"📊 TRANSACTION REF: {transaction_ref}")
             
             # Find the virtual account
-            virtual_account = crud_virtual_account.get_virtual_account_by_number(
+            virtual_account = await crud_virtual_account.get_virtual_account_by_number(
                 db, virtual_account_number=virtual_account_number
             )
             
@@ -289,12 +329,10 @@ class VirtualAccountService:
             account_display = virtual_account.display_name or virtual_account.virtual_account_number
             logger.info(f"✅ VIRTUAL ACCOUNT FOUND: {account_display}")
             
+            metric_deltas = MetricDeltas()
+            
             # Find the associated policy using the virtual account (with relationships loaded)
-            from sqlalchemy.orm import joinedload
-            policy = db.query(Policy).options(
-                joinedload(Policy.user),
-                joinedload(Policy.broker)
-            ).filter(Policy.id == virtual_account.policy_id).first()
+            policy = await crud_policy.get_policy_with_parties(db, policy_id=virtual_account.policy_id)
             if not policy:
                 logger.error(f"❌ POLICY NOT FOUND FOR VIRTUAL ACCOUNT: {virtual_account.id}")
                 # Even if no policy is found, we should still process the transaction
@@ -316,7 +354,12 @@ class VirtualAccountService:
                 
                 # Update premium status and create Payment records
                 logger.info(f"📋 UPDATING PREMIUM STATUS AND CREATING PAYMENT RECORDS")
-                unpaid_premiums = crud_premium.get_unpaid_premiums_by_policy(db, policy_id=policy.id)
+                unpaid_premiums = (await db.execute(
+                    select(Premium.id, Premium.amount).where(
+                        Premium.policy_id == policy.id,
+                        Premium.payment_status != PremiumPaymentStatus.PAID
+                    ).order_by(Premium.due_date, Premium.id)
+                )).all()
                 
                 if unpaid_premiums:
                     logger.info(f"✅ Found {len(unpaid_premiums)} unpaid premium(s) for policy {policy.id}")
@@ -328,72 +371,47 @@ class VirtualAccountService:
                         user_email = policy.user.email
                         user_name = policy.user.full_name
                     
-                    # Calculate amount per premium (distribute settled_amount across premiums)
+                    # Distribute settled_amount across premiums in due order
                     remaining_amount = settled_amount
-                    payment_records_to_create = []
-                    
+                    premium_amounts = {}
                     for idx, premium in enumerate(unpaid_premiums):
                         # For the last premium, use remaining amount to avoid rounding issues
                         if idx == len(unpaid_premiums) - 1:
-                            premium_amount = remaining_amount
+                            premium_amounts[premium.id] = remaining_amount
                         else:
-                            premium_amount = min(premium.amount, remaining_amount)
-                            remaining_amount -= premium_amount
-                        
-                        # Update premium status to paid
-                        logger.info(f"💰 Updating premium {premium.id} status to PAID (amount: ₦{premium_amount:,.2f})")
-                        premium.payment_status = PremiumPaymentStatus.PAID
-                        premium.paid_amount = premium_amount
-                        premium.payment_date = datetime.utcnow().date()
-                        db.add(premium)
-                        
-                        # Create unique transaction reference for each premium
-                        # Use transaction_ref with premium ID suffix to ensure uniqueness
-                        unique_transaction_ref = f"{transaction_ref}_premium_{premium.id}"
-                        
-                        # Prepare Payment record
-                        payment_create = PaymentCreate(
-                            premium_id=premium.id,
-                            amount_paid=premium_amount,
-                            payment_method=PaymentMethod.BANK_TRANSFER,
-                            status=PaymentTransactionStatus.SUCCESS,
-                            transaction_reference=unique_transaction_ref,
-                            payer_email=user_email,
-                        )
-                        payment_records_to_create.append((payment_create, user_name))
-                    
-                    # Commit premium updates
-                    db.commit()
+                            premium_amounts[premium.id] = min(premium.amount, remaining_amount)
+                            remaining_amount -= premium_amounts[premium.id]
                     
-                    # Create all payment records
-                    for payment_create, payer_name in payment_records_to_create:
-                        payment_record = crud_payment.create_payment(db=db, payment=payment_create)
-                        logger.info(f"✅ Created Payment record {payment_record.id} for premium {payment_create.premium_id}")
-                        
-                        # Update payer_name if available
-                        if payer_name:
-                            payment_record.payer_name = payer_name
-                            db.add(payment_record)
+                    payment_day = datetime.utcnow().date()
+                    await crud_premium.mark_premiums_paid(db, premium_amounts, payment_day)
+                    for premium_amount in premium_amounts.values():
+                        metric_deltas.add(
+                            payment_day, metric_dimensions(policy),
+                            premiums_collected_count=1, premiums_collected_amount=premium_amount
+                        )
+                    logger.info(f"💰 Marked {len(premium_amounts)} premium(s) PAID: {list(premium_amounts)}")
                     
-                    # Commit all payment records
-                    db.commit()
+                    # Payment records, one per premium, with a unique reference each
+                    await crud_payment.insert_payments(
+                        db,
+                        [
+                            PaymentCreate(
+                                premium_id=premium_id,
+                                amount_paid=premium_amount,
+                                payment_method=PaymentMethod.BANK_TRANSFER,
+                                status=PaymentTransactionStatus.SUCCESS,
+                                transaction_reference=f"{transaction_ref}_premium_{premium_id}",
+                                payer_email=user_email,
+                            )
+                            for premium_id, premium_amount in premium_amounts.items()
+                        ],
+                        payer_name=user_name
+                    )
                     
                     # Dismiss payment reminder notifications for this policy
-                    from app.models.notification import Notification, NotificationType
-                    
-                    reminders = db.query(Notification).filter(
-                        Notification.policy_id == policy.id,
-                        Notification.type == NotificationType.PAYMENT_REMINDER.value,
-                        Notification.is_dismissed == False
-                    ).all()
-                    
-                    if reminders:
-                        logger.info(f"🔔 Found {len(reminders)} payment reminder notification(s) to dismiss for policy {policy.id}")
-                        for reminder in reminders:
-                            reminder.dismiss()
-                            db.add(reminder)
-                            logger.info(f"✅ Dismissed payment reminder notification {reminder.id} for policy {policy.id}")
-                        db.commit()
+                    dismissed = await crud_notification.dismiss_payment_reminders(db, [policy.id])
+                    if dismissed:
+                        logger.info(f"✅ Dismissed {dismissed} payment reminder notification(s) for policy {policy.id}")
                 else:
                     logger.info(f"ℹ️ No unpaid premiums found for policy {policy.id}")
             
@@ -410,8 +428,9 @@ class VirtualAccountService:
             logger.info(f"   - Net Settlement Amount: ₦{(settled_amount - total_platform_commission):,}")
             
             # Create transaction record
-            transaction = VirtualAccountTransaction(
+            credit_row = dict(
                 virtual_account_id=virtual_account.id,
+                policy_id=policy.id if policy else None,
                 transaction_reference=transaction_ref,
                 squad_transaction_reference=transaction_ref,
                 transaction_type=TransactionType.CREDIT,
@@ -433,25 +452,21 @@ class VirtualAccountService:
                 transaction_metadata=json.dumps(webhook_data)
             )
             
-            db.add(transaction)
+            ledger_rows = [credit_row]
             
-            # Update virtual account balances
-            virtual_account.total_credits += settled_amount
-            virtual_account.current_balance += settled_amount
-            virtual_account.last_activity_at = datetime.utcnow()
+            # Balance movements, applied in the database below: {virtual_account_id: (credit, debit)}
+            balance_deltas = {virtual_account.id: (settled_amount, Decimal('0'))}
             
             # Transfer commissions to InsureFlow-VA
             logger.info(f"💼 TRANSFERRING COMMISSIONS TO INSUREFLOW-VA")
             if settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER:
-                insureflow_va = crud_virtual_account.get_virtual_account_by_number(
-                    db, virtual_account_number=settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER
-                )
+                insureflow_va_id = await self._settlement_account_id(db)
                 
-                if insureflow_va:
-                    logger.info(f"✅ INSUREFLOW-VA FOUND: {insureflow_va.virtual_account_number}")
+                if insureflow_va_id:
+                    logger.info(f"✅ INSUREFLOW-VA FOUND: {settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER}")
                     
                     # Create debit transaction on customer's VA for commission
-                    commission_debit = VirtualAccountTransaction(
+                    commission_debit = dict(
                         virtual_account_id=virtual_account.id,
                         policy_id=policy.id if policy else None,
                         transaction_reference=f"{transaction_ref}_commission_debit",
@@ -470,11 +485,10 @@ class VirtualAccountService:
                         webhook_received_at=datetime.utcnow(),
                         remarks=f"Platform commission deduction (InsureFlow 0.75% + Habari 0.25%)"
                     )
-                    db.add(commission_debit)
                     
                     # Create credit transaction on InsureFlow-VA for commission
-                    commission_credit = VirtualAccountTransaction(
-                        virtual_account_id=insureflow_va.id,
+                    commission_credit = dict(
+                        virtual_account_id=insureflow_va_id,
                         policy_id=policy.id if policy else None,
                         transaction_reference=f"{transaction_ref}_commission_credit",
                         squad_transaction_reference=transaction_ref,
@@ -492,18 +506,13 @@ class VirtualAccountService:
                         webhook_received_at=datetime.utcnow(),
                         remarks=f"Platform commission from payment {transaction_ref}"
                     )
-                    db.add(commission_credit)
+                    ledger_rows += [commission_debit, commission_credit]
                     
-                    # Update customer VA balance: subtract commission
-                    virtual_account.current_balance -= total_platform_commission
-                    virtual_account.total_debits += total_platform_commission
-                    logger.info(f"💰 Customer VA balance updated: -₦{total_platform_commission:,}")
-                    
-                    # Update InsureFlow-VA balance: add commission
-                    insureflow_va.current_balance += total_platform_commission
-                    insureflow_va.total_credits += total_platform_commission
-                    insureflow_va.last_activity_at = datetime.utcnow()
-                    logger.info(f"💰 InsureFlow-VA balance updated: +₦{total_platform_commission:,}")
+                    # Customer VA: subtract commission; InsureFlow-VA: add commission
+                    balance_deltas[virtual_account.id] = (settled_amount, total_platform_commission)
+                    balance_deltas[insureflow_va_id] = (total_platform_commission, Decimal('0'))
+                    logger.info(f"💰 Customer VA commission debit: -₦{total_platform_commission:,}")
+                    logger.info(f"💰 InsureFlow-VA commission credit: +₦{total_platform_commission:,}")
                     logger.info(f"   - InsureFlow commission: ₦{insureflow_commission:,}")
                     logger.info(f"   - Habari commission: ₦{habari_commission:,}")
                 else:
@@ -512,28 +521,62 @@ class VirtualAccountService:
             else:
                 logger.warning(f"⚠️ INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER not configured - commission transfer skipped")
             
-            db.commit()
+            # Ledger entries in one multi-row INSERT; their created_at is also
+            # the accounts' last_transaction_at
+            recorded_at = datetime.utcnow()
+            for row in ledger_rows:
+                row["created_at"] = recorded_at
+            transaction_ids = await crud_virtual_account.insert_virtual_account_transactions(db, ledger_rows)
+            for row in ledger_rows:
+                metric_deltas.add_transaction(VirtualAccountTransaction(**row), metric_dimensions(policy))
+            await aio_daily_metrics.apply(db, metric_deltas)
+            
+            # In-database increments, locking accounts in id order; done last so
+            # the hot account rows stay locked only until the commit just below
+            balances = await crud_virtual_account.apply_balance_deltas(db, balance_deltas, transaction_at=recorded_at)
+            current_balance = balances[virtual_account.id].current_balance
+            
+            result = {"success": True, "transaction_id": transaction_ids[transaction_ref], "transaction_reference": transaction_ref}
+            if idempotency_key:
+                await crud_idempotency.complete_idempotency_key(db, idempotency_key, result)
+            await db.commit()
+            await response_cache.ainvalidate(reason=f"webhook {transaction_ref}")
             
             # Check if auto-settlement is enabled and threshold is met
             logger.info(f"🎯 SETTLEMENT CHECK:")
-            logger.info(f"   - Current Balance: ₦{virtual_account.current_balance:,}")
+            logger.info(f"   - Current Balance: ₦{current_balance:,}")
             logger.info(f"   - Settlement Threshold: ₦{virtual_account.settlement_threshold:,}")
             logger.info(f"   - Auto-Settlement Enabled: {virtual_account.auto_settlement}")
             
-            if virtual_account.auto_settlement and virtual_account.current_balance >= virtual_account.settlement_threshold:
+            if virtual_account.auto_settlement and current_balance >= virtual_account.settlement_threshold:
                 logger.info(f"🚀 SETTLEMENT TRIGGERED: Threshold exceeded, initiating auto-settlement")
                 await settlement_service.process_settlement(db, virtual_account.id)
             else:
                 logger.info(f"⏳ SETTLEMENT NOT TRIGGERED: Threshold not met or auto-settlement disabled")
             
             logger.info(f"✅ WEBHOOK PROCESSING COMPLETE: {transaction_ref}")
-            return {"success": True, "transaction_id": transaction.id, "transaction_reference": transaction.transaction_reference}
+            return result
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error processing webhook transaction: {str(e)}")
             return {"error": f"Error processing transaction: {str(e)}"}
     
+    async def _settlement_account_id(self, db: AsyncSession) -> Optional[int]:
+        """
+        Id of the InsureFlow settlement VA, looked up once per account number and
+        then served from memory; a missing account is looked up again next time.
+        """
+        account_number = settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER
+        if account_number not in self._settlement_account_ids:
+            account_id = (await db.execute(
+                select(VirtualAccount.id).where(VirtualAccount.virtual_account_number == account_number)
+            )).scalar_one_or_none()
+            if account_id is None:
+                return None
+            self._settlement_account_ids[account_number] = account_id
+        return self._settlement_account_ids[account_number]
+    
     async def get_customer_transactions(
         self,
         customer_identifier: str
@@ -546,32 +589,32 @@ class VirtualAccountService:
         
         url = f"{self.base_url}/virtual-account/customer/transactions/{customer_identifier}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                logger.info(f"Retrieved transactions for customer {customer_identifier}")
-                return result
-                
-            except httpx.HTTPStatusError as e:
-                error_detail = self._extract_error_message(e.response)
-                logger.error(f"Squad API HTTP error: {error_detail}")
-                return {"error": f"Squad API error: {error_detail}"}
-                
-            except Exception as e:
-                logger.error(f"Unexpected error retrieving customer transactions: {str(e)}")
-                return {"error": f"Unexpected error: {str(e)}"}
-    
-    def _initiate_auto_settlement(self, db: Session, virtual_account: VirtualAccount):
+        client = squad_client()
+        try:
+            response = await client.get(
+                url, headers=self.headers, timeout=upstream_timeout(settings.SQUAD_VERIFY_TIMEOUT)
+            )
+            response.raise_for_status()
+            
+            result = response.json()
+            logger.info(f"Retrieved transactions for customer {customer_identifier}")
+            return result
+            
+        except httpx.HTTPStatusError as e:
+            error_detail = self._extract_error_message(e.response)
+            logger.error(f"Squad API HTTP error: {error_detail}")
+            return {"error": f"Squad API error: {error_detail}"}
+            
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving customer transactions: {str(e)}")
+            return {"error": f"Unexpected error: {str(e)}"}
+
+    async def _initiate_auto_settlement(self, db: AsyncSession, virtual_account: VirtualAccount):
         """
         Initiate automatic settlement for a virtual account.
         This triggers the settlement service to process GAPS bulk transfer.
         """
         try:
-            from app.services.settlement_service import get_settlement_processor
-            
             # Calculate net amount after platform commission
             net_amount = virtual_account.net_amount_after_commission
             
@@ -580,9 +623,7 @@ class VirtualAccountService:
             
             # Get the insurance company for this virtual account
             from app.models.company import InsuranceCompany
-            company = db.query(InsuranceCompany).filter(
-                InsuranceCompany.id == virtual_account.company_id
-            ).first()
+            company = await db.get(InsuranceCompany, virtual_account.company_id)
             
             if not company:
                 logger.error(f"No company found for virtual account {virtual_account.virtual_account_number}")
@@ -601,20 +642,19 @@ class VirtualAccountService:
                     principal_amount=net_amount,
                     settled_amount=net_amount,
                     transaction_date=datetime.utcnow(),
+                    created_at=datetime.utcnow(),
                     remarks=f"Auto-settlement pending - no settlement account for {company.name}"
                 )
                 
                 db.add(settlement_transaction)
-                db.commit()
+                virtual_account.last_transaction_at = settlement_transaction.created_at
+                await db.commit()
                 return
             
-            # Process settlement via settlement service
-            settlement_processor = get_settlement_processor()
-            
             logger.info(f"Processing auto-settlement via GAPS for company: {company.name}")
             
             # Use manual settlement for individual virtual account
-            result = settlement_processor.process_manual_settlement(db, company.id)
+            result = await settlement_service.process_manual_settlement(db, company.id)
             
             if result.get("success"):
                 logger.info(f"Auto-settlement completed successfully: {result.get('message')}")
@@ -632,15 +672,17 @@ class VirtualAccountService:
                     principal_amount=net_amount,
                     settled_amount=Decimal('0'),
                     transaction_date=datetime.utcnow(),
+                    created_at=datetime.utcnow(),
                     remarks=f"Auto-settlement failed: {result.get('error', 'Unknown error')}"
                 )
                 
                 db.add(settlement_transaction)
-                db.commit()
+                virtual_account.last_transaction_at = settlement_transaction.created_at
+                await db.commit()
             
         except Exception as e:
             logger.error(f"Error initiating auto-settlement: {str(e)}")
-            db.rollback()
+            await db.rollback()
     
     def _extract_error_message(self, response) -> str:
         """Extract error message from Squad API response."""
@@ -659,18 +701,20 @@ class VirtualAccountService:
 # Global service instance
 virtual_account_service = VirtualAccountService() 
 
-async def simulate_policy_payment(policy_id: int, db, user):
+async def simulate_policy_payment(policy_id: int, db: AsyncSession, user):
     # Fetch the policy and its virtual account
-    policy = db.query(models.Policy).filter(models.Policy.id == policy_id).first()
+    policy = await crud_policy.get_policy(db, policy_id=policy_id)
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    va = db.query(models.VirtualAccount).filter(models.VirtualAccount.policy_id == policy_id).first()
+    va = (await db.execute(
+        select(VirtualAccount).where(VirtualAccount.policy_id == policy_id)
+    )).scalars().first()
     if not va:
         raise HTTPException(status_code=404, detail="Virtual account not found for policy")
-    squad_secret = os.getenv("SQUAD_SECRET_KEY")
+    squad_secret = settings.SQUAD_SECRET_KEY
     if not squad_secret:
         raise HTTPException(status_code=500, detail="Squad secret key not configured")
-    url = "https://sandbox-api-d.squadco.com/virtual-account/simulate/payment"
+    url = f"{settings.SQUAD_BASE_URL}/virtual-account/simulate/payment"
     payload = {
         "virtual_account_number": va.virtual_account_number,
         "amount": str(policy.premium_amount),
@@ -681,7 +725,7 @@ async def simulate_policy_payment(policy_id: int, db, user):
         "Authorization": f"Bearer {squad_secret}"
     }
     try:
-        resp = requests.post(url, json=payload, headers=headers, timeout=10)
+        resp = await squad_client().post(url, json=payload, headers=headers, timeout=upstream_timeout(10.0))
         resp.raise_for_status()
         data = resp.json()
         # Optionally log the simulation
@@ -689,4 +733,4 @@ async def simulate_policy_payment(policy_id: int, db, user):
         return {"success": data.get("success"), "message": data.get("message"), "data": data.get("data")}
     except Exception as e:
         # Optionally log the error
-        raise HTTPException(status_code=500, detail=f"Squad simulation failed: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Squad simulation failed: {str(e)}")
@@ -0,0 +1,169 @@
+"""
+Processing of Squad Co webhook events taken from the webhook inbox.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal, ROUND_DOWN
+from typing import Any, Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.crud import daily_metrics
+from app.crud.aio import daily_metrics as aio_daily_metrics
+from app.crud.aio import idempotency as crud_idempotency
+from app.crud.aio import payment as async_crud_payment
+from app.crud.aio import premium as async_crud_premium
+from app.models.payment import PaymentMethod, PaymentTransactionStatus
+from app.schemas.payment import PaymentCreate
+from app.services.virtual_account_service import virtual_account_service
+
+logger = logging.getLogger(__name__)
+
+
+async def process_squad_co_event(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply one Squad Co webhook: virtual account credits go through the virtual
+    account service; card and transfer charges mark their premiums paid.
+    Both paths are idempotent on the transaction reference, so replays return the original result.
+    """
+    event = payload.get("Event")
+    if event != "charge.success":
+        return {"success": True, "skipped": event}
+
+    webhook_data = payload.get("Body", {})
+    transaction_ref = webhook_data.get("transaction_ref")
+    if not transaction_ref:
+        return {"error": "No transaction reference in webhook"}
+
+    # Check if this is a virtual account transaction
+    if webhook_data.get("virtual_account_number"):
+        return await virtual_account_service.process_webhook_transaction(db, webhook_data)
+
+    idempotency_key = f"squad_co:charge:{transaction_ref}"
+    outcome, record = await crud_idempotency.claim_idempotency_key(
+        db, idempotency_key, stale_after=settings.WEBHOOK_CLAIM_TIMEOUT
+    )
+    if outcome == crud_idempotency.COMPLETED:
+        logger.info(f"🔁 DUPLICATE WEBHOOK: {transaction_ref} already processed, returning original result")
+        return crud_idempotency.replayed_result(record)
+    if outcome == crud_idempotency.IN_PROGRESS:
+        logger.info(f"⏳ DUPLICATE WEBHOOK: {transaction_ref} is being processed by another worker")
+        return {"error": f"Transaction {transaction_ref} is already being processed"}
+
+    try:
+        result = await _apply_charge(db, webhook_data, transaction_ref)
+    except Exception:
+        await db.rollback()
+        await crud_idempotency.release_idempotency_key(db, idempotency_key)
+        raise
+    await crud_idempotency.complete_idempotency_key(db, idempotency_key, result)
+    await db.commit()
+    await response_cache.ainvalidate(reason=f"charge {transaction_ref}")
+    return result
+
+
+async def _apply_charge(db: AsyncSession, webhook_data: Dict[str, Any], transaction_ref: str) -> Dict[str, Any]:
+    """
+    Mark the premiums of a card or transfer charge paid.
+    """
+    # Squad usually sends amount in kobo (integer), convert to naira
+    amount = webhook_data.get("amount")
+    amount_paid = Decimal(str(amount)) / 100 if amount else Decimal("0.00")
+    transaction_date = datetime.now()
+
+    # Process as traditional payment
+    # Check if this is a bulk payment
+    metadata = webhook_data.get("meta_data", {})
+    if metadata.get("type") == "bulk_payment" and "premium_ids" in metadata:
+        return await _apply_bulk_charge(db, metadata["premium_ids"], amount_paid, transaction_ref)
+
+    # Handle single payment - find the premium by transaction ref
+    payment = await async_crud_payment.get_payment_by_transaction_ref(db, transaction_ref=transaction_ref)
+    if payment and payment.premium_id:
+        # Update premium with actual amount paid (the caller commits with the idempotency key)
+        premium = await async_crud_premium.get_premium(db, payment.premium_id)
+        payment_day = transaction_date.date()
+        if premium and await async_crud_premium.mark_premiums_paid(db, {premium.id: amount_paid}, payment_day):
+            await aio_daily_metrics.apply(db, daily_metrics.MetricDeltas().add(
+                payment_day, daily_metrics.dimensions(premium.policy),
+                premiums_collected_count=1, premiums_collected_amount=amount_paid
+            ))
+
+        # Update payment record with actual amount if it differs
+        if payment.amount_paid != amount_paid:
+            payment.amount_paid = amount_paid
+            db.add(payment)
+        logger.info(f"✅ PAYMENT APPLIED: {transaction_ref} for premium {payment.premium_id}")
+    else:
+        logger.warning(f"⚠️ NO PAYMENT FOUND FOR WEBHOOK: {transaction_ref}")
+    return {"success": True}
+
+
+async def _apply_bulk_charge(
+    db: AsyncSession, premium_ids: List[int], amount_paid: Decimal, transaction_ref: str
+) -> Dict[str, Any]:
+    """
+    Settle a bulk payment in one go: one query loads the premiums with their
+    payers, one UPDATE marks the unpaid ones paid, one sets their shares and one
+    statement writes their payment records (the caller commits). The amount is
+    split across the premiums marked paid, in proportion to their amounts.
+    """
+    premiums = await async_crud_premium.get_premiums_with_payers(db, premium_ids)
+    if not premiums:
+        logger.warning(f"⚠️ NO PREMIUMS FOUND FOR BULK PAYMENT: {transaction_ref}")
+        return {"success": True, "premium_ids": []}
+
+    # Only the premiums this charge actually marks paid share the money
+    payment_day = datetime.utcnow().date()
+    paid_ids = set(await async_crud_premium.mark_premiums_paid(
+        db, {premium.id: premium.amount for premium in premiums}, payment_day
+    ))
+    premiums = [premium for premium in premiums if premium.id in paid_ids]
+    if not premiums:
+        logger.warning(f"⚠️ BULK PAYMENT FOR PREMIUMS ALREADY PAID: {transaction_ref}")
+        return {"success": True, "premium_ids": []}
+    shares = _split_proportionally(amount_paid, {premium.id: premium.amount for premium in premiums})
+    await async_crud_premium.set_paid_amounts(db, shares)
+
+    collected = daily_metrics.MetricDeltas()
+    for premium in premiums:
+        collected.add(
+            payment_day, daily_metrics.dimensions(premium.policy),
+            premiums_collected_count=1, premiums_collected_amount=shares[premium.id]
+        )
+    await aio_daily_metrics.apply(db, collected)
+
+    # One payment record per premium, under a per-premium reference
+    await async_crud_payment.upsert_payments(db, [
+        PaymentCreate(
+            premium_id=premium.id,
+            amount_paid=shares[premium.id],
+            payment_method=PaymentMethod.BANK_TRANSFER,
+            transaction_reference=f"{transaction_ref}_premium_{premium.id}",
+            status=PaymentTransactionStatus.SUCCESS,
+            payer_email=premium.policy.user.email if premium.policy and premium.policy.user else None
+        )
+        for premium in premiums
+    ])
+    logger.info(f"✅ BULK PAYMENT APPLIED: {transaction_ref} across {len(premiums)} premiums")
+    return {"success": True, "premium_ids": [premium.id for premium in premiums]}
+
+
+def _split_proportionally(total: Decimal, weights: Dict[int, Decimal]) -> Dict[int, Decimal]:
+    """
+    Split `total` across the keys of `weights` in proportion to their weights
+    (evenly when they are all zero), to the kobo. Leftover kobo go to the
+    largest remainders, so the shares always add up to `total`.
+    """
+    cent = Decimal("0.01")
+    weight_sum = sum(weights.values())
+    if not weight_sum:
+        weights, weight_sum = {key: Decimal(1) for key in weights}, Decimal(len(weights))
+
+    exact = {key: total * weight / weight_sum for key, weight in weights.items()}
+    shares = {key: amount.quantize(cent, rounding=ROUND_DOWN) for key, amount in exact.items()}
+    leftover = int((total - sum(shares.values())) / cent)
+    for key in sorted(exact, key=lambda key: exact[key] - shares[key], reverse=True)[:leftover]:
+        shares[key] += cent
+    return shares
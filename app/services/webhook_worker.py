@@ -0,0 +1,113 @@
+"""
+Background workers draining the webhook inbox.
+The webhook endpoint only stores the verified event, so Squad is answered in
+milliseconds whatever the processing costs (ledger writes, settlement calls to
+GAPS). Workers run as asyncio tasks in the API process (started from the app
+lifespan) or in their own process via scripts/run_webhook_worker.py.
+"""
+import asyncio
+import json
+import logging
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.aio import webhook_event as crud_webhook_event
+from app.models.webhook_event import WebhookEvent
+from app.services.webhook_service import process_squad_co_event
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookWorker:
+    """Pool of tasks that claim inbox events one at a time and process them."""
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, concurrency: int = None) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        concurrency = concurrency or settings.WEBHOOK_WORKER_CONCURRENCY
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"webhook-worker-{n}") for n in range(concurrency)
+        ]
+        logger.info(f"🚀 WEBHOOK WORKERS STARTED: {concurrency}")
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Let in-flight events finish (up to `timeout` seconds), then cancel the tasks."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("🛑 WEBHOOK WORKERS STOPPED")
+
+    def notify(self) -> None:
+        """Wake idle workers now instead of at their next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.process_next()
+            except Exception as e:
+                logger.error(f"❌ WEBHOOK WORKER ERROR: {e}")
+                processed = False
+            if processed or self._stopping:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.WEBHOOK_WORKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def process_next(self) -> bool:
+        """Claim and process one due event; False when there was none."""
+        async with AsyncSessionLocal() as db:
+            events = await crud_webhook_event.claim_webhook_events(
+                db, limit=1, claim_timeout=settings.WEBHOOK_CLAIM_TIMEOUT
+            )
+        if not events:
+            return False
+        await self._process(events[0])
+        return True
+
+    async def _process(self, event: WebhookEvent) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await process_squad_co_event(db, json.loads(event.payload))
+        except Exception as e:
+            result = {"error": f"Unhandled error: {e}"}
+
+        async with AsyncSessionLocal() as db:
+            if "error" in result:
+                await crud_webhook_event.mark_webhook_event_failed(
+                    db, event, result["error"],
+                    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+                    base_delay=settings.WEBHOOK_RETRY_BASE_DELAY,
+                    max_delay=settings.WEBHOOK_RETRY_MAX_DELAY
+                )
+                logger.warning(
+                    f"⚠️ WEBHOOK EVENT {event.id} FAILED (attempt {event.attempts}/{settings.WEBHOOK_MAX_ATTEMPTS}): {result['error']}"
+                )
+            else:
+                await crud_webhook_event.mark_webhook_event_processed(db, event)
+                logger.info(f"✅ WEBHOOK EVENT {event.id} PROCESSED: {event.transaction_reference}")
+
+
+webhook_worker = WebhookWorker()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Check that the hot queries in app/crud use the composite indexes.
+Each check runs the real CRUD call, captures the SQL it sends and runs
+EXPLAIN on it, passing when the expected index shows up in a plan.
+PostgreSQL only. Sequential scans are disabled for the session by default,
+so small development tables still show whether an index *can* serve the
+query; pass --allow-seqscan to see the planner's actual choice.
+
+    python scripts/explain_hot_queries.py
+    python scripts/explain_hot_queries.py --verbose     # print the plans
+"""
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.crud import dashboard as crud_dashboard
+from app.crud import insureflow_admin as crud_admin
+from app.crud import notification as crud_notification
+from app.crud import premium as crud_premium
+from app.crud import support_ticket as crud_support_ticket
+from app.crud import virtual_account as crud_virtual_account
+from app.models.policy import Policy
+from app.models.premium import Premium
+from app.models.support_ticket import TicketStatus
+from app.models.user import User, UserRole
+
+
+def first_user(db: Session, *roles: UserRole):
+    return db.query(User).filter(User.role.in_(roles)).order_by(User.id).first()
+
+
+def unpaid_due_premiums(db: Session):
+    # Unpaid-and-due scan shape (Premium.is_overdue adds each premium's grace period on top)
+    return db.query(Premium.id).filter(
+        Premium.payment_status.in_(crud_premium.UNPAID_STATUSES),
+        Premium.due_date < date.today()
+    ).all()
+
+
+def policies_due_this_week(db: Session):
+    # Due-this-week shape; the dashboard folds the same condition into its single-pass KPIs
+    start_of_week = date.today() - timedelta(days=date.today().weekday())
+    return db.query(Policy.id).filter(
+        Policy.due_date >= start_of_week,
+        Policy.due_date < start_of_week + timedelta(days=7)
+    ).all()
+
+
+def enhanced_kpis(db: Session):
+    admin = first_user(db, UserRole.ADMIN, UserRole.INSUREFLOW_ADMIN)
+    return crud_dashboard.get_enhanced_dashboard_kpis(db, admin) if admin else None
+
+
+def broker_recent_policies(db: Session):
+    broker = first_user(db, UserRole.BROKER)
+    return crud_dashboard.get_recent_policies(db, broker) if broker else None
+
+
+# (index, description, query); queries that need a user return None when there is none
+HOT_QUERIES = [
+    ("ix_virtual_account_transactions_status_transaction_date", "financial report for the month",
+     lambda db: crud_admin.get_financial_report(db, "monthly")),
+    ("ix_virtual_account_transactions_status_transaction_indicator", "pending debit settlements in enhanced KPIs",
+     enhanced_kpis),
+    ("ix_virtual_account_transactions_virtual_account_id_created_at", "virtual accounts with latest transaction",
+     lambda db: crud_virtual_account.get_virtual_accounts_with_latest_transaction(db, limit=10)),
+    ("ix_premiums_policy_id_payment_status", "unpaid premiums for a policy",
+     lambda db: crud_premium.get_unpaid_premiums_for_policies(db, [1, 2, 3])),
+    ("ix_premiums_payment_status_due_date", "unpaid premiums past their due date",
+     unpaid_due_premiums),
+    ("ix_policies_status_end_date", "overdue policies for automatic reminders",
+     lambda db: db.execute(crud_notification.overdue_reminder_candidates(
+         db, max_days_overdue=30, reminder_cooldown_hours=24)).all()),
+    ("ix_policies_broker_id_created_at", "broker's recent policies",
+     broker_recent_policies),
+    ("ix_policies_due_date", "policies due this week",
+     policies_due_this_week),
+    ("ix_notifications_broker_id_is_dismissed_is_read_created_at", "broker notification feed",
+     lambda db: crud_notification.get_broker_notifications(db, broker_id=1, unread_only=True)),
+    ("ix_support_tickets_status_created_at", "admin ticket list by status",
+     lambda db: crud_support_ticket.get_all_tickets(db, status=TicketStatus.OPEN.value)),
+]
+
+
+@contextmanager
+def captured_statements(db: Session):
+    """Collect (statement, parameters) for every SELECT sent while the block runs."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+
+def explain(db: Session, statement: str, parameters) -> str:
+    rows = db.connection().exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def check(allow_seqscan: bool = False, verbose: bool = False) -> bool:
+    db: Session = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("❌ EXPLAIN checks need PostgreSQL")
+            return False
+        if not allow_seqscan:
+            db.execute(text("SET enable_seqscan = off"))
+
+        failures = 0
+        for index_name, description, run in HOT_QUERIES:
+            with captured_statements(db) as statements:
+                result = run(db)
+            if result is None:
+                print(f"⏭️  {description}: skipped (no matching user)")
+                continue
+
+            plans = [explain(db, statement, parameters) for statement, parameters in statements]
+            if any(index_name in plan for plan in plans):
+                print(f"✅ {description}: uses {index_name}")
+            else:
+                failures += 1
+                print(f"❌ {description}: {index_name} not used")
+            if verbose:
+                for plan in plans:
+                    print(plan)
+                    print()
+
+        print(f"🎉 All {len(HOT_QUERIES)} hot queries checked" if not failures else f"⚠️ {failures} hot queries miss their index")
+        return failures == 0
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN the hot CRUD queries and check their indexes")
+    parser.add_argument("--allow-seqscan", action="store_true", help="Leave sequential scans enabled")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.allow_seqscan, args.verbose) else 1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily_metrics rollups from policies, premiums and transactions.
+Run once after the migration to backfill history, or over a date range to
+repair drift. Days are rebuilt in chunks, each committed on its own.
+
+    python scripts/rebuild_daily_metrics.py                      # full history
+    python scripts/rebuild_daily_metrics.py --start 2025-01-01 --end 2025-04-01
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.crud.daily_metrics import rebuild_daily_metrics, as_date
+from app.models.policy import Policy
+from app.models.premium import Premium
+from app.models.virtual_account_transaction import VirtualAccountTransaction
+
+
+def earliest_activity(db: Session) -> date:
+    """First day with any policy, premium or transaction (today when empty)."""
+    candidates = [
+        db.query(func.min(Policy.created_at)).scalar(),
+        db.query(func.min(Premium.due_date)).scalar(),
+        db.query(func.min(Premium.payment_date)).scalar(),
+        db.query(func.min(VirtualAccountTransaction.transaction_date)).scalar(),
+    ]
+    days = [as_date(value) for value in candidates if value is not None]
+    return min(days) if days else date.today()
+
+
+def latest_activity(db: Session) -> date:
+    """Day after the last policy, premium or transaction (premiums can be billed ahead)."""
+    candidates = [
+        db.query(func.max(Policy.created_at)).scalar(),
+        db.query(func.max(Premium.due_date)).scalar(),
+        db.query(func.max(Premium.payment_date)).scalar(),
+        db.query(func.max(VirtualAccountTransaction.transaction_date)).scalar(),
+    ]
+    days = [as_date(value) for value in candidates if value is not None] + [date.today()]
+    return max(days) + timedelta(days=1)
+
+
+def rebuild(start: date = None, end: date = None, chunk_days: int = 31):
+    db: Session = SessionLocal()
+    try:
+        start = start or earliest_activity(db)
+        end = end or latest_activity(db)
+        print(f"🚀 Rebuilding daily metrics for {start} to {end} (exclusive)...")
+
+        total_rows = 0
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+            rows = rebuild_daily_metrics(db, chunk_start, chunk_end)
+            db.commit()
+            total_rows += rows
+            print(f"✅ {chunk_start} - {chunk_end}: {rows} rollup rows")
+            chunk_start = chunk_end
+
+        print(f"🎉 Done: {total_rows} rollup rows written")
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild daily_metrics rollups")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Day after the last day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--chunk-days", type=int, default=31, help="Days rebuilt per transaction")
+    args = parser.parse_args()
+    rebuild(args.start, args.end, args.chunk_days)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Drain the webhook inbox in a dedicated process, alongside or instead of the
+workers inside the API (set WEBHOOK_WORKERS_ENABLED=false on the API to move
+all processing here). Any number of these can run; events are claimed with
+FOR UPDATE SKIP LOCKED.
+
+    python scripts/run_webhook_worker.py                  # run until SIGINT/SIGTERM
+    python scripts/run_webhook_worker.py --concurrency 8
+    python scripts/run_webhook_worker.py --drain          # process what is due, then exit
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_client import http_clients
+from app.services.webhook_worker import WebhookWorker
+
+
+async def drain(worker: WebhookWorker) -> int:
+    processed = 0
+    while await worker.process_next():
+        processed += 1
+    return processed
+
+
+async def main(concurrency: int, drain_only: bool) -> None:
+    worker = WebhookWorker()
+    try:
+        if drain_only:
+            print(f"✅ Processed {await drain(worker)} webhook events")
+            return
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        worker.start(concurrency)
+        await stop.wait()
+        await worker.stop()
+    finally:
+        await http_clients.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process webhook inbox events")
+    parser.add_argument("--concurrency", type=int, default=None, help="Events processed at once")
+    parser.add_argument("--drain", action="store_true", help="Process due events and exit")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.drain))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for virtual account balances.
+Fires hundreds of simultaneous virtual account webhooks (distinct transaction
+references, each in its own session) at one account and checks that the final
+balances of the account and of the InsureFlow settlement VA equal the sum of
+the credits and commissions, i.e. that no concurrent update was lost.
+Run it against a development database: the transactions it creates stay on the
+account. Auto-settlement is switched off for the account during the run and
+restored afterwards.
+
+    python scripts/test_concurrent_webhooks.py --account 1234567890
+    python scripts/test_concurrent_webhooks.py --account 1234567890 --count 500 --amount 2500
+    python scripts/test_concurrent_webhooks.py --account 1234567890 --duplicates 2   # also replay each webhook
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.http_client import http_clients
+from app.crud.aio import virtual_account as crud_virtual_account
+from app.models.virtual_account import VirtualAccount
+from app.models.virtual_account_transaction import TransactionType, VirtualAccountTransaction
+from app.services.virtual_account_service import virtual_account_service
+
+CENT = Decimal("0.01")
+
+
+async def balances(virtual_account_number: str):
+    async with AsyncSessionLocal() as db:
+        va = await crud_virtual_account.get_virtual_account_by_number(db, virtual_account_number)
+        if va is None:
+            return None
+        return va.id, va.current_balance, va.total_credits, va.total_debits
+
+
+async def set_auto_settlement(virtual_account_id: int, enabled: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(VirtualAccount).where(VirtualAccount.id == virtual_account_id).values(auto_settlement=enabled)
+        )
+        await db.commit()
+
+
+async def send_webhook(webhook_data: dict) -> dict:
+    async with AsyncSessionLocal() as db:
+        try:
+            return await virtual_account_service.process_webhook_transaction(db, dict(webhook_data))
+        except Exception as e:
+            return {"error": f"Unhandled error: {e}"}
+
+
+async def main(account: str, count: int, amount: Decimal, duplicates: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        va = await crud_virtual_account.get_virtual_account_by_number(db, account)
+        if va is None:
+            print(f"❌ Virtual account {account} not found")
+            return False
+        va_id, auto_settlement = va.id, va.auto_settlement
+        commission = (amount * va.platform_commission_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    insureflow_number = settings.INSUREFLOW_SETTLEMENT_ACCOUNT_NUMBER
+    insureflow_before = await balances(insureflow_number) if insureflow_number and insureflow_number != account else None
+    if insureflow_before is None:
+        print("⚠️ InsureFlow settlement VA not configured or not found - commissions will not be transferred")
+        commission = Decimal("0")
+    before = await balances(account)
+
+    run_id = uuid.uuid4().hex[:8]
+    webhooks = [
+        {
+            "transaction_reference": f"STRESS-{run_id}-{n}",
+            "virtual_account_number": account,
+            "principal_amount": str(amount),
+            "settled_amount": str(amount),
+            "fee_charged": "0",
+            "transaction_date": datetime.utcnow().isoformat(),
+            "currency": "NGN",
+            "remarks": "Concurrency stress test",
+        }
+        for n in range(count)
+    ]
+    deliveries = webhooks * (1 + duplicates)
+
+    print(f"🚀 Sending {len(deliveries)} webhooks ({count} distinct) of ₦{amount:,} to {account}")
+    await set_auto_settlement(va_id, False)
+    try:
+        started = datetime.utcnow()
+        results = await asyncio.gather(*(send_webhook(w) for w in deliveries))
+        elapsed = (datetime.utcnow() - started).total_seconds()
+    finally:
+        await set_auto_settlement(va_id, auto_settlement)
+        await http_clients.aclose()
+
+    applied = sum(1 for r in results if "error" not in r and not r.get("replayed"))
+    replayed = sum(1 for r in results if r.get("replayed"))
+    # A duplicate arriving while its original is still running is turned away (Squad retries it)
+    in_progress = sum(1 for r in results if "already being processed" in r.get("error", ""))
+    errors = [r["error"] for r in results if "error" in r and "already being processed" not in r["error"]]
+    print(f"⏱️ {elapsed:.2f}s - {applied} applied, {replayed} replayed, {in_progress} in progress, {len(errors)} errors")
+    for error in sorted(set(errors))[:10]:
+        print(f"   - {error}")
+
+    async with AsyncSessionLocal() as db:
+        recorded = (await db.execute(
+            select(func.count(VirtualAccountTransaction.id)).where(
+                VirtualAccountTransaction.transaction_reference.like(f"STRESS-{run_id}-%"),
+                VirtualAccountTransaction.virtual_account_id == va_id,
+                VirtualAccountTransaction.transaction_type == TransactionType.CREDIT
+            )
+        )).scalar_one()
+
+    after = await balances(account)
+    # Each distinct webhook is applied at most once, whatever the duplicates
+    credited = Decimal(recorded) * amount
+    debited = Decimal(recorded) * commission
+    checks = [
+        ("webhooks applied", applied, count),
+        ("credit transactions recorded", recorded, count),
+        ("account current_balance", after[1], before[1] + credited - debited),
+        ("account total_credits", after[2], before[2] + credited),
+        ("account total_debits", after[3], before[3] + debited),
+    ]
+    if insureflow_before is not None:
+        insureflow_after = await balances(insureflow_number)
+        checks += [
+            ("InsureFlow VA current_balance", insureflow_after[1], insureflow_before[1] + debited),
+            ("InsureFlow VA total_credits", insureflow_after[2], insureflow_before[2] + debited),
+        ]
+
+    ok = True
+    for name, actual, expected in checks:
+        passed = actual == expected
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {name}: {actual} (expected {expected})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fire concurrent webhooks at one virtual account and check its balances")
+    parser.add_argument("--account", required=True, help="Virtual account number to credit")
+    parser.add_argument("--count", type=int, default=300, help="Distinct webhooks to send")
+    parser.add_argument("--amount", type=Decimal, default=Decimal("1000"), help="Settled amount per webhook (naira)")
+    parser.add_argument("--duplicates", type=int, default=0, help="Extra deliveries of each webhook")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.account, args.count, args.amount, args.duplicates)) else 1)
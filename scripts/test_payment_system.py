@@ -13,7 +13,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal
 from app.models.policy import Policy
 from app.models.premium import Premium, PaymentStatus
 from app.models.user import User
@@ -234,10 +234,11 @@ class PaymentSystemTester:
             
             print(f"  - Testing with user: {test_user.full_name} ({test_user.email})")
             
-            result = await virtual_account_service.create_individual_virtual_account(
-                db=self.db,
-                user=test_user
-            )
+            async with AsyncSessionLocal() as async_db:
+                result = await virtual_account_service.create_individual_virtual_account(
+                    db=async_db,
+                    user=test_user
+                )
             
             if result.get("success"):
                 print("✅ Virtual account creation successful!")
@@ -280,10 +281,11 @@ class PaymentSystemTester:
                     ).first()
                     
                     if not existing_va:
-                        result = await virtual_account_service.create_individual_virtual_account(
-                            db=self.db,
-                            user=user
-                        )
+                        async with AsyncSessionLocal() as async_db:
+                            result = await virtual_account_service.create_individual_virtual_account(
+                                db=async_db,
+                                user=user
+                            )
                         if result.get("success"):
                             print(f"  - Created VA for {user.full_name}")
                 
@@ -382,10 +384,11 @@ class PaymentSystemTester:
                     return False
                 
                 # Create virtual account with low threshold for testing
-                result = await virtual_account_service.create_individual_virtual_account(
-                    db=self.db,
-                    user=test_user
-                )
+                async with AsyncSessionLocal() as async_db:
+                    result = await virtual_account_service.create_individual_virtual_account(
+                        db=async_db,
+                        user=test_user
+                    )
                 
                 if not result.get("success"):
                     print("❌ Failed to create test virtual account!")